@@ -0,0 +1,70 @@
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import solvers
+
+
+class BatchSolver:
+    """
+    Solves streams of small instances on a persistent process pool.
+
+    Instances are grouped into chunks of chunksize so that one round trip
+    to a worker covers many solves, and at most max_pending chunks are in
+    flight at once, so memory stays bounded however long the input stream
+    is. Keep one BatchSolver around to reuse its workers across batches.
+    """
+
+    def __init__(self, workers=None, chunksize=64, max_pending=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.max_pending = max_pending or 2 * self.workers
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def solve(self, matrices, solver='held_karp'):
+        """
+        Solves every matrix of an iterable with the named solver (see
+        solvers.SOLVERS).
+
+        Yields:
+            (tour, cost) per matrix, in input order, as results complete
+        """
+        solvers.get_solver(solver)
+        matrices = iter(matrices)
+        pending = deque()
+
+        while True:
+            while len(pending) < self.max_pending:
+                chunk = list(itertools.islice(matrices, self.chunksize))
+                if not chunk:
+                    break
+                pending.append(self._pool.submit(_solve_chunk, solver, chunk))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def solve_batch(matrices, solver='held_karp', workers=None, chunksize=64):
+    """
+    One-shot version of BatchSolver.solve with its own pool.
+
+    Yields:
+        (tour, cost) per matrix, in input order
+    """
+    with BatchSolver(workers, chunksize) as pool:
+        yield from pool.solve(matrices, solver)
+
+
+def _solve_chunk(solver, chunk):
+    solve = solvers.get_solver(solver)
+    return [solve(dists) for dists in chunk]
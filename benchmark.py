@@ -0,0 +1,314 @@
+import argparse
+import json
+import math
+import multiprocessing
+import platform
+import resource
+import statistics
+import sys
+import time
+
+import numpy as np
+
+import instances
+import solvers
+from results_store import ResultsStore, run_metadata
+from tour_eval import validate_tour
+
+# Two-sided 95% normal quantile used for the confidence interval of the mean
+Z_95 = 1.96
+
+DEFAULT_SOLVERS = ['exhaustive', 'branch_and_bound', 'held_karp', 'held_karp_array', 'nn', 'nn_ls']
+
+
+def generate_instance(n, seed, family='uniform'):
+    """
+    The (family, n, seed) instance of the on-disk corpus, as lists up to
+    instances.MATRIX_MAX_N cities; larger instances are returned as the
+    corpus loads them (a DistanceProvider or a memmap), never densified.
+    'uniform' has the value range of matrix.gen_distance_matrix.
+    """
+    m = instances.load_instance(family, n, seed)
+    return m.tolist() if isinstance(m, np.ndarray) and n <= instances.MATRIX_MAX_N else m
+
+
+def run_benchmark(solver_names=None, sizes=range(3, 31), seed=0, family='uniform',
+                  time_budget=10.0, memory_budget_mb=None, warmup=1, min_runs=3, max_runs=30,
+                  rel_ci=0.05, store=None, resume=False, log=print):
+    """
+    Runs every solver at growing n until one call exceeds time_budget
+    seconds or the cell's peak RSS exceeds memory_budget_mb; larger sizes
+    are then skipped for that solver. Every solver sees the same instance
+    for a given (family, n, seed).
+
+    Each (solver, n) cell runs in a fresh process so that its peak RSS is
+    its own and an over-budget call can be killed. After warmup calls, runs
+    repeat until the 95% confidence interval of the mean is within rel_ci
+    of the mean (at least min_runs, at most max_runs).
+
+    With a ResultsStore, every call and every finished cell is appended to
+    it as soon as the cell completes, stamped with the measurement
+    settings. With resume=True, cells already finished on this host at
+    this commit, from a clean tree, for the same family and settings are
+    taken from the store instead of being run again; cells that ended in
+    an error are retried. A dirty tree resumes nothing, since its records
+    cannot be tied to the code that produced them.
+
+    Returns:
+        dict with the run configuration, host info, one record per cell
+        and the largest feasible n per solver
+    """
+    solver_names = list(solver_names or DEFAULT_SOLVERS)
+    for name in solver_names:
+        solvers.get_solver(name)
+
+    ctx = multiprocessing.get_context('spawn')
+    active = set(solver_names)
+    records = []
+    feasible = {name: None for name in solver_names}
+    # settings that change what a cell measures; resumed cells must match
+    settings = {'time_budget': time_budget, 'memory_budget_mb': memory_budget_mb,
+                'warmup': warmup, 'min_runs': min_runs, 'max_runs': max_runs, 'rel_ci': rel_ci}
+    meta = {**run_metadata(), 'settings': settings}
+    done = {}
+    if store and resume:
+        if meta['dirty']:
+            if log:
+                log("Working tree has local changes, not resuming")
+        else:
+            done = store.cells(host=meta['host'], commit=meta['commit'], dirty=False,
+                               family=family, settings=settings)
+
+    for n in sizes:
+        if not active:
+            break
+        dists = generate_instance(n, seed, family)
+        for name in solver_names:
+            if name not in active:
+                continue
+            record = done.get((name, n, seed))
+            if record is None or record['status'] == 'error':
+                record = _run_cell(ctx, name, dists, seed, family, time_budget, memory_budget_mb,
+                                   warmup, min_runs, max_runs, rel_ci)
+                if store:
+                    _store_cell(store, meta, record)
+            records.append(record)
+            if log:
+                log(_format_record(record))
+            if record['status'] == 'ok':
+                feasible[name] = n
+            else:
+                active.discard(name)
+
+    return {
+        'config': {
+            'solvers': solver_names,
+            'sizes': list(sizes),
+            'seed': seed,
+            'family': family,
+            'time_budget': time_budget,
+            'memory_budget_mb': memory_budget_mb,
+            'warmup': warmup,
+            'min_runs': min_runs,
+            'max_runs': max_runs,
+            'rel_ci': rel_ci,
+        },
+        'host': host_info(),
+        'results': records,
+        'feasible': feasible,
+    }
+
+
+def _store_cell(store, meta, record):
+    runs = [{'kind': 'run', **meta, 'solver': record['solver'], 'n': record['n'],
+             'seed': record['seed'], 'family': record['family'], 'run': i, 'time': t, 'cost': cost,
+             'peak_rss_kb': record['peak_rss_kb']}
+            for i, (t, cost) in enumerate(zip(record['times'], record['costs']))]
+    cell = {'kind': 'cell', **meta,
+            **{k: v for k, v in record.items() if k not in ('times', 'costs')}}
+    store.extend(runs + [cell])
+
+
+def host_info():
+    return {
+        'hostname': platform.node(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'cpu_count': multiprocessing.cpu_count(),
+    }
+
+
+def summarize(times):
+    """Median, p95, mean and the 95% CI half-width of a list of timings."""
+    ordered = sorted(times)
+    k = len(ordered)
+    mean = statistics.fmean(ordered)
+    half_width = Z_95 * statistics.stdev(ordered) / math.sqrt(k) if k > 1 else math.inf
+    return {
+        'median': statistics.median(ordered),
+        'p95': ordered[min(k - 1, math.ceil(0.95 * k) - 1)],
+        'mean': mean,
+        'ci95': half_width,
+    }
+
+
+def _run_cell(ctx, name, dists, seed, family, time_budget, memory_budget_mb, warmup,
+              min_runs, max_runs, rel_ci):
+    record = {'solver': name, 'n': len(dists), 'seed': seed, 'family': family}
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_cell_worker,
+                       args=(child_conn, name, dists, warmup, min_runs, max_runs, rel_ci,
+                             memory_budget_mb))
+    proc.start()
+    child_conn.close()
+
+    times = []
+    costs = []
+    status = 'ok'
+    peak_rss_kb = None
+    received = 0
+    try:
+        while True:
+            # Process start-up is not charged to the solver
+            limit = time_budget + (30 if not received else 1)
+            if not parent_conn.poll(limit):
+                status = 'time'
+                break
+            msg = parent_conn.recv()
+            received += 1
+            kind = msg[0]
+            if kind in ('warmup', 'run'):
+                elapsed, cost, peak_rss_kb = msg[1:]
+                if elapsed > time_budget:
+                    status = 'time'
+                    break
+                if kind == 'run':
+                    times.append(elapsed)
+                    costs.append(cost)
+            elif kind == 'memory':
+                status = 'memory'
+                peak_rss_kb = msg[1]
+                break
+            elif kind == 'error':
+                status = 'error'
+                record['error'] = msg[1]
+                break
+            else:
+                break
+    except EOFError:
+        status = 'error'
+    finally:
+        if proc.is_alive():
+            proc.kill()
+        proc.join()
+        parent_conn.close()
+
+    record['status'] = status
+    record['runs'] = len(times)
+    record['peak_rss_kb'] = peak_rss_kb
+    record['times'] = times
+    record['costs'] = costs
+    record['cost'] = min(costs) if costs else None
+    if times:
+        record.update(summarize(times))
+    return record
+
+
+def _cell_worker(conn, name, dists, warmup, min_runs, max_runs, rel_ci, memory_budget_mb):
+    try:
+        solve = solvers.get_solver(name)
+        for _ in range(warmup):
+            start = time.perf_counter()
+            tour, cost = solve(dists)
+            elapsed = time.perf_counter() - start
+            validate_tour(tour, len(dists), dists, cost)
+            peak = _peak_rss_kb()
+            conn.send(('warmup', elapsed, cost, peak))
+            if memory_budget_mb is not None and peak > memory_budget_mb * 1024:
+                conn.send(('memory', peak))
+                return
+
+        times = []
+        while len(times) < max_runs:
+            start = time.perf_counter()
+            tour, cost = solve(dists)
+            elapsed = time.perf_counter() - start
+            validate_tour(tour, len(dists), dists, cost)
+            times.append(elapsed)
+            peak = _peak_rss_kb()
+            conn.send(('run', elapsed, cost, peak))
+            if memory_budget_mb is not None and peak > memory_budget_mb * 1024:
+                conn.send(('memory', peak))
+                return
+            if len(times) >= min_runs:
+                stats = summarize(times)
+                if stats['ci95'] <= rel_ci * stats['mean']:
+                    break
+        conn.send(('done',))
+    except MemoryError:
+        conn.send(('memory', _peak_rss_kb()))
+    except Exception as exc:
+        conn.send(('error', repr(exc)))
+    finally:
+        conn.close()
+
+
+def _peak_rss_kb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _format_record(r):
+    if r['status'] == 'error':
+        return f"{r['solver']:<18} n={r['n']:<4} error {r.get('error', '')}"
+    if r['status'] != 'ok':
+        return f"{r['solver']:<18} n={r['n']:<4} stopped ({r['status']} budget exceeded)"
+    return (f"{r['solver']:<18} n={r['n']:<4} median={r['median']:.6f}s p95={r['p95']:.6f}s "
+            f"runs={r['runs']:<3} peak_rss={r['peak_rss_kb'] / 1024:.1f}MB cost={r['cost']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Adaptive TSP solver benchmark")
+    parser.add_argument('--solvers', nargs='+', default=DEFAULT_SOLVERS,
+                        choices=sorted(solvers.SOLVERS))
+    parser.add_argument('--min-n', type=int, default=3)
+    parser.add_argument('--max-n', type=int, default=30)
+    parser.add_argument('--step', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--family', default='uniform', choices=instances.FAMILIES,
+                        help="instance family of the corpus")
+    parser.add_argument('--time-budget', type=float, default=10.0,
+                        help="seconds allowed per solver call")
+    parser.add_argument('--memory-budget', type=float, default=None,
+                        help="peak RSS allowed per cell, in MB")
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--min-runs', type=int, default=3)
+    parser.add_argument('--max-runs', type=int, default=30)
+    parser.add_argument('--rel-ci', type=float, default=0.05,
+                        help="stop repeating once the 95%% CI is within this fraction of the mean")
+    parser.add_argument('--out', default='benchmark_results.json')
+    parser.add_argument('--store', default=None,
+                        help="also append every run to this JSON Lines results store")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip cells already in --store for this host and commit")
+    args = parser.parse_args(argv)
+    store = ResultsStore(args.store) if args.store else None
+
+    report = run_benchmark(args.solvers, range(args.min_n, args.max_n + 1, args.step),
+                           seed=args.seed, family=args.family, time_budget=args.time_budget,
+                           memory_budget_mb=args.memory_budget, warmup=args.warmup,
+                           min_runs=args.min_runs, max_runs=args.max_runs, rel_ci=args.rel_ci,
+                           store=store, resume=args.resume)
+
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("\nLargest n within budget:")
+    for name, n in report['feasible'].items():
+        print(f"  {name}: {n}")
+    print(f"\nResults saved to '{args.out}'")
+
+
+if __name__ == '__main__':
+    main()
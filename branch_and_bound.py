@@ -0,0 +1,118 @@
+import numpy as np
+
+import greedy_nearestneighbor
+
+
+def solve_tsp_branch_and_bound(distance_matrix, stats=None):
+    """
+    Solves the Traveling Salesperson Problem (TSP) exactly using depth-first
+    branch and bound. The incumbent is seeded with the greedy nearest
+    neighbour tour, and a partial tour is pruned as soon as its lower bound
+    cannot beat the incumbent.
+
+    The bound is that of the reduced cost matrix (Little et al.): every row
+    of the matrix is reduced by its minimum, then every column, and the sum
+    of the minima is a lower bound on any tour. Extending the path by an
+    edge u -> v adds the edge's reduced cost, removes row u and column v
+    (and the edge v -> 0, which would close the tour early), and reduces
+    the rest again, so a node's bound is its parent's plus what the new
+    edge and the new reduction add. Children are tried cheapest reduced
+    cost first. The bound holds for asymmetric matrices.
+
+    Parameters:
+        distance_matrix (list[list[int]]): Matrix of non-negative distances.
+        stats (SolveStats): Optional instrumentation.SolveStats to fill in.
+
+    Returns:
+        best_tour (list[int]): The optimal tour (0-indexed, starting/ending at city 0).
+        best_cost (float): The minimum total tour cost.
+    """
+    if stats is not None:
+        stats.begin()
+    d = distance_matrix
+    n = len(d)
+    if n <= 1:
+        return [0, 0], d[0][0]
+
+    # Forbidden edges are infinite
+    reduced = np.array(d, dtype=np.float64)
+    np.fill_diagonal(reduced, np.inf)
+    root_bound = _reduce(reduced)
+
+    if stats is not None:
+        stats.lap('setup')
+
+    best_tour, best_cost = greedy_nearestneighbor.solve_nn_tsp(d, start_city_index=0, stats=stats)
+
+    visited = [False] * n
+    visited[0] = True
+    path = [0]
+    # counting costs a test per node, so it is skipped without stats
+    counting = stats is not None
+    expanded = 0
+    pruned = 0
+
+    def search(city, cost, reduced, bound):
+        nonlocal best_tour, best_cost, expanded, pruned
+
+        if counting:
+            expanded += 1
+        if len(path) == n:
+            total = cost + d[city][0]
+            if total < best_cost:
+                best_cost = total
+                best_tour = path + [0]
+            return
+
+        row = reduced[city]
+        for nxt in np.argsort(row, kind='stable').tolist():
+            if visited[nxt]:
+                continue
+            edge = row[nxt]
+            if bound + edge >= best_cost:
+                # sorted by reduced cost, so every later branch is worse too
+                if counting:
+                    pruned += 1
+                break
+            child = reduced.copy()
+            child[city, :] = np.inf
+            child[:, nxt] = np.inf
+            if len(path) + 1 < n:
+                child[nxt, 0] = np.inf
+            child_bound = bound + edge + _reduce(child)
+            if child_bound >= best_cost:
+                if counting:
+                    pruned += 1
+                continue
+            visited[nxt] = True
+            path.append(nxt)
+            search(nxt, cost + d[city][nxt], child, child_bound)
+            path.pop()
+            visited[nxt] = False
+
+    search(0, 0, reduced, root_bound)
+
+    if stats is not None:
+        stats.lap('search')
+        stats.add('states_expanded', expanded)
+        stats.add('nodes_pruned', pruned)
+
+    return best_tour, best_cost
+
+
+def _reduce(reduced):
+    """
+    Subtracts each row's minimum from the row, then each column's from the
+    column, in place. Rows and columns with no finite entry (already
+    removed) are left alone.
+
+    Returns:
+        the sum of the minima subtracted
+    """
+    row_mins = reduced.min(axis=1)
+    row_mins[np.isinf(row_mins)] = 0
+    reduced -= row_mins[:, None]
+    col_mins = reduced.min(axis=0)
+    col_mins[np.isinf(col_mins)] = 0
+    reduced -= col_mins
+    return row_mins.sum() + col_mins.sum()
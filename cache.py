@@ -0,0 +1,190 @@
+import hashlib
+import json
+import sqlite3
+from collections import OrderedDict
+
+import numpy as np
+
+import solvers
+
+
+class SolutionCache:
+    """
+    Caches (tour, cost) results in front of the solvers.
+
+    Entries are keyed by the solver name and a blake2b hash of the distance
+    matrix. For exact solvers the matrix is first put in a canonical city
+    order, so the same instance with its cities relabelled hits the same
+    entry and the stored tour is mapped back to the caller's labels.
+    Heuristic results depend on the labelling (nearest neighbour starts at
+    city 0), so they are only shared between identical matrices.
+
+    The in-memory layer is an LRU of at most maxsize entries. With a path,
+    entries are also written to an SQLite file that survives restarts;
+    disk hits are promoted to memory.
+    """
+
+    def __init__(self, maxsize=1024, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self._entries = OrderedDict()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path)
+            self._db.execute('CREATE TABLE IF NOT EXISTS solutions '
+                             '(key TEXT PRIMARY KEY, solver TEXT, n INTEGER, tour TEXT, cost TEXT)')
+            self._db.commit()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def solve(self, matrix, solver='held_karp'):
+        """
+        solvers.SOLVERS[solver](matrix) through the cache.
+
+        Returns:
+            tuple: (tour, cost), the tour closed at city 0
+        """
+        key, perm = fingerprint(matrix, solver)
+        result = self._lookup(key, perm)
+        if result is None:
+            result = solvers.get_solver(solver)(matrix)
+            self._store(key, perm, solver, *result)
+        return result
+
+    def get(self, matrix, solver='held_karp'):
+        """Cached (tour, cost) for the matrix, or None."""
+        return self._lookup(*fingerprint(matrix, solver))
+
+    def put(self, matrix, solver, tour, cost):
+        key, perm = fingerprint(matrix, solver)
+        self._store(key, perm, solver, tour, cost)
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        """Empties the memory layer and the disk layer."""
+        self._entries.clear()
+        if self._db:
+            self._db.execute('DELETE FROM solutions')
+            self._db.commit()
+
+    def close(self):
+        if self._db:
+            self._db.close()
+            self._db = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _lookup(self, key, perm):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        elif self._db:
+            row = self._db.execute('SELECT tour, cost FROM solutions WHERE key = ?',
+                                   (key,)).fetchone()
+            if row is not None:
+                entry = (tuple(json.loads(row[0])), json.loads(row[1]))
+                self._remember(key, entry)
+                self.disk_hits += 1
+        if entry is None:
+            self.misses += 1
+            return None
+        tour, cost = entry
+        return _from_canonical(tour, perm), cost
+
+    def _store(self, key, perm, solver, tour, cost):
+        entry = (_to_canonical(tour, perm), _to_builtin(cost))
+        self._remember(key, entry)
+        if self._db:
+            self._db.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?)',
+                             (key, solver, len(entry[0]), json.dumps(entry[0]),
+                              json.dumps(entry[1])))
+            self._db.commit()
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+def fingerprint(matrix, solver):
+    """
+    Cache key of a matrix for a solver, and the relabelling used.
+
+    For exact solvers, each city's signature is its sorted row followed by
+    its sorted column, which does not depend on the labelling. When the
+    signatures are all different, cities are renumbered in signature order
+    before hashing; perm[i] is the caller's label of canonical city i.
+    Otherwise (and for heuristic solvers) the matrix is hashed as given and
+    perm is None.
+
+    Returns:
+        tuple: (hex key, perm)
+    """
+    m = np.asarray(matrix)
+    # lists, int32 and int64 arrays of the same values hash alike
+    m = m.astype(np.float64 if m.dtype.kind == 'f' else np.int64, copy=False)
+    n = len(m)
+
+    perm = None
+    if solver in solvers.EXACT and n > 1:
+        signatures = np.concatenate([np.sort(m, axis=1), np.sort(m, axis=0).T], axis=1)
+        order = np.lexsort(signatures.T[::-1])
+        ordered = signatures[order]
+        if not (ordered[1:] == ordered[:-1]).all(axis=1).any():
+            perm = order
+            m = m[np.ix_(order, order)]
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{solver}:{n}:{m.dtype.str}:{perm is not None}:".encode())
+    h.update(np.ascontiguousarray(m).tobytes())
+    return h.hexdigest(), perm
+
+
+def _to_canonical(tour, perm):
+    """Closed tour in caller labels -> open tour in canonical labels from 0."""
+    tour = [int(c) for c in tour]
+    if len(tour) > 1 and tour[0] == tour[-1]:
+        tour.pop()
+    if perm is None:
+        return tuple(tour)
+    inverse = np.empty(len(perm), dtype=np.int64)
+    inverse[perm] = np.arange(len(perm))
+    tour = inverse[tour].tolist()
+    i = tour.index(0)
+    return tuple(tour[i:] + tour[:i])
+
+
+def _from_canonical(tour, perm):
+    """Inverse of _to_canonical, closed and starting at the caller's city 0."""
+    if perm is None:
+        return list(tour) + [tour[0]]
+    tour = perm[list(tour)].tolist()
+    i = tour.index(0)
+    return tour[i:] + tour[:i] + [0]
+
+
+def _to_builtin(value):
+    # NumPy scalars from the array solvers
+    return value.item() if hasattr(value, 'item') else value
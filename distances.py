@@ -0,0 +1,200 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+
+class DistanceProvider:
+    """
+    Read-only distance matrix interface accepted by every solver.
+
+    Providers index like the list-of-lists matrices the solvers were written
+    for: len(d) is the number of cities and d[i][j] the distance from i to
+    j, with d[i] a cached row of Python numbers. d[i, j] looks up a single
+    distance without fetching a row, row(i) returns a row as a NumPy array,
+    and np.asarray(d) materializes the full matrix for the array engines.
+    """
+
+    def __init__(self, n, cache_rows=256):
+        self.n = n
+        self.cache_rows = cache_rows
+        self._rows = OrderedDict()
+
+    # True when d[i][j] == d[j][i] by construction; None means unknown, so
+    # is_symmetric() compares the materialized matrix
+    symmetric = None
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            return self.dist(*key)
+
+        # small LRU cache of rows as lists
+        row = self._rows.get(key)
+        if row is None:
+            row = self.row(key).tolist()
+            self._rows[key] = row
+            if len(self._rows) > self.cache_rows:
+                self._rows.popitem(last=False)
+        else:
+            self._rows.move_to_end(key)
+        return row
+
+    def __iter__(self):
+        for i in range(self.n):
+            yield self[i]
+
+    def __array__(self, dtype=None, copy=None):
+        matrix = np.stack([self.row(i) for i in range(self.n)]) if self.n else np.zeros((0, 0))
+        return matrix if dtype is None else matrix.astype(dtype)
+
+    def dist(self, i, j):
+        raise NotImplementedError
+
+    def row(self, i):
+        raise NotImplementedError
+
+    def pairs(self, i, j):
+        """Distances from i[t] to j[t] for two equal-length index arrays."""
+        return np.array([self.dist(a, b) for a, b in zip(np.ravel(i).tolist(), np.ravel(j).tolist())])
+
+
+class ListDistances(DistanceProvider):
+    """The existing list-of-lists matrix, wrapped without copying."""
+
+    def __init__(self, matrix):
+        super().__init__(len(matrix))
+        self.matrix = matrix
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            i, j = key
+            return self.matrix[i][j]
+        return self.matrix[key]
+
+    def dist(self, i, j):
+        return self.matrix[i][j]
+
+    def row(self, i):
+        return np.asarray(self.matrix[i])
+
+
+class TriangularDistances(DistanceProvider):
+    """
+    Symmetric matrix stored as its packed upper triangle (diagonal excluded)
+    in a compact dtype: n(n-1)/2 entries instead of n^2 Python objects.
+    """
+
+    symmetric = True
+
+    def __init__(self, tri, n, cache_rows=256):
+        super().__init__(n, cache_rows)
+        if len(tri) != n * (n - 1) // 2:
+            raise ValueError(f"expected {n * (n - 1) // 2} entries for n={n}, got {len(tri)}")
+        self.tri = tri
+
+    @classmethod
+    def from_matrix(cls, matrix, dtype=np.int32, cache_rows=256):
+        """Packs the upper triangle of a square matrix."""
+        m = np.asarray(matrix)
+        n = len(m)
+        upper = np.triu_indices(n, k=1)
+        tri = m[upper]
+        if np.issubdtype(np.dtype(dtype), np.integer) and tri.size:
+            info = np.iinfo(dtype)
+            if tri.min() < info.min or tri.max() > info.max:
+                raise OverflowError(f"distances do not fit in {np.dtype(dtype).name}")
+        return cls(tri.astype(dtype), n, cache_rows)
+
+    def _offset(self, i):
+        # start of row i's entries (j > i) in the packed triangle
+        return i * (2 * self.n - i - 1) // 2
+
+    def dist(self, i, j):
+        if i == j:
+            return self.tri.dtype.type(0).item()
+        if i > j:
+            i, j = j, i
+        return self.tri[self._offset(i) + j - i - 1].item()
+
+    def row(self, i):
+        n = self.n
+        row = np.zeros(n, dtype=self.tri.dtype)
+        # j < i lives in column i of earlier rows
+        j = np.arange(i)
+        row[:i] = self.tri[j * (2 * n - j - 1) // 2 + i - j - 1]
+        start = self._offset(i)
+        row[i + 1:] = self.tri[start:start + n - i - 1]
+        return row
+
+    def pairs(self, i, j):
+        i, j = np.minimum(i, j), np.maximum(i, j)
+        out = np.zeros(np.shape(i), dtype=self.tri.dtype)
+        # the diagonal is not stored
+        off = i != j
+        i, j = i[off], j[off]
+        out[off] = self.tri[i * (2 * self.n - i - 1) // 2 + j - i - 1]
+        return out
+
+
+class CoordinateDistances(DistanceProvider):
+    """
+    Euclidean distances computed on demand from point coordinates, so only
+    the O(n) coordinates and a few cached rows are ever held in memory.
+    With rounded=True distances are rounded to the nearest integer (TSPLIB
+    EUC_2D) and returned as integers.
+    """
+
+    symmetric = True
+
+    def __init__(self, coords, cache_rows=256, rounded=False):
+        pts = np.asarray(coords, dtype=np.float64)
+        super().__init__(len(pts), cache_rows)
+        self.coords = pts
+        self.rounded = rounded
+        self._points = pts.tolist()
+
+    def dist(self, i, j):
+        # same operation order as row(), so both give identical floats
+        value = math.sqrt(sum((a - b) * (a - b) for a, b in zip(self._points[j], self._points[i])))
+        # round() and np.rint both round halves to even
+        return round(value) if self.rounded else value
+
+    def row(self, i):
+        diff = self.coords - self.coords[i]
+        return self._finish(np.sqrt((diff * diff).sum(axis=1)))
+
+    def pairs(self, i, j):
+        diff = self.coords[j] - self.coords[i]
+        return self._finish(np.sqrt((diff * diff).sum(axis=1)))
+
+    def _finish(self, values):
+        return np.rint(values).astype(np.int64) if self.rounded else values
+
+
+def as_distances(dist_matrix):
+    """
+    Providers pass through; anything else (list of lists, 2-D array) becomes
+    a NumPy array. Either result supports len(d), d[i, j] and row access.
+    """
+    if isinstance(dist_matrix, DistanceProvider):
+        return dist_matrix
+    return np.asarray(dist_matrix)
+
+
+def is_symmetric(dist_matrix):
+    """
+    Whether d[i][j] == d[j][i] for every pair. Providers that are symmetric
+    by construction answer without materializing the matrix.
+    """
+    if isinstance(dist_matrix, DistanceProvider) and dist_matrix.symmetric is not None:
+        return dist_matrix.symmetric
+    m = np.asarray(dist_matrix)
+    return np.array_equal(m, m.T)
+
+
+def get_row(d, i):
+    """Row i of as_distances output as a NumPy array."""
+    return d.row(i) if isinstance(d, DistanceProvider) else d[i]
@@ -1,32 +1,155 @@
 import itertools
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 
-def solve_tsp_exhaustive(distance_matrix):
+import numpy as np
+
+import tour_eval
+
+# Per-worker state for the parallel search, set once by _init_worker
+_worker_dists = None
+_worker_best = None
+
+def solve_tsp_exhaustive(distance_matrix, stats=None):
     """
     Solves the Traveling Salesperson Problem (TSP) using exhaustive search.
-    The decrease-by-one method is utilized.
+    The decrease-by-one method is utilized. Tours are scored in batches by
+    tour_eval.best_permutation, which visits them in the same order as
+    itertools.permutations and keeps the first cheapest one.
 
     Parameters:
         distance_matrix (list[list[int]]): Symmetric matrix of distances.
+        stats (SolveStats): Optional instrumentation.SolveStats to fill in.
 
     Returns:
         best_tour (list[int]): The optimal tour (0-indexed, starting/ending at city 0).
         best_cost (float): The minimum total tour cost.
     """
+    if stats is not None:
+        stats.begin()
     n = len(distance_matrix)
-    cities = list(range(1, n))  # exclude start city (0)
-    
-    best_cost = float("inf")
-    best_tour = []
-
-    # Iterate over all permutations of remaining cities
-    for perm in itertools.permutations(cities):
-        tour = [0] + list(perm) + [0]  # start and end at city 0
-        cost = 0
-        # compute total cost for this tour
-        for i in range(len(tour) - 1):
-            cost += distance_matrix[tour[i]][tour[i + 1]]
-        if cost < best_cost:
-            best_cost = cost
-            best_tour = tour
-
-    return best_tour, best_cost
\ No newline at end of file
+
+    best_tour, best_cost = tour_eval.best_permutation(distance_matrix, start=0)
+
+    if stats is not None:
+        stats.lap('search')
+        tours = math.factorial(n - 1) if n else 0
+        stats.add('states_expanded', tours)
+        stats.add('distance_lookups', tours * n)
+
+    return best_tour, best_cost
+
+
+def solve_tsp_exhaustive_symmetric(distance_matrix, stats=None):
+    """
+    Exhaustive search for symmetric matrices. A tour and its reverse cost
+    the same, so only one tour of each mirrored pair is scored (see
+    tour_eval.best_permutation), which halves the work. With integer
+    distances the result is identical to solve_tsp_exhaustive, including
+    ties; with floats the cost can differ from it by rounding.
+
+    Parameters:
+        distance_matrix (list[list[int]]): Symmetric matrix of distances.
+        stats (SolveStats): Optional instrumentation.SolveStats to fill in.
+
+    Returns:
+        best_tour (list[int]): The optimal tour (0-indexed, starting/ending at city 0).
+        best_cost (float): The minimum total tour cost.
+
+    Raises:
+        ValueError: if the matrix is not symmetric.
+    """
+    if stats is not None:
+        stats.begin()
+    d = np.asarray(distance_matrix)
+    n = len(d)
+    if not np.array_equal(d, d.T):
+        raise ValueError("solve_tsp_exhaustive_symmetric needs a symmetric matrix")
+
+    best_tour, best_cost = tour_eval.best_permutation(d, start=0, symmetric=True)
+
+    if stats is not None:
+        stats.lap('search')
+        tours = math.factorial(n - 1) // 2 if n > 2 else 1
+        stats.add('states_expanded', tours)
+        stats.add('distance_lookups', tours * n)
+
+    return best_tour, best_cost
+
+
+def solve_tsp_exhaustive_parallel(distance_matrix, workers=None):
+    """
+    Parallel exhaustive search. The permutation space is split by the second
+    and third cities of the tour, and each prefix is searched by a worker
+    process. The distance matrix is handed to workers once through shared
+    memory, and each worker scores its prefix with
+    tour_eval.best_permutation, as the serial search does. The best cost
+    found so far is shared so that workers can skip partial tours as soon
+    as they are more expensive.
+
+    Partial tours are only cut off when strictly more expensive than the
+    shared best, and prefixes are reduced in order, so the result matches
+    solve_tsp_exhaustive exactly (including ties) for any worker count.
+
+    Parameters:
+        distance_matrix (list[list[int]]): Matrix of non-negative distances.
+        workers (int): Number of worker processes (default: CPU count).
+
+    Returns:
+        best_tour (list[int]): The optimal tour (0-indexed, starting/ending at city 0).
+        best_cost (float): The minimum total tour cost.
+    """
+    n = len(distance_matrix)
+    if n < 4:
+        return solve_tsp_exhaustive(distance_matrix)
+
+    prefixes = list(itertools.permutations(range(1, n), 2))
+
+    dists = np.asarray(distance_matrix)
+    shm = shared_memory.SharedMemory(create=True, size=dists.nbytes)
+    try:
+        np.ndarray(dists.shape, dists.dtype, buffer=shm.buf)[:] = dists
+
+        ctx = multiprocessing.get_context()
+        shared_best = ctx.Value('d', float("inf"))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=_init_worker,
+                                 initargs=(shm.name, dists.shape, dists.dtype.str, shared_best)) as pool:
+            best_cost = float("inf")
+            best_tour = []
+            for cost, tour in pool.map(_solve_prefix, prefixes):
+                if cost < best_cost:
+                    best_cost = cost
+                    best_tour = tour
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return best_tour, best_cost
+
+
+def _init_worker(shm_name, shape, dtype, shared_best):
+    global _worker_dists, _worker_best
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    # A private copy, so the segment can be closed right away
+    _worker_dists = np.ndarray(shape, dtype, buffer=shm.buf).copy()
+    shm.close()
+    _worker_best = shared_best
+
+
+def _solve_prefix(prefix):
+    """Best tour starting 0, prefix[0], prefix[1], ... or (inf, None)."""
+    # Unlocked reads of the shared bound; a stale value only prunes less
+    shared = _worker_best.get_obj()
+    tour, cost = tour_eval.best_permutation(_worker_dists, start=0, head=prefix,
+                                            bound=lambda: shared.value)
+    if tour is None:
+        return float("inf"), None
+
+    with _worker_best.get_lock():
+        if cost < shared.value:
+            shared.value = cost
+    return cost, tour
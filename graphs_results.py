@@ -1,14 +1,63 @@
 import matplotlib.pyplot as plt
-import json
+import argparse
+import os
 import numpy as np
 
-def plot_results():
-    # Load results from JSON file
-    try:
-        with open('tsp_results.json', 'r') as f:
-            results = json.load(f)
-    except FileNotFoundError:
-        print("Error: 'tsp_results.json' not found. Run 'main.py' first to generate results.")
+import main
+from results_store import DEFAULT_PATH, ResultsStore, aggregate_runs
+
+def load_results(store_path=DEFAULT_PATH, sweep=None):
+    """
+    Rebuilds the per-case result lists of one main.py sweep (the latest one
+    by default) from the results store. The store is streamed and folded
+    into per-(sweep, solver, n) totals, so memory grows with the number of
+    cells, not with the number of runs recorded.
+    """
+    filters = {'kind': 'run', 'source': 'main.py'}
+    if sweep is not None:
+        filters['sweep'] = sweep
+    totals = aggregate_runs(ResultsStore(store_path).query(**filters))
+    if not totals:
+        return None
+
+    sweep = max(key[0] for key in totals)
+    cells = {(solver, n): cell for (s, solver, n), cell in totals.items() if s == sweep}
+    test_cases = sorted({n for _, n in cells})
+
+    results = {'test_cases': test_cases}
+    for key, solver in main.SOLVER_NAMES.items():
+        avg_times = []
+        best_costs = []
+        for n in test_cases:
+            cell = cells.get((solver, n))
+            avg_times.append(cell['total_time'] / cell['count'] if cell else None)
+            best_costs.append(cell['best_cost'] if cell else None)
+        results[f'{key}_avg_times'] = avg_times
+        results[f'{key}_best_costs'] = best_costs
+        measured_n = [n for n, t in zip(test_cases, avg_times) if t is not None]
+        results[f'max_feasible_{key}'] = max(measured_n, default=None)
+
+    for key, algorithm in (('es', 'ES'), ('hk', 'HK'), ('nn', 'NN')):
+        avg_times = results[f'{key}_avg_times']
+        measured_n = [n for n, t in zip(test_cases, avg_times) if t is not None]
+        measured_times = [t for t in avg_times if t is not None]
+        results[f'{key}_extrapolated'] = main.extrapolate_times(measured_times, measured_n, test_cases, algorithm)
+
+    return results
+
+def plot_results(show=True, dpi=300):
+    """
+    Plots the latest main.py sweep to tsp_comprehensive_analysis.png.
+    show=False draws on the Agg backend and never opens a window, for
+    headless runs; report.py renders whole result histories.
+    """
+    if not show:
+        plt.switch_backend('Agg')
+
+    # Load results from the results store
+    results = load_results() if os.path.exists(DEFAULT_PATH) else None
+    if results is None:
+        print(f"Error: no results in '{DEFAULT_PATH}'. Run 'main.py' first to generate results.")
         return
     
     test_cases = results['test_cases']
@@ -23,6 +72,8 @@ def plot_results():
     nn_extrapolated = results['nn_extrapolated']
     max_feasible_es = results['max_feasible_es']
     max_feasible_hk = results['max_feasible_hk']
+    bb_avg_times = results['bb_avg_times']
+    max_feasible_bb = results['max_feasible_bb']
     
     fig, ((ax1, ax2, ax3)) = plt.subplots(3, 1, figsize=(12, 15))
     
@@ -33,6 +84,9 @@ def plot_results():
     hk_measured_n = [test_cases[i] for i in range(len(test_cases)) if hk_avg_times[i] is not None]
     hk_measured_times = [t for t in hk_avg_times if t is not None]
     
+    bb_measured_n = [test_cases[i] for i in range(len(test_cases)) if bb_avg_times[i] is not None]
+    bb_measured_times = [t for t in bb_avg_times if t is not None]
+    
     if es_measured_n:
         ax1.plot(es_measured_n, es_measured_times, 'ro-', linewidth=2, markersize=6, label='ES (measured)')
         ax1.plot(test_cases, es_extrapolated, 'r--', linewidth=1, label='ES (extrapolated)')
@@ -43,6 +97,10 @@ def plot_results():
         ax1.plot(test_cases, hk_extrapolated, 'g--', linewidth=1, label='HK (extrapolated)')
         ax1.axvline(x=max_feasible_hk, color='green', linestyle=':', alpha=0.7, label=f'HK max feasible ({max_feasible_hk})')
     
+    if bb_measured_n:
+        ax1.plot(bb_measured_n, bb_measured_times, 'md-', linewidth=2, markersize=6, label='BB (measured)')
+        ax1.axvline(x=max_feasible_bb, color='magenta', linestyle=':', alpha=0.7, label=f'BB max feasible ({max_feasible_bb})')
+    
     ax1.plot(test_cases, nn_avg_times, 'b^-', linewidth=2, markersize=6, label='GNN')
     
     ax1.set_xlabel('Number of Cities', fontsize=12)
@@ -63,6 +121,9 @@ def plot_results():
         ax2.plot(es_measured_n, es_measured_times, 'ro-', linewidth=2, markersize=6, label='ES')
         ax2.axvline(x=max_feasible_es, color='red', linestyle=':', alpha=0.7, label=f'ES max feasible ({max_feasible_es})')
     
+    if bb_measured_n:
+        ax2.plot(bb_measured_n, bb_measured_times, 'md-', linewidth=2, markersize=6, label='BB')
+    
     ax2.set_xlabel('Number of Cities', fontsize=12)
     ax2.set_ylabel('Average Running Time (seconds)', fontsize=12)
     ax2.set_title('TSP Algorithm Running Times\n(Linear Scale)', fontsize=14, fontweight='bold')
@@ -103,8 +164,10 @@ def plot_results():
         ax3.set_title('Solution Cost Comparison', fontsize=14, fontweight='bold')
     
     plt.tight_layout()
-    plt.savefig('tsp_comprehensive_analysis.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    plt.savefig('tsp_comprehensive_analysis.png', dpi=dpi, bbox_inches='tight')
+    if show:
+        plt.show()
+    plt.close(fig)
     
     print("\n" + "="*60)
     print("SUMMARY STATISTICS")
@@ -112,6 +175,8 @@ def plot_results():
     print(f"Maximum successfully terminated instances:")
     print(f"  Exhaustive Search: {max_feasible_es} cities")
     print(f"  Held-Karp: {max_feasible_hk} cities")
+    if max_feasible_bb is not None:
+        print(f"  Branch and Bound: {max_feasible_bb} cities")
     print(f"  Greedy Nearest Neighbor: {max(test_cases)} cities")
     
     if overlapping_cases:
@@ -124,4 +189,9 @@ def plot_results():
     print("\nPlots saved as 'tsp_comprehensive_analysis.png'")
 
 if __name__ == '__main__':
-    plot_results()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Plot the latest main.py sweep")
+    parser.add_argument('--no-show', action='store_true',
+                        help="only save the figure, without opening a window")
+    parser.add_argument('--dpi', type=int, default=300)
+    args = parser.parse_args()
+    plot_results(show=not args.no_show, dpi=args.dpi)
\ No newline at end of file
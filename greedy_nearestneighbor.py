@@ -1,6 +1,11 @@
+import math
 import sys
 
-def solve_nn_tsp(dist_matrix, start_city_index=0):
+import numpy as np
+
+from distances import as_distances, get_row
+
+def solve_nn_tsp(dist_matrix, start_city_index=0, stats=None):
     """
     Implementation of a Greedy algorithm to solve the Traveling
     Salesman Problem using a Nearest Neighbor heuristic.
@@ -8,10 +13,13 @@ def solve_nn_tsp(dist_matrix, start_city_index=0):
     Parameters:
         dist_matrix: distance matrix
         start_city_index: index of starting city
+        stats: optional instrumentation.SolveStats to fill in
 
     Returns:
         tuple: (path, total_cost)
     """
+    if stats is not None:
+        stats.begin()
     n = len(dist_matrix)
 
     # tracks visited cities
@@ -49,4 +57,168 @@ def solve_nn_tsp(dist_matrix, start_city_index=0):
     total_cost += dist_matrix[current_city][start_city_index]
     path.append(start_city_index)
 
-    return path, total_cost
\ No newline at end of file
+    if stats is not None:
+        stats.lap('nn')
+        _nn_count(stats, n)
+
+    return path, total_cost
+
+
+def solve_nn_tsp_array(dist_matrix, start_city_index=0, stats=None):
+    """
+    Vectorized version of solve_nn_tsp. Each step takes an argmin over the
+    current city's row restricted to the unvisited cities, so the scan runs
+    in NumPy instead of a Python loop. Ties go to the lowest city index,
+    exactly as in solve_nn_tsp.
+
+    Parameters:
+        dist_matrix: distance matrix (list of lists, 2-D array or
+            DistanceProvider; providers are read one row at a time)
+        start_city_index: index of starting city
+        stats: optional instrumentation.SolveStats to fill in
+
+    Returns:
+        tuple: (path, total_cost)
+    """
+    if stats is not None:
+        stats.begin()
+    d = as_distances(dist_matrix)
+    n = len(d)
+
+    # unvisited cities, kept sorted so argmin breaks ties on the lowest index
+    unvisited = np.delete(np.arange(n), start_city_index)
+
+    path = [start_city_index]
+    total_cost = 0
+    current_city = start_city_index
+
+    for _ in range(n - 1):
+        row = get_row(d, current_city)
+        i = int(row[unvisited].argmin())
+        nearest_city = int(unvisited[i])
+        total_cost += row[nearest_city].item()
+        current_city = nearest_city
+        path.append(current_city)
+        unvisited = np.delete(unvisited, i)
+
+    # adds cost from last city to starting city
+    total_cost += get_row(d, current_city)[start_city_index].item()
+    path.append(start_city_index)
+
+    if stats is not None:
+        stats.lap('nn')
+        _nn_count(stats, n)
+
+    return path, total_cost
+
+
+def _nn_count(stats, n):
+    # Step k reads the n - 1 - k unvisited entries of one row; the closing
+    # edge reads one more
+    stats.add('rows_scanned', max(n - 1, 0))
+    stats.add('distance_lookups', n * (n - 1) // 2 + 1 if n else 0)
+
+
+def solve_nn_tsp_coords(coords, start_city_index=0):
+    """
+    Nearest Neighbor heuristic on 2-D coordinates with Euclidean distances.
+    Unvisited cities are bucketed in a uniform grid and each step searches
+    rings of cells around the current city, so the n x n matrix is never
+    built and a step usually touches only a handful of cities.
+
+    Parameters:
+        coords: sequence of (x, y) pairs, or an (n, 2) array
+        start_city_index: index of starting city
+
+    Returns:
+        tuple: (path, total_cost)
+    """
+    pts = np.asarray(coords, dtype=float)
+    n = len(pts)
+    xs = pts[:, 0].tolist()
+    ys = pts[:, 1].tolist()
+
+    remaining = n - 1
+    grid = _NNGrid(pts, [c for c in range(n) if c != start_city_index])
+
+    path = [start_city_index]
+    total_cost = 0.0
+    current_city = start_city_index
+
+    for _ in range(n - 1):
+        # Empty cells make ring searches slow, so coarsen the grid as it drains
+        if remaining * 4 < grid.size:
+            grid = _NNGrid(pts, grid.cities())
+
+        nearest_city, min_dist = grid.nearest(xs[current_city], ys[current_city], xs, ys)
+        grid.remove(nearest_city, xs[nearest_city], ys[nearest_city])
+        remaining -= 1
+
+        total_cost += min_dist
+        current_city = nearest_city
+        path.append(current_city)
+
+    # adds cost from last city to starting city
+    total_cost += math.hypot(xs[current_city] - xs[start_city_index],
+                             ys[current_city] - ys[start_city_index])
+    path.append(start_city_index)
+
+    return path, total_cost
+
+
+class _NNGrid:
+    """Uniform grid of cell buckets over a set of unvisited cities."""
+
+    def __init__(self, pts, cities):
+        self.size = max(len(cities), 1)
+        sub = pts[cities] if cities else pts[:1]
+        self.lo_x, self.lo_y = sub.min(axis=0).tolist()
+        span = float((sub.max(axis=0) - sub.min(axis=0)).max())
+
+        # about two cities per cell
+        self.dim = max(1, int(math.sqrt(self.size / 2)))
+        self.cell = span / self.dim or 1.0
+
+        self.buckets = {}
+        for c in cities:
+            key = self._key(pts[c, 0], pts[c, 1])
+            self.buckets.setdefault(key, []).append(c)
+
+    def _key(self, x, y):
+        ix = min(max(int((x - self.lo_x) / self.cell), 0), self.dim - 1)
+        iy = min(max(int((y - self.lo_y) / self.cell), 0), self.dim - 1)
+        return ix, iy
+
+    def cities(self):
+        return [c for bucket in self.buckets.values() for c in bucket]
+
+    def remove(self, city, x, y):
+        key = self._key(x, y)
+        bucket = self.buckets[key]
+        bucket.remove(city)
+        if not bucket:
+            del self.buckets[key]
+
+    def nearest(self, x, y, xs, ys):
+        ix, iy = self._key(x, y)
+        nearest_city = -1
+        min_dist = math.inf
+        r = 0
+        while True:
+            for gx in range(ix - r, ix + r + 1):
+                edge = r == 0 or gx == ix - r or gx == ix + r
+                for gy in (range(iy - r, iy + r + 1) if edge else (iy - r, iy + r)):
+                    for c in self.buckets.get((gx, gy), ()):
+                        dist = math.hypot(xs[c] - x, ys[c] - y)
+                        if dist < min_dist or (dist == min_dist and c < nearest_city):
+                            min_dist = dist
+                            nearest_city = c
+            # Anything outside rings 0..r is more than r cells away (this
+            # still holds when the current city is clamped into a border cell)
+            if nearest_city != -1 and min_dist < r * self.cell:
+                break
+            if r >= self.dim:
+                break
+            r += 1
+
+        return nearest_city, min_dist
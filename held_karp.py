@@ -1,22 +1,56 @@
 # source https://github.com/carl-olin/held-karp
 
 import itertools
-import random
+import multiprocessing
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 
+import numpy as np
 
-def held_karp(dists):
+import instances
+import matrix_io
+
+# Number of subsets relaxed per vectorized step in the array engine. Bounds the
+# size of the temporary (chunk, n - 1) candidate matrix.
+_HK_CHUNK = 1 << 15
+
+# Below this many cities held_karp_parallel just runs held_karp_array: the
+# whole serial solve (about 40 ms at n=16, 0.2 s at n=18) is comparable to
+# the ~0.1 s of starting the pool and paying one barrier per layer, so
+# workers only pay off from n=20 (1.1 s serially), where the middle layers
+# hold ~10^5 subsets.
+PARALLEL_HK_MIN_N = 20
+
+# Per-worker state for held_karp_parallel, set once by _init_hk_worker
+_hk_worker = None
+
+
+def dict_table_bytes(n):
+    """
+    Rough peak memory of held_karp's table: (n-1) * 2^(n-2) dict entries,
+    each a tuple key and a (cost, parent) tuple value, about 200 bytes.
+    """
+    m = n - 1
+    return m * 2 ** (m - 1) * 200 if m > 0 else 0
+
+
+def held_karp(dists, stats=None):
     """
     Implementation of Held-Karp, an algorithm that solves the Traveling
     Salesman Problem using dynamic programming with memoization.
 
     Parameters:
         dists: distance matrix
+        stats: optional instrumentation.SolveStats to fill in
 
     Returns:
         A tuple, (cost, path).
     """
     n = len(dists)
+    if stats is not None:
+        stats.begin()
 
     # Maps each subset of the nodes to the cost to reach that subset, as well
     # as what node it passed before reaching this subset.
@@ -25,20 +59,18 @@ def held_karp(dists):
 
     # Set transition cost from initial state
     for k in range(1, n):
-        C[(1 << k, k)] = (dists[0][k], 0)
+        C[(_subset_bits((k,)), k)] = (dists[0][k], 0)
 
     # Iterate subsets of increasing length and store intermediate results
     # in classic dynamic programming manner
     for subset_size in range(2, n):
         for subset in itertools.combinations(range(1, n), subset_size):
             # Set bits for all nodes in this subset
-            bits = 0
-            for bit in subset:
-                bits |= 1 << bit
+            bits = _subset_bits(subset)
 
             # Find the lowest cost to get to this subset
             for k in subset:
-                prev = bits & ~(1 << k)
+                prev = _remove_city(bits, k)
 
                 res = []
                 for m in subset:
@@ -47,8 +79,11 @@ def held_karp(dists):
                     res.append((C[(prev, m)][0] + dists[m][k], m))
                 C[(bits, k)] = min(res)
 
+    if stats is not None:
+        stats.lap('fill')
+
     # We're interested in all bits but the least significant (the start state)
-    bits = (2**n - 1) - 1
+    bits = _subset_bits(range(1, n))
 
     # Calculate optimal cost
     res = []
@@ -60,23 +95,325 @@ def held_karp(dists):
     path = []
     for i in range(n - 1):
         path.append(parent)
-        new_bits = bits & ~(1 << parent)
+        new_bits = _remove_city(bits, parent)
         _, parent = C[(bits, parent)]
         bits = new_bits
 
     # Add implicit start state
     path.append(0)
 
+    if stats is not None:
+        stats.lap('backtrack')
+        _hk_count(stats, n)
+        stats.peak('peak_dp_states', len(C))
+
     return opt, list(reversed(path))
 
 
-def generate_distances(n):
-    dists = [[0] * n for i in range(n)]
-    for i in range(n):
-        for j in range(i+1, n):
-            dists[i][j] = dists[j][i] = random.randint(1, 99)
+def _subset_bits(cities):
+    """
+    Bitmask of a set of cities in the encoding of held_karp, city c being
+    bit c. Python ints have no width limit, so any n fits. restricted_dp
+    encodes its sets of tour places the same way.
+    """
+    bits = 0
+    for c in cities:
+        bits |= 1 << c
+    return bits
 
-    return dists
+
+def _add_city(bits, city):
+    return bits | (1 << city)
+
+
+def _remove_city(bits, city):
+    return bits & ~(1 << city)
+
+
+def _has_city(bits, city):
+    return (bits >> city) & 1 == 1
+
+
+def _lowest_missing(bits):
+    """Smallest city not in the set."""
+    return ((bits + 1) & ~bits).bit_length() - 1
+
+
+def held_karp_array(dists, stats=None):
+    """
+    Array-backed Held-Karp. Same recurrence and tie-breaking as held_karp, but
+    the DP table lives in two flat NumPy arrays indexed by [subset, k] instead
+    of a dict of tuples, and the "min over m" step is vectorized across every
+    subset of a layer at once.
+
+    City c (1 <= c < n) is bit c - 1 of a subset, so the table has
+    2^(n-1) * (n-1) cells: roughly 2 GB at n=25 with integer distances.
+
+    Parameters:
+        dists: distance matrix (list of lists or 2-D array)
+        stats: optional instrumentation.SolveStats to fill in
+
+    Returns:
+        A tuple, (cost, path), identical to held_karp(dists).
+    """
+    if stats is not None:
+        stats.begin()
+    d = np.asarray(dists)
+    n = len(d)
+    if n < 2:
+        raise ValueError("held_karp_array needs at least 2 cities")
+
+    dtype, inf = _hk_cost_dtype(d)
+    d = d.astype(dtype)
+    m = n - 1
+
+    cost = np.full((1 << m, m), inf, dtype=dtype)
+    parent = np.zeros((1 << m, m), dtype=_hk_parent_dtype(n))
+
+    # Set transition cost from initial state
+    for k in range(m):
+        cost[1 << k, k] = d[0, k + 1]
+
+    if stats is not None:
+        stats.lap('setup')
+
+    popcounts = _subset_popcounts(m)
+    for subset_size in range(2, n):
+        _hk_fill(cost, parent, np.flatnonzero(popcounts == subset_size), d)
+
+    if stats is not None:
+        stats.lap('fill')
+
+    result = _hk_backtrack(cost, parent, d)
+
+    if stats is not None:
+        stats.lap('backtrack')
+        _hk_count(stats, n)
+        stats.peak('peak_dp_states', cost.size)
+        stats.peak('peak_dp_bytes', cost.nbytes + parent.nbytes)
+
+    return result
+
+
+def held_karp_parallel(dists, workers=None, stats=None):
+    """
+    Layer-parallel Held-Karp. Subsets of one size only read the layer
+    before them, so each layer is split across worker processes that relax
+    their share directly in a shared-memory DP table; the layer is complete
+    (the barrier) once every share has returned. The path is reconstructed
+    with the same backtrack as held_karp_array, so the result is identical.
+
+    Instances smaller than PARALLEL_HK_MIN_N cities run serially.
+
+    Parameters:
+        dists: distance matrix (list of lists or 2-D array)
+        workers: number of worker processes (default: CPU count)
+        stats: optional instrumentation.SolveStats to fill in
+
+    Returns:
+        A tuple, (cost, path), identical to held_karp(dists).
+    """
+    n = len(dists)
+    if n < PARALLEL_HK_MIN_N:
+        return held_karp_array(dists, stats)
+
+    if stats is not None:
+        stats.begin()
+
+    workers = workers or os.cpu_count() or 1
+    d = np.asarray(dists)
+    dtype, inf = _hk_cost_dtype(d)
+    d = d.astype(dtype)
+    m = n - 1
+    shape = (1 << m, m)
+    parent_dtype = _hk_parent_dtype(n)
+
+    segments = []
+    cost = parent = masks = None
+    try:
+        cost_shm, parent_shm, masks_shm = (
+            _shared(segments, shape[0] * shape[1] * np.dtype(dtype).itemsize),
+            _shared(segments, shape[0] * shape[1] * np.dtype(parent_dtype).itemsize),
+            _shared(segments, shape[0] * np.dtype(np.int32).itemsize))
+        cost = np.ndarray(shape, dtype, buffer=cost_shm.buf)
+        parent = np.ndarray(shape, parent_dtype, buffer=parent_shm.buf)
+        cost[:] = inf
+        parent[:] = 0
+
+        # Every subset once, grouped by size: layer s is
+        # masks[offsets[s]:offsets[s + 1]], so workers get index ranges
+        # instead of each rescanning all 2^m subsets
+        popcounts = _subset_popcounts(m)
+        masks = np.ndarray(shape[0], np.int32, buffer=masks_shm.buf)
+        masks[:] = np.argsort(popcounts, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(popcounts, minlength=m + 1))])
+        del popcounts
+
+        # Set transition cost from initial state
+        for k in range(m):
+            cost[1 << k, k] = d[0, k + 1]
+
+        ctx = multiprocessing.get_context()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=_init_hk_worker,
+                                 initargs=(cost_shm.name, parent_shm.name, masks_shm.name, shape,
+                                           np.dtype(dtype).str, np.dtype(parent_dtype).str, d)) as pool:
+            # A few shares per worker keeps the layers balanced
+            parts = 4 * workers
+            for subset_size in range(2, n):
+                bounds = np.linspace(offsets[subset_size], offsets[subset_size + 1],
+                                     parts + 1).astype(np.int64)
+                tasks = [(int(lo), int(hi)) for lo, hi in zip(bounds, bounds[1:]) if hi > lo]
+                # Waiting for every share is the barrier between layers
+                list(pool.map(_hk_fill_share, tasks))
+
+        if stats is not None:
+            stats.lap('fill')
+
+        result = _hk_backtrack(cost, parent, d)
+
+        if stats is not None:
+            stats.lap('backtrack')
+            _hk_count(stats, n)
+            stats.peak('peak_dp_states', cost.size)
+            stats.peak('peak_dp_bytes', cost.nbytes + parent.nbytes)
+    finally:
+        # Drop the views before the buffers are released; close() refuses
+        # while they are alive, and unlink must run even if it fails
+        cost = parent = masks = None
+        for shm in segments:
+            try:
+                shm.close()
+            finally:
+                shm.unlink()
+
+    return result
+
+
+def _shared(segments, size):
+    """Creates a shared memory segment and records it for cleanup."""
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    segments.append(shm)
+    return shm
+
+
+def _init_hk_worker(cost_name, parent_name, masks_name, shape, dtype, parent_dtype, d):
+    global _hk_worker
+
+    cost_shm = shared_memory.SharedMemory(name=cost_name)
+    parent_shm = shared_memory.SharedMemory(name=parent_name)
+    masks_shm = shared_memory.SharedMemory(name=masks_name)
+    _hk_worker = {
+        # Keep the segments referenced for the lifetime of the worker
+        'shm': (cost_shm, parent_shm, masks_shm),
+        'cost': np.ndarray(shape, dtype, buffer=cost_shm.buf),
+        'parent': np.ndarray(shape, parent_dtype, buffer=parent_shm.buf),
+        'masks': np.ndarray(shape[0], np.int32, buffer=masks_shm.buf),
+        'd': d,
+    }
+
+
+def _hk_fill_share(task):
+    """Relax one contiguous share, masks[lo:hi], of the subsets of a layer."""
+    lo, hi = task
+    w = _hk_worker
+    _hk_fill(w['cost'], w['parent'], w['masks'][lo:hi].astype(np.int64), w['d'])
+
+
+def _hk_count(stats, n):
+    """
+    Closed-form work of a full Held-Karp solve over m = n - 1 cities:
+    m * 2^(m-1) (subset, k) states, and m(m-1) * 2^(m-2) relaxations, each
+    reading one earlier state and one distance, plus the 2m distances of
+    the first and last steps.
+    """
+    m = n - 1
+    relaxations = m * (m - 1) * 2 ** (m - 2) if m >= 2 else 0
+    stats.add('states_expanded', m * 2 ** (m - 1))
+    stats.add('state_lookups', relaxations)
+    stats.add('distance_lookups', relaxations + 2 * m)
+
+
+def _subset_popcounts(m):
+    """Number of set bits of every subset of m cities, indexed by bitmask."""
+    counts = np.zeros(1 << m, dtype=np.uint8)
+    for i in range(m):
+        counts[1 << i:1 << (i + 1)] = counts[:1 << i] + 1
+    return counts
+
+
+def _hk_cost_dtype(d):
+    """
+    Narrowest exact dtype for DP costs, plus the sentinel used for subsets
+    that do not contain k. The sentinel plus any distance must not overflow
+    and must stay above every real path cost.
+    """
+    if not np.issubdtype(d.dtype, np.integer):
+        return np.float64, np.inf
+
+    largest = int(np.abs(d).max()) if d.size else 0
+    bound = largest * (len(d) + 1)
+    for dtype in (np.int32, np.int64):
+        inf = np.iinfo(dtype).max // 2
+        if bound < inf:
+            return dtype, inf
+    raise OverflowError("distances too large for an exact integer DP table")
+
+
+def _hk_parent_dtype(n):
+    return np.int8 if n <= np.iinfo(np.int8).max else np.int16
+
+
+def _hk_fill(cost, parent, masks, d):
+    """
+    Relax every (subset, k) state for the given subsets, which must all have
+    the same size so that their predecessors are already final.
+    """
+    m = cost.shape[1]
+    # into[i, k] is the distance from city i + 1 to city k + 1
+    into = d[1:, 1:]
+    for k in range(m):
+        with_k = masks[(masks >> k) & 1 == 1]
+        for start in range(0, len(with_k), _HK_CHUNK):
+            block = with_k[start:start + _HK_CHUNK]
+            # cost[prev, k] is the sentinel, so m == k never wins
+            cand = cost[block ^ (1 << k)] + into[:, k]
+            # argmin returns the first minimum, i.e. the smallest m, which is
+            # the same tie-break as min() over (cost, m) tuples
+            best = cand.argmin(axis=1)
+            cost[block, k] = cand[np.arange(len(block)), best]
+            parent[block, k] = best + 1
+
+
+def _hk_backtrack(cost, parent, d):
+    """Close the tour back to city 0 and walk the parent table."""
+    m = cost.shape[1]
+    bits = (1 << m) - 1
+
+    # Calculate optimal cost
+    res = cost[bits] + d[1:, 0]
+    k = int(res.argmin())
+    opt = res[k].item()
+
+    # Backtrack to find full path
+    path = []
+    city = k + 1
+    for i in range(m):
+        path.append(city)
+        prev_city = int(parent[bits, city - 1])
+        bits &= ~(1 << (city - 1))
+        city = prev_city
+
+    # Add implicit start state
+    path.append(0)
+
+    return opt, list(reversed(path))
+
+
+def generate_distances(n, seed=None):
+    # a DistanceProvider above instances.MATRIX_MAX_N cities
+    dists = instances.generate('uniform', n, seed, low=1, high=99)
+    return dists.tolist() if isinstance(dists, np.ndarray) else dists
 
 
 def read_distances(filename):
@@ -97,6 +434,8 @@ if __name__ == '__main__':
 
     if arg.endswith('.csv'):
         dists = read_distances(arg)
+    elif arg.endswith('.tspd'):
+        dists = matrix_io.load_matrix(arg)
     else:
         dists = generate_distances(int(arg))
 
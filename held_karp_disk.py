@@ -0,0 +1,288 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+import held_karp
+import instances
+import matrix_io
+from held_karp import _HK_CHUNK, _hk_cost_dtype, _hk_count, _hk_parent_dtype
+
+STATE_FILE = 'state.json'
+STATE_VERSION = 1
+
+
+def held_karp_disk(dists, workdir=None, checkpoint_every=60.0, keep=False, stats=None):
+    """
+    Bounded-memory Held-Karp. Runs the recurrence of held_karp one subset
+    size (layer) at a time and keeps only the previous and current layers
+    in RAM. Parent pointers, the only part of older layers the backtrack
+    needs, are streamed to one memory-mapped file per layer in workdir.
+
+    A layer stores one cost per (subset, k in subset): the subsets of size
+    s are numbered by their rank in increasing mask order (the
+    combinatorial number system), so a layer holds C(n-1, s) * s values
+    instead of the 2^(n-1) * (n-1) cells of held_karp_array, and a subset's
+    predecessor is found by computing its rank rather than through a table
+    over every mask.
+
+    After a layer completes, the current layer's costs are checkpointed if
+    checkpoint_every seconds have passed since the last checkpoint. Calling
+    again with the same workdir resumes an interrupted solve after the last
+    checkpointed layer; a workdir holding another instance is refused.
+
+    Parameters:
+        dists: distance matrix (list of lists or 2-D array)
+        workdir: directory for parent files and checkpoints (default: a
+            temporary directory)
+        checkpoint_every: seconds between checkpoints; 0 checkpoints every
+            layer
+        keep: leave the files in workdir after a successful solve
+        stats: optional instrumentation.SolveStats to fill in
+
+    Returns:
+        A tuple, (cost, path), identical to held_karp(dists).
+    """
+    if stats is not None:
+        stats.begin()
+    d = np.asarray(dists)
+    n = len(d)
+    if n < 2:
+        raise ValueError("held_karp_disk needs at least 2 cities")
+
+    dtype, inf = _hk_cost_dtype(d)
+    d = d.astype(dtype)
+    m = n - 1
+    binom = _binomials(m)
+    digest = _digest(d)
+
+    own_dir = workdir is None
+    if own_dir:
+        workdir = tempfile.mkdtemp(prefix='held_karp_')
+    os.makedirs(workdir, exist_ok=True)
+
+    state = _read_state(workdir)
+    if state is not None:
+        if state['digest'] != digest:
+            raise ValueError(f"{workdir} holds a checkpoint of a different instance")
+        layer = state['layer']
+        prev = np.load(os.path.join(workdir, f'cost_{layer:02d}.npy'))
+    else:
+        # Set transition cost from initial state: {k} has rank k
+        layer = 1
+        prev = d[0, 1:].copy()
+        parent = _open_parents(workdir, 1, m, n)
+        parent[:] = 0
+        parent.flush()
+        del parent
+        _checkpoint(workdir, digest, n, 1, prev)
+
+    if stats is not None:
+        stats.lap('setup')
+
+    last_checkpoint = time.perf_counter()
+    peak_bytes = 0
+    into = d[1:, 1:]
+    for subset_size in range(layer + 1, n):
+        cur = np.full(int(binom[m, subset_size]) * subset_size, inf, dtype=dtype)
+        parent = _open_parents(workdir, subset_size, m, n)
+        _fill_layer(prev, cur, parent, subset_size, into, binom)
+        parent.flush()
+        del parent
+        peak_bytes = max(peak_bytes, prev.nbytes + cur.nbytes)
+        prev = cur
+
+        if time.perf_counter() - last_checkpoint >= checkpoint_every:
+            _checkpoint(workdir, digest, n, subset_size, prev)
+            last_checkpoint = time.perf_counter()
+
+    if stats is not None:
+        stats.lap('fill')
+
+    # Calculate optimal cost; the full subset is the only one of layer m
+    res = prev + d[1:, 0]
+    k = int(res.argmin())
+    opt = res[k].item()
+
+    # Backtrack to find full path
+    path = []
+    bits = (1 << m) - 1
+    city = k + 1
+    for subset_size in range(m, 0, -1):
+        path.append(city)
+        parents = np.load(os.path.join(workdir, f'parent_{subset_size:02d}.npy'), mmap_mode='r')
+        below = bits & ((1 << (city - 1)) - 1)
+        prev_city = int(parents[_rank(bits, binom) * subset_size + bin(below).count('1')])
+        del parents
+        bits &= ~(1 << (city - 1))
+        city = prev_city
+
+    # Add implicit start state
+    path.append(0)
+
+    if stats is not None:
+        stats.lap('backtrack')
+        _hk_count(stats, n)
+        stats.peak('peak_dp_bytes', peak_bytes)
+
+    if own_dir and not keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+    elif not keep:
+        _remove_files(workdir)
+
+    return opt, list(reversed(path))
+
+
+def _fill_layer(prev, cur, parent, subset_size, into, binom):
+    """
+    Relax every (subset, k) state of one layer from the previous layer, a
+    chunk of subsets at a time.
+    """
+    s = subset_size
+    total = len(cur) // s
+    prev2 = prev.reshape(-1, s - 1)
+    cur2 = cur.reshape(-1, s)
+    par2 = parent.reshape(-1, s)
+    index = np.arange(s)
+
+    for start in range(0, total, _HK_CHUNK):
+        ranks = np.arange(start, min(start + _HK_CHUNK, total), dtype=np.int64)
+        # cities of each subset, ascending
+        members = _unrank(ranks, s, binom)
+        rows = np.arange(len(ranks))
+
+        # rank of the subset without its j-th member: members before j keep
+        # their place in the combinadic sum, members after j move down one
+        keep = binom[members, index + 1]
+        shift = binom[members, index]
+        before = np.cumsum(keep, axis=1) - keep
+        after = np.cumsum(shift[:, ::-1], axis=1)[:, ::-1] - shift
+
+        for j in range(s):
+            k = members[:, j]
+            prev_members = np.delete(members, j, axis=1)
+            cand = prev2[before[:, j] + after[:, j]] + into[prev_members, k[:, None]]
+            # members are ascending, so argmin's first minimum is the
+            # smallest m, the same tie-break as held_karp
+            best = cand.argmin(axis=1)
+            cur2[start:start + len(ranks), j] = cand[rows, best]
+            par2[start:start + len(ranks), j] = prev_members[rows, best] + 1
+
+
+def _binomials(m):
+    """binom[c, i] = C(c, i) for 0 <= c, i <= m."""
+    binom = np.zeros((m + 1, m + 1), dtype=np.int64)
+    binom[:, 0] = 1
+    for c in range(1, m + 1):
+        binom[c, 1:] = binom[c - 1, 1:] + binom[c - 1, :-1]
+    return binom
+
+
+def _unrank(ranks, size, binom):
+    """Members (ascending bit positions) of the subsets with the given ranks."""
+    ranks = ranks.copy()
+    m = len(binom) - 1
+    members = np.empty((len(ranks), size), dtype=np.int64)
+    for i in range(size, 0, -1):
+        column = binom[:m, i]
+        c = np.searchsorted(column, ranks, side='right') - 1
+        members[:, i - 1] = c
+        ranks -= column[c]
+    return members
+
+
+def _rank(bits, binom):
+    """Rank of a subset bitmask among the subsets of its size."""
+    rank = 0
+    i = 1
+    c = 0
+    while bits:
+        if bits & 1:
+            rank += int(binom[c, i])
+            i += 1
+        bits >>= 1
+        c += 1
+    return rank
+
+
+def _open_parents(workdir, subset_size, m, n):
+    shape = (math.comb(m, subset_size) * subset_size,)
+    return np.lib.format.open_memmap(os.path.join(workdir, f'parent_{subset_size:02d}.npy'),
+                                     mode='w+', dtype=_hk_parent_dtype(n), shape=shape)
+
+
+def _digest(d):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{len(d)}:{d.dtype.str}:".encode())
+    h.update(np.ascontiguousarray(d).tobytes())
+    return h.hexdigest()
+
+
+def _read_state(workdir):
+    path = os.path.join(workdir, STATE_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    if state.get('version') != STATE_VERSION:
+        raise ValueError(f"{path}: unsupported checkpoint version {state.get('version')}")
+    return state
+
+
+def _checkpoint(workdir, digest, n, layer, costs):
+    """
+    Saves a finished layer, then points the state file at it. Each file is
+    written under a temporary name and renamed, so a crash at any point
+    leaves the previous checkpoint usable.
+    """
+    cost_path = os.path.join(workdir, f'cost_{layer:02d}.npy')
+    with open(cost_path + '.tmp', 'wb') as f:
+        np.save(f, costs)
+    os.replace(cost_path + '.tmp', cost_path)
+
+    state_path = os.path.join(workdir, STATE_FILE)
+    with open(state_path + '.tmp', 'w') as f:
+        json.dump({'version': STATE_VERSION, 'n': n, 'digest': digest, 'layer': layer}, f)
+    os.replace(state_path + '.tmp', state_path)
+
+    for name in os.listdir(workdir):
+        if name.startswith('cost_') and name != f'cost_{layer:02d}.npy':
+            os.remove(os.path.join(workdir, name))
+
+
+def _remove_files(workdir):
+    for name in os.listdir(workdir):
+        if name == STATE_FILE or name.startswith(('cost_', 'parent_')):
+            os.remove(os.path.join(workdir, name))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Held-Karp with layers spilled to disk; rerun with the same "
+                    "workdir to resume an interrupted solve")
+    parser.add_argument('instance', help="CSV or .tspd distance matrix, or a number of cities")
+    parser.add_argument('workdir')
+    parser.add_argument('--checkpoint-every', type=float, default=60.0, help="seconds")
+    parser.add_argument('--keep', action='store_true', help="keep the files after solving")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="seed of a generated instance, so a resumed run sees the same one")
+    args = parser.parse_args(argv)
+
+    if args.instance.endswith('.csv'):
+        dists = held_karp.read_distances(args.instance)
+    elif args.instance.endswith('.tspd'):
+        dists = matrix_io.load_matrix(args.instance)
+    else:
+        dists = instances.load_instance('uniform', int(args.instance), args.seed)
+
+    print(held_karp_disk(dists, args.workdir, args.checkpoint_every, args.keep))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+import matrix_io
+from distances import CoordinateDistances, DistanceProvider
+
+FAMILIES = ('uniform', 'euclidean', 'clustered', 'asymmetric')
+
+# Bump when a generator changes, so old corpora are never mixed with new ones
+CORPUS_VERSION = 'v1'
+# A cache outside the source tree, so benchmarking leaves the checkout clean
+CORPUS_DIR = os.environ.get('TSP_INSTANCE_DIR', os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+    'tsp-instances'))
+
+# Above this many cities instances are providers computing distances on
+# demand instead of n x n matrices
+MATRIX_MAX_N = 5000
+
+# Side of the square the euclidean and clustered points are drawn in
+SCALE = 1000
+
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+class HashedDistances(DistanceProvider):
+    """
+    Uniform random integer distances in [low, high] that are never stored:
+    d[i][j] is a hash of (seed, i, j), so any row of a 100k-city instance
+    is computed in one vectorized pass and always comes out the same.
+    Symmetric unless symmetric=False; the diagonal is 0.
+    """
+
+    def __init__(self, n, seed, low=10, high=150, symmetric=True, cache_rows=256):
+        super().__init__(n, cache_rows)
+        self.key = _mix(np.array([seed], dtype=np.uint64))[0]
+        self.low = low
+        self.high = high
+        self.symmetric = symmetric
+
+    def dist(self, i, j):
+        return self.pairs(np.array([i]), np.array([j]))[0].item()
+
+    def row(self, i):
+        return self.pairs(np.full(self.n, i), np.arange(self.n))
+
+    def pairs(self, i, j):
+        i = np.asarray(i, dtype=np.uint64)
+        j = np.asarray(j, dtype=np.uint64)
+        if self.symmetric:
+            i, j = np.minimum(i, j), np.maximum(i, j)
+        h = _mix(self.key ^ (i * np.uint64(self.n) + j))
+        values = (h % np.uint64(self.high - self.low + 1)).astype(np.int64) + self.low
+        values[i == j] = 0
+        return values
+
+    def matrix(self):
+        """The full matrix in one pass."""
+        i, j = np.indices((self.n, self.n))
+        return self.pairs(i.ravel(), j.ravel()).reshape(self.n, self.n)
+
+
+def generate(family, n, seed=0, low=10, high=150):
+    """
+    Builds an instance of a family in one vectorized pass.
+
+    Families:
+        uniform     symmetric integer distances drawn uniformly from
+                    [low, high]
+        asymmetric  the same, but d[i][j] and d[j][i] drawn independently
+        euclidean   points uniform in a SCALE x SCALE square, distances
+                    rounded to the nearest integer (TSPLIB EUC_2D)
+        clustered   points in normal clusters of about 50 around uniform
+                    centres, distances rounded likewise
+
+    Up to MATRIX_MAX_N cities the result is an n x n int64 array. Beyond,
+    uniform and asymmetric give a HashedDistances provider with the same
+    distances the matrix would have held, and euclidean and clustered a
+    rounded CoordinateDistances provider over the points, again with the
+    same distances.
+
+    seed=None draws a fresh seed.
+    """
+    if family not in FAMILIES:
+        raise ValueError(f"unknown instance family {family!r}, expected one of {FAMILIES}")
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1, dtype=np.uint64)[0])
+
+    if family in ('uniform', 'asymmetric'):
+        provider = HashedDistances(n, _family_seed(family, n, seed), low, high,
+                                   symmetric=family == 'uniform')
+        return provider.matrix() if n <= MATRIX_MAX_N else provider
+
+    pts = points(family, n, seed)
+    if n > MATRIX_MAX_N:
+        return CoordinateDistances(pts, rounded=True)
+    return euclidean_matrix(pts)
+
+
+def points(family, n, seed=0):
+    """The points of a euclidean or clustered instance, an (n, 2) array."""
+    rng = np.random.default_rng(_family_seed(family, n, seed))
+    if family == 'euclidean':
+        return rng.uniform(0, SCALE, size=(n, 2))
+    if family == 'clustered':
+        clusters = max(1, n // 50)
+        centres = rng.uniform(0, SCALE, size=(clusters, 2))
+        spread = SCALE / (4 * np.sqrt(clusters))
+        pts = centres[rng.integers(0, clusters, size=n)] + rng.normal(0, spread, size=(n, 2))
+        return np.clip(pts, 0, SCALE)
+    raise ValueError(f"{family!r} instances have no points")
+
+
+def euclidean_matrix(pts):
+    """Rounded euclidean distances between all pairs of points."""
+    diff = pts[:, None, :] - pts[None, :, :]
+    return np.rint(np.sqrt((diff * diff).sum(axis=2))).astype(np.int64)
+
+
+def instance_path(family, n, seed=0, root=None):
+    """Where the corpus keeps an instance: a .tspd matrix or a .npy of points."""
+    ext = 'npy' if n > MATRIX_MAX_N else 'tspd'
+    return os.path.join(root or CORPUS_DIR, CORPUS_VERSION, family, f'n{n}_s{seed}.{ext}')
+
+
+def load_instance(family, n, seed=0, root=None):
+    """
+    An instance from the on-disk corpus, generated and saved on first use.
+    Matrices are memory-mapped, so loading costs nothing until rows are
+    read. Large uniform and asymmetric instances are HashedDistances and
+    need no file.
+
+    Returns:
+        np.memmap of shape (n, n), or a DistanceProvider above MATRIX_MAX_N
+    """
+    if n > MATRIX_MAX_N and family in ('uniform', 'asymmetric'):
+        return generate(family, n, seed)
+
+    path = instance_path(family, n, seed, root)
+    if not os.path.exists(path):
+        _save(family, n, seed, path)
+    if path.endswith('.npy'):
+        return CoordinateDistances(np.load(path, mmap_mode='r'), rounded=True)
+    return matrix_io.load_matrix(path)
+
+
+def build_corpus(families=FAMILIES, sizes=range(3, 31), seeds=(0,), root=None, log=print):
+    """Pre-generates every (family, n, seed) instance that is not on disk yet."""
+    for family in families:
+        for n in sizes:
+            for seed in seeds:
+                path = instance_path(family, n, seed, root)
+                if os.path.exists(path):
+                    continue
+                _save(family, n, seed, path)
+                if log:
+                    log(path)
+
+
+def _save(family, n, seed, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # written under a unique temporary name, so a reader never sees half a
+    # file and concurrent writers of the same instance do not collide
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix='.tmp',
+                                     delete=False) as f:
+        tmp = f.name
+        if path.endswith('.npy'):
+            np.save(f, points(family, n, seed))
+    try:
+        if not path.endswith('.npy'):
+            m = generate(family, n, seed)
+            matrix_io.write_matrix(tmp, m, dtype=np.int32 if m.max(initial=0) < 2 ** 31 else np.int64)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def _family_seed(family, n, seed):
+    # distinct streams per (family, n, seed), so an instance does not
+    # change when other sizes or families are generated
+    key = (seed * 1_000_003 + n * 31 + FAMILIES.index(family)) % 2 ** 64
+    return int(_mix(np.array([key], dtype=np.uint64))[0])
+
+
+def _mix(x):
+    """splitmix64 finalizer over a uint64 array (wraps modulo 2^64)."""
+    x = x + _GOLDEN
+    x = (x ^ (x >> np.uint64(30))) * _M1
+    x = (x ^ (x >> np.uint64(27))) * _M2
+    return x ^ (x >> np.uint64(31))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-generate the instance corpus")
+    parser.add_argument('--families', nargs='+', default=list(FAMILIES), choices=FAMILIES)
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(range(3, 31)))
+    parser.add_argument('--seeds', nargs='+', type=int, default=[0])
+    parser.add_argument('--root', default=None, help=f"corpus directory (default {CORPUS_DIR})")
+    args = parser.parse_args(argv)
+    build_corpus(args.families, args.sizes, args.seeds, args.root)
+
+
+if __name__ == '__main__':
+    main()
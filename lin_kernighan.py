@@ -0,0 +1,222 @@
+import random
+import time
+
+import greedy_nearestneighbor
+from distances import as_distances
+from local_search import EPS, ArrayTour, neighbour_lists, or_opt_move
+from tour_eval import tour_cost
+
+
+def solve_lk_tsp(dist_matrix, time_budget=1.0, start_tour=None, neighbours=8,
+                 max_depth=6, seed=None, stats=None):
+    """
+    Lin-Kernighan style heuristic for large symmetric instances.
+
+    Each LK move is a chain of up to max_depth sequential 2-opt exchanges
+    (remove t1-t2, add t2-t3, remove t3-t4, ...) where every added edge goes
+    to a candidate neighbour and the chain is rolled back to its best
+    closing point. Or-opt segment moves polish what LK leaves. Once the
+    tour is locally optimal, segment-local double-bridge kicks perturb it
+    and the search repeats (iterated LK), keeping the best tour, until the
+    time budget runs out.
+
+    The tour is an array plus a position index; reversals flip the shorter
+    side, so a move costs O(n) at worst and much less on typical moves.
+
+    Parameters:
+        dist_matrix: symmetric distance matrix (list of lists, 2-D array or
+            DistanceProvider)
+        time_budget: seconds to spend before returning the best tour
+        start_tour: initial tour (closed or open); nearest neighbour if None
+        neighbours: candidate list length, or precomputed neighbour_lists
+        max_depth: maximum number of exchanges in one LK move
+        seed: seed for the kick positions
+        stats: optional instrumentation.SolveStats to fill in
+
+    Returns:
+        tuple: (path, total_cost), the tour closed and starting at the
+        same city as the initial tour
+    """
+    if stats is not None:
+        stats.begin()
+    deadline = time.perf_counter() + time_budget
+    d = as_distances(dist_matrix)
+    n = len(d)
+
+    if start_tour is None:
+        start_tour, _ = greedy_nearestneighbor.solve_nn_tsp_array(d, stats=stats)
+    tour = list(start_tour)
+    if len(tour) > 1 and tour[0] == tour[-1]:
+        tour.pop()
+    start = tour[0]
+
+    if n >= 8:
+        if isinstance(neighbours, int):
+            neighbours = neighbour_lists(d, neighbours)
+        if stats is not None:
+            stats.lap('neighbours')
+        tour = _iterated_lk(tour, d, neighbours, max_depth, deadline, random.Random(seed), stats)
+
+    # rotate back to the original start city
+    i = tour.index(start)
+    tour = tour[i:] + tour[:i] + [start]
+    return tour, tour_cost(d, tour)
+
+
+def _iterated_lk(tour, d, neighbours, max_depth, deadline, rng, stats=None):
+    t = ArrayTour(tour)
+    n = t.n
+    active = [False] * n
+
+    _optimize(t, d, neighbours, max_depth, range(n), active, deadline, stats)
+    if stats is not None:
+        stats.lap('descent')
+
+    # Changes after a kick are journaled so a worse result can be undone
+    # without copying the tour
+    t.journal = []
+    window = min(50, n - 2)
+    kicks = accepted = 0
+    while time.perf_counter() < deadline:
+        gain, touched = _double_bridge(t, d, rng, window)
+        gain += _optimize(t, d, neighbours, max_depth, touched, active, deadline, stats)
+        kicks += 1
+        if gain < -EPS:
+            t.undo()
+        else:
+            accepted += 1
+        del t.journal[:]
+
+    if stats is not None:
+        stats.lap('kicks')
+        stats.add('kicks', kicks)
+        stats.add('kicks_accepted', accepted)
+    return t.tour
+
+
+def _optimize(t, d, neighbours, max_depth, queue, active, deadline, stats=None):
+    """
+    Applies LK and Or-opt moves from every city in the don't-look queue
+    until none improves or the deadline passes. Returns the total gain.
+    """
+    queue = list(queue)
+    for c in queue:
+        active[c] = True
+
+    total_gain = 0
+    steps = 0
+    moves = 0
+    while queue:
+        steps += 1
+        if steps & 255 == 0 and time.perf_counter() >= deadline:
+            for c in queue:
+                active[c] = False
+            break
+
+        a = queue.pop()
+        active[a] = False
+
+        touched = _lk_move(t, d, neighbours, a, max_depth)
+        if not touched:
+            touched = or_opt_move(t, d, neighbours, a)
+        if not touched:
+            continue
+
+        gain, cities = touched
+        total_gain += gain
+        moves += 1
+        for c in cities:
+            if not active[c]:
+                active[c] = True
+                queue.append(c)
+
+    if stats is not None:
+        stats.add('moves_applied', moves)
+    return total_gain
+
+
+def _lk_move(t, d, neighbours, t1, max_depth):
+    """
+    One LK move from t1, trying both tour neighbours as t2. Returns
+    (gain, touched cities) or None, leaving the tour unchanged if None.
+    """
+    for start_flipped in (False, True):
+        # flipped means the tour's direction is the reverse of the array's
+        flipped = start_flipped
+
+        def succ(c):
+            return t.prev(c) if flipped else t.next(c)
+
+        def reverse(x, y):
+            nonlocal flipped
+            flipped ^= t.reverse(y, x) if flipped else t.reverse(x, y)
+
+        t2 = succ(t1)
+        g = d[t1, t2]
+        added = set()
+        removed = {(min(t1, t2), max(t1, t2))}
+        moves = []
+        best_gain = EPS
+        best_depth = 0
+
+        for depth in range(max_depth):
+            # pick t3 maximising the gain of the resulting 2-opt exchange
+            choice = None
+            best_g = -1
+            for t3 in neighbours[t2]:
+                g1 = g - d[t2, t3]
+                if g1 <= EPS:
+                    break
+                if t3 == t1 or t3 == succ(t2) or (min(t2, t3), max(t2, t3)) in removed:
+                    continue
+                # t4 precedes t3, so the tour t1 t2 .. t4 t3 becomes t1 t4 .. t2 t3
+                t4 = t.next(t3) if flipped else t.prev(t3)
+                if (min(t3, t4), max(t3, t4)) in added:
+                    continue
+                if g1 + d[t3, t4] > best_g:
+                    best_g = g1 + d[t3, t4]
+                    choice = (t3, t4)
+            if choice is None:
+                break
+
+            t3, t4 = choice
+            reverse(t2, t4)
+            moves.append((t2, t3, t4))
+            added.add((min(t2, t3), max(t2, t3)))
+            removed.add((min(t3, t4), max(t3, t4)))
+
+            g = best_g
+            closing = g - d[t4, t1]
+            if closing > best_gain:
+                best_gain = closing
+                best_depth = depth + 1
+            t2 = t4
+
+        # roll back the exchanges past the best closing point; after each
+        # move the path t4 .. t2 sits where t2 .. t4 was
+        for t2_, t3_, t4_ in reversed(moves[best_depth:]):
+            reverse(t4_, t2_)
+
+        if best_depth:
+            touched = {t1}
+            for move in moves[:best_depth]:
+                touched.update(move)
+            return best_gain, touched
+
+    return None
+
+
+def _double_bridge(t, d, rng, window):
+    """
+    Segment-local double bridge: A B C D -> A C B D with B and C short, done
+    as three reversals. Returns (gain, touched cities); the gain is negative.
+    """
+    n = t.n
+    a = rng.randrange(n)
+    cuts = sorted(rng.sample(range(1, window + 1), 2))
+    at = [t.tour[(t.pos[a] + k) % n] for k in (0, 1, cuts[0], cuts[0] + 1, cuts[1], cuts[1] + 1)]
+    a1, b1, b2, c1, c2, d1 = at[0], at[1], at[2], at[3], at[4], at[5]
+
+    gain = (d[a1, b1] + d[b2, c1] + d[c2, d1]) - (d[a1, c1] + d[c2, b1] + d[b2, d1])
+    t.reverse_all([(b1, c2), (c2, c1), (b2, b1)])
+    return gain, (a1, b1, b2, c1, c2, d1)
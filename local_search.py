@@ -0,0 +1,284 @@
+import time
+from collections import deque
+
+import numpy as np
+
+from distances import DistanceProvider, as_distances, is_symmetric
+from tour_eval import tour_cost
+
+# Improvements smaller than this are treated as rounding noise
+EPS = 1e-9
+
+def neighbour_lists(dist_matrix, k=8):
+    """
+    Candidate neighbour lists: the k nearest other cities of every city,
+    nearest first.
+
+    Parameters:
+        dist_matrix: distance matrix (list of lists, 2-D array or
+            DistanceProvider; providers are read one row at a time)
+        k: number of candidates per city
+
+    Returns:
+        list[list[int]]: neighbours[c] for every city c
+    """
+    d = as_distances(dist_matrix)
+    n = len(d)
+    k = min(k, n - 1)
+    if k <= 0:
+        return [[] for _ in range(n)]
+
+    if not isinstance(d, DistanceProvider):
+        return _nearest(d.astype(float), np.arange(n), k)
+    return [_nearest(d.row(i)[None, :].astype(float), [i], k)[0] for i in range(n)]
+
+
+def _nearest(rows, cities, k):
+    rows = rows.copy()
+    rows[np.arange(len(rows)), cities] = np.inf
+    idx = np.argpartition(rows, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(rows, idx, axis=1).argsort(axis=1, kind='stable')
+    return np.take_along_axis(idx, order, axis=1).tolist()
+
+
+def improve_tour(tour, dist_matrix, neighbours=8, or_opt=True, deadline=None, stats=None):
+    """
+    Improves a tour with 2-opt and Or-opt moves until no candidate move
+    helps. Only moves that add an edge to one of a city's candidate
+    neighbours are tried, cities whose surroundings have not changed are
+    skipped (don't-look bits), and every move is scored from the handful of
+    edges it changes, so one pass is close to linear in n.
+
+    Distances must be symmetric: 2-opt reverses tour segments and scores
+    a move only by the edges at its ends, which on an asymmetric matrix
+    misjudges the cost of the reversed edges, so moves could repeat
+    forever.
+
+    Parameters:
+        tour: tour from any solver, either closed ([0, ..., 0]) or open
+        dist_matrix: symmetric distance matrix or DistanceProvider
+        neighbours: candidate list length, or precomputed neighbour_lists
+        or_opt: also try moving segments of 1 to 3 cities
+        deadline: time.perf_counter() value to stop at, keeping the moves
+            made so far (default: run to a local optimum)
+        stats: optional instrumentation.SolveStats to fill in
+
+    Returns:
+        tuple: (tour, total_cost), the tour closed and starting at the
+        same city as the input
+
+    Raises:
+        ValueError: if the matrix is not symmetric
+    """
+    if stats is not None:
+        stats.begin()
+    d = as_distances(dist_matrix)
+    if not is_symmetric(d):
+        raise ValueError("local search needs a symmetric distance matrix")
+    tour = list(tour)
+    if len(tour) > 1 and tour[0] == tour[-1]:
+        tour.pop()
+    start = tour[0]
+    n = len(tour)
+
+    if n >= 4:
+        if isinstance(neighbours, int):
+            neighbours = neighbour_lists(d, neighbours)
+        if stats is not None:
+            stats.lap('neighbours')
+        t = ArrayTour(tour)
+        _local_search(t, d, neighbours, range(n), or_opt, deadline=deadline, stats=stats)
+        tour = t.tour
+        if stats is not None:
+            stats.lap('search')
+
+    # rotate back to the original start city
+    i = tour.index(start)
+    tour = tour[i:] + tour[:i] + [start]
+    return tour, tour_cost(d, tour)
+
+
+def two_opt(tour, dist_matrix, neighbours=8, deadline=None, stats=None):
+    """improve_tour restricted to 2-opt moves."""
+    return improve_tour(tour, dist_matrix, neighbours, or_opt=False, deadline=deadline,
+                        stats=stats)
+
+
+class ArrayTour:
+    """
+    Tour as a city array plus a position index, with in-place reversal.
+    When journal is a list, every physical reversal is logged to it so a
+    run of moves can be rolled back with undo().
+    """
+
+    def __init__(self, tour):
+        self.tour = list(tour)
+        self.n = len(self.tour)
+        self.pos = [0] * self.n
+        for i, c in enumerate(self.tour):
+            self.pos[c] = i
+        self.journal = None
+
+    def next(self, c):
+        return self.tour[(self.pos[c] + 1) % self.n]
+
+    def prev(self, c):
+        return self.tour[(self.pos[c] - 1) % self.n]
+
+    def reverse(self, x, y):
+        """
+        Reverses the path running forward from x to y. The shorter of that
+        path and its complement is reversed, which gives the same cycle;
+        returns True when the complement was used, i.e. when the forward
+        direction of the array is now the reverse of the intended tour.
+        """
+        n = self.n
+        i = self.pos[x]
+        length = (self.pos[y] - i) % n + 1
+        flipped = 2 * length > n
+        if flipped:
+            i = (i + length) % n
+            length = n - length
+        self._reverse_positions(i, length)
+        if self.journal is not None:
+            self.journal.append((i, length))
+        return flipped
+
+    def undo(self, mark=0):
+        """Rolls back journaled reversals until only mark of them remain."""
+        while len(self.journal) > mark:
+            self._reverse_positions(*self.journal.pop())
+
+    def _reverse_positions(self, i, length):
+        tour, pos, n = self.tour, self.pos, self.n
+        j = (i + length - 1) % n
+        for _ in range(length // 2):
+            ci, cj = tour[i], tour[j]
+            tour[i], pos[cj] = cj, i
+            tour[j], pos[ci] = ci, j
+            i = (i + 1) % n
+            j = (j - 1) % n
+
+    def reverse_all(self, paths):
+        """Reverses each (x, y) path in turn, in the tour's intended direction."""
+        flipped = False
+        for x, y in paths:
+            flipped ^= self.reverse(y, x) if flipped else self.reverse(x, y)
+
+
+def _local_search(t, d, neighbours, queue, or_opt, active=None, deadline=None, stats=None):
+    """
+    Runs 2-opt / Or-opt on an ArrayTour until the don't-look queue is
+    empty or the deadline passes. Returns the total gain.
+    """
+    n = t.n
+    if active is None:
+        active = [False] * n
+    queue = deque(queue)
+    for c in queue:
+        active[c] = True
+
+    total_gain = 0
+    moves = 0
+    steps = 0
+    while queue:
+        steps += 1
+        if deadline is not None and steps & 255 == 0 and time.perf_counter() >= deadline:
+            for c in queue:
+                active[c] = False
+            break
+        a = queue.popleft()
+        active[a] = False
+
+        touched = two_opt_move(t, d, neighbours, a)
+        if not touched and or_opt and n >= 8:
+            touched = or_opt_move(t, d, neighbours, a)
+        if not touched:
+            continue
+
+        gain, cities = touched
+        total_gain += gain
+        moves += 1
+        for c in cities:
+            if not active[c]:
+                active[c] = True
+                queue.append(c)
+
+    if stats is not None:
+        stats.add('moves_applied', moves)
+    return total_gain
+
+
+def two_opt_move(t, d, neighbours, a):
+    """
+    Applies the first improving 2-opt move that links a to one of its
+    candidate neighbours. Returns (gain, touched cities) or None.
+    """
+    for succ in (True, False):
+        b = t.next(a) if succ else t.prev(a)
+        d_ab = d[a, b]
+        for c in neighbours[a]:
+            g1 = d_ab - d[a, c]
+            if g1 <= EPS:
+                # neighbours are sorted, so no later c can do better
+                break
+            e = t.next(c) if succ else t.prev(c)
+            if c == b or e == a:
+                continue
+            gain = g1 + d[c, e] - d[b, e]
+            if gain > EPS:
+                # replace (a, b), (c, e) with (a, c), (b, e)
+                if succ:
+                    t.reverse(b, c)
+                else:
+                    t.reverse(a, e)
+                return gain, (a, b, c, e)
+    return None
+
+
+def or_opt_move(t, d, neighbours, a):
+    """
+    Applies the first improving move of the 1-3 city segment starting at a
+    to a place next to a candidate neighbour of either segment end, in
+    whichever orientation is cheaper. Returns (gain, touched cities) or None.
+    """
+    n = t.n
+    pos = t.pos
+    for length in (1, 2, 3):
+        # segment a..e in tour order, between p and f
+        e = a
+        for _ in range(length - 1):
+            e = t.next(e)
+        p = t.prev(a)
+        f = t.next(e)
+        removed = d[p, a] + d[e, f] - d[p, f]
+        if removed <= EPS:
+            continue
+
+        seg_start = pos[a]
+        for c in neighbours[a] + neighbours[e]:
+            if (pos[c] - seg_start) % n < length:
+                continue
+            # insert between (c, next c) or (prev c, c)
+            for u, v in ((c, t.next(c)), (t.prev(c), c)):
+                if u == p or (pos[u] - seg_start) % n < length or (pos[v] - seg_start) % n < length:
+                    # u == p is the segment's current place
+                    continue
+                d_uv = d[u, v]
+                straight = d[u, a] + d[e, v] - d_uv
+                flipped = d[u, e] + d[a, v] - d_uv
+                gain = removed - min(straight, flipped)
+                if gain <= EPS:
+                    continue
+
+                # u after the segment: p a..e f..u v  ->  p f..u e..a v
+                # u before it:         u v..p a..e f  ->  u e..a v..p f
+                if (pos[u] - pos[f]) % n < (pos[p] - pos[f]) % n:
+                    moves = [(a, u), (u, f)]
+                else:
+                    moves = [(v, e), (p, v)]
+                if straight < flipped:
+                    moves.append((e, a))
+                t.reverse_all(moves)
+                return gain, (p, a, e, f, u, v)
+    return None
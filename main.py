@@ -1,12 +1,24 @@
 import matrix
 import exhaustive_search
+import branch_and_bound
 import held_karp
 import greedy_nearestneighbor
+import local_search
+from results_store import ResultsStore, run_metadata
+from instrumentation import SolveStats, profiled
 import time
-import json
 import numpy as np
 from typing import List
 
+# Prefix of each table column's result lists -> solver name in the store
+SOLVER_NAMES = {
+    'es': 'exhaustive',
+    'hk': 'held_karp',
+    'bb': 'branch_and_bound',
+    'nn': 'nn',
+    'ls': 'nn_ls',
+}
+
 def fmt(val):
     if val is None:
         return "N/A".ljust(8)
@@ -15,45 +27,76 @@ def fmt(val):
 def fmt_cost(val):
     return str(val).ljust(8)
 
-def tabulate(es_times, es_costs, hk_times, hk_costs, nn_times, nn_costs):
-    print("\n{:<6} {:<10} {:<15} {:<10} {:<15} {:<10} {:<15}".format(
-        "Run", "ES (s)", "ES (best cost)", "HK (s)", "HK (best cost)", "GNN (s)", "GNN (best cost)"
-    ))
-    print("-" * 88)
+def tabulate(columns):
+    """
+    Print the per-run table for one test case.
+
+    columns: list of (label, times, costs) per solver, each list holding one
+    entry per run (None where the solver was skipped).
+
+    Returns a list of (avg_time, best_cost) per solver, in column order.
+    """
+    row_fmt = "{:<6} " + " ".join(["{:<10} {:<15}"] * len(columns))
+    width = 6 + 27 * len(columns)
+
+    header = ["Run"]
+    for label, _, _ in columns:
+        header += [f"{label} (s)", f"{label} (best cost)"]
+    print("\n" + row_fmt.format(*header))
+    print("-" * width)
 
     # Rows per run
     for i in range(runs):
-        print("{:<6} {:<10} {:<15} {:<10} {:<15} {:<10} {:<15}".format(
-            f"{i+1}",
-            fmt(es_times[i]),
-            fmt_cost(es_costs[i]) if es_costs[i] is not None else "N/A".ljust(15),
-            fmt(hk_times[i]),
-            fmt_cost(hk_costs[i]),
-            fmt(nn_times[i]),
-            fmt_cost(nn_costs[i])
-        ))
+        row = [f"{i+1}"]
+        for _, times, costs in columns:
+            row += [fmt(times[i]), fmt_cost(costs[i]) if costs[i] is not None else "N/A".ljust(15)]
+        print(row_fmt.format(*row))
 
     # Compute averages
-    avg_es = sum(t for t in es_times if t is not None) / runs if any(t is not None for t in es_times) else None
-    avg_hk = sum(t for t in hk_times if t is not None) / runs if any(t is not None for t in hk_times) else None
-    avg_nn = sum(nn_times) / runs
-    es_best_cost = min([c for c in es_costs if c is not None]) if any(c is not None for c in es_costs) else None
-    hk_best_cost = min([c for c in hk_costs if c is not None]) if any(c is not None for c in hk_costs) else None
-    nn_best_cost = min(nn_costs)
-
-    print("-" * 88)
-    print("{:<6} {:<10} {:<15} {:<10} {:<15} {:<10} {:<15}".format(
-        "Avg",
-        fmt(avg_es),
-        fmt_cost(es_best_cost),
-        fmt(avg_hk),
-        fmt_cost(hk_best_cost),
-        fmt(avg_nn),
-        fmt_cost(nn_best_cost)
-    ))
-    print("-" * 88 + "\n")
-    
-    return avg_es, avg_hk, avg_nn, es_best_cost, hk_best_cost, nn_best_cost
+    summary = []
+    row = ["Avg"]
+    for _, times, costs in columns:
+        avg = sum(t for t in times if t is not None) / runs if any(t is not None for t in times) else None
+        best = min([c for c in costs if c is not None]) if any(c is not None for c in costs) else None
+        summary.append((avg, best))
+        row += [fmt(avg), fmt_cost(best)]
+
+    print("-" * width)
+    print(row_fmt.format(*row))
+    print("-" * width + "\n")
+
+    return summary
+
+def print_counters(columns):
+    """
+    Print the instrumentation counters of each solver's last run.
+
+    columns: list of (label, stats) where stats is a list of SolveStats per
+    run (empty where the solver was skipped).
+    """
+    for label, stats in columns:
+        if stats:
+            print(f"{label:<6} {stats[-1]}")
+    print()
+
+def log_complexity(n, algorithm: str) -> float:
+    """
+    Log of the operation count model for each algorithm:
+    ES O(n!), HK O(n^2 * 2^n), NN O(n^2)
+    """
+    if algorithm == "ES":
+        return sum(np.log(range(2, n+1)))
+    elif algorithm == "HK":
+        return 2*np.log(n) + n*np.log(2)
+    else:  # NN
+        return 2*np.log(n)
+
+def fit_complexity(actual_times: List[float], actual_n: List[int], algorithm: str):
+    """
+    Fit log(time) = a * log(complexity(n)) + b. Returns (a, b).
+    """
+    log_c = np.array([log_complexity(n, algorithm) for n in actual_n])
+    return np.polyfit(log_c, np.log(np.array(actual_times)), 1)
 
 def extrapolate_times(actual_times: List[float], actual_n: List[int], target_n: List[int], algorithm: str) -> List[float]:
     """
@@ -66,63 +109,71 @@ def extrapolate_times(actual_times: List[float], actual_n: List[int], target_n:
     actual_times_arr = np.array(actual_times)
     
     # Fit based on expected complexity
-    if algorithm == "ES":
-        # O(n!) complexity - fit to exponential growth
-        log_factorial = np.array([sum(np.log(range(2, n+1))) for n in actual_n_arr])
-        coeffs = np.polyfit(log_factorial, np.log(actual_times_arr), 1)
-        extrapolated = []
-        for n in target_n:
-            if n <= max(actual_n_arr):
-                # Use actual measurement
-                idx = actual_n_arr.tolist().index(n)
-                extrapolated.append(actual_times_arr[idx])
-            else:
-                # Extrapolate using factorial growth
-                pred_log_time = coeffs[0] * sum(np.log(range(2, n+1))) + coeffs[1]
-                extrapolated.append(np.exp(pred_log_time))
-    
-    elif algorithm == "HK":
-        # O(n^2 * 2^n) complexity
-        log_complexity = np.array([2*np.log(n) + n*np.log(2) for n in actual_n_arr])
-        coeffs = np.polyfit(log_complexity, np.log(actual_times_arr), 1)
-        extrapolated = []
-        for n in target_n:
-            if n <= max(actual_n_arr):
-                idx = actual_n_arr.tolist().index(n)
-                extrapolated.append(actual_times_arr[idx])
-            else:
-                pred_log_time = coeffs[0] * (2*np.log(n) + n*np.log(2)) + coeffs[1]
-                extrapolated.append(np.exp(pred_log_time))
-    
-    else:  # NN - O(n^2) complexity
-        log_complexity = np.array([2*np.log(n) for n in actual_n_arr])
-        coeffs = np.polyfit(log_complexity, np.log(actual_times_arr), 1)
-        extrapolated = []
-        for n in target_n:
-            if n <= max(actual_n_arr):
-                idx = actual_n_arr.tolist().index(n)
-                extrapolated.append(actual_times_arr[idx])
-            else:
-                pred_log_time = coeffs[0] * (2*np.log(n)) + coeffs[1]
-                extrapolated.append(np.exp(pred_log_time))
+    coeffs = fit_complexity(actual_times, actual_n, algorithm)
+    extrapolated = []
+    for n in target_n:
+        if n <= max(actual_n_arr):
+            # Use actual measurement
+            idx = actual_n_arr.tolist().index(n)
+            extrapolated.append(actual_times_arr[idx])
+        else:
+            # Extrapolate along the fitted complexity curve
+            pred_log_time = coeffs[0] * log_complexity(n, algorithm) + coeffs[1]
+            extrapolated.append(np.exp(pred_log_time))
     
     return extrapolated
 
+def within_budget(test_cases, avg_times, n, algorithm, budget):
+    """
+    Whether a solver should still be run at n: the average time at each
+    measured size is fitted to the solver's complexity curve and the call
+    at n is predicted from it. Solvers measured fewer than twice are only
+    stopped once a measurement exceeds the budget.
+    """
+    measured_n = [c for c, t in zip(test_cases, avg_times) if t is not None]
+    measured_times = [t for t in avg_times if t is not None]
+    if not measured_n:
+        # never run, or already skipped
+        return not test_cases
+    if measured_times[-1] > budget or measured_n[-1] != test_cases[-1]:
+        return False
+    if len(measured_n) < 2:
+        return True
+    return extrapolate_times(measured_times, measured_n, [n], algorithm)[0] <= budget
+
 if __name__ == '__main__':
     runs = 3
     test_cases = list(range(3, 31, 3))
+    seed = 0  # instance seed, so reruns time the same matrices; None for fresh ones
     
-    # Determine maximum feasible n for each algorithm
-    max_feasible_es = 12  # set for the mean time
-    max_feasible_hk = 20  # set for the mean time to see generated graphs
+    # A solver is skipped once its predicted time per call exceeds this many
+    # seconds. Use benchmark.py for warmed-up, repeated measurements.
+    time_budget = 10.0
+    # Held-Karp is also skipped once its table is estimated to exceed this
+    # many MB: the dict table grows 2x per city and would exhaust memory
+    # long before the time budget is reached
+    memory_limit_mb = 1024
+    
+    # Every run is appended to the results store, tagged with this sweep
+    store = ResultsStore()
+    meta = {**run_metadata(), 'source': 'main.py'}
+    improve_nn = True  # post-process GNN tours with 2-opt / Or-opt local search
+    show_counters = True  # print per-solver work counters after each table
+    # Write a cProfile dump per solver call to this directory (or set
+    # TSP_PROFILE_DIR); None leaves profiling off
+    profile_dir = None
     
     # Lists to store results for plotting
     es_avg_times = []
     hk_avg_times = []
+    bb_avg_times = []
     nn_avg_times = []
+    ls_avg_times = []
     es_best_costs = []
     hk_best_costs = []
+    bb_best_costs = []
     nn_best_costs = []
+    ls_best_costs = []
     all_test_cases = []
     
     text = "TRAVELING SALESPERSON PROBLEM"
@@ -130,14 +181,15 @@ if __name__ == '__main__':
     print("Legend:")
     print("ES = Exhaustive Search")
     print("HK = Bellman-Held-Karp algorithm")
+    print("BB = Branch and Bound")
     print("GNN = Greedy Nearest Neighbor algorithm")
-    print(f"\nMaximum feasible sizes:")
-    print(f"ES: {max_feasible_es} cities")
-    print(f"HK: {max_feasible_hk} cities")
-    print(f"GNN: All test cases")
+    if improve_nn:
+        print("LS = GNN followed by 2-opt / Or-opt local search")
+    print(f"\nTime budget per call: {time_budget} s")
+    print(f"Memory limit for the HK table: {memory_limit_mb} MB")
 
     for case in test_cases:
-        distance_matrix = matrix.gen_distance_matrix(case)
+        distance_matrix = matrix.gen_distance_matrix(case, seed)
         print("\n")
         print("="*88)
         text = f"Testing {case} Cities"
@@ -147,101 +199,136 @@ if __name__ == '__main__':
         # Lists to store per-run results
         es_times, es_costs = [], []
         hk_times, hk_costs = [], []
+        bb_times, bb_costs = [], []
         nn_times, nn_costs = [], []
+        ls_times, ls_costs = [], []
+        es_stats, hk_stats, bb_stats, nn_stats, ls_stats = [], [], [], [], []
 
         # EXHAUSTIVE SEARCH ALGORITHM
-        if case <= max_feasible_es:
+        if within_budget(all_test_cases, es_avg_times, case, "ES", time_budget):
             for run in range(runs):
+                stats = SolveStats()
                 start_time = time.perf_counter()
-                tour, cost = exhaustive_search.solve_tsp_exhaustive(distance_matrix)
+                tour, cost = profiled(exhaustive_search.solve_tsp_exhaustive, distance_matrix,
+                                      stats=stats, label=f"es-{case}", profile_dir=profile_dir)
                 end_time = time.perf_counter()
                 
                 elapsed_time = end_time - start_time
                 es_times.append(elapsed_time)
                 es_costs.append(cost)
+                es_stats.append(stats)
         else:
             es_times = [None] * runs
             es_costs = [None] * runs
 
         # DP HELD KARP ALGORITHM
-        if case <= max_feasible_hk:
+        if within_budget(all_test_cases, hk_avg_times, case, "HK", time_budget) and \
+                held_karp.dict_table_bytes(case) <= memory_limit_mb * 2 ** 20:
             for run in range(runs):
+                stats = SolveStats()
                 start_time = time.perf_counter()
-                cost, tour = held_karp.held_karp(distance_matrix)
+                cost, tour = profiled(held_karp.held_karp, distance_matrix,
+                                      stats=stats, label=f"hk-{case}", profile_dir=profile_dir)
                 end_time = time.perf_counter()
 
                 elapsed_time = end_time - start_time
                 hk_times.append(elapsed_time)
                 hk_costs.append(cost)
+                hk_stats.append(stats)
         else:
             hk_times = [None] * runs
             hk_costs = [None] * runs
 
+        # BRANCH AND BOUND ALGORITHM
+        # no closed-form model for BB, so fit the exponential HK curve
+        if within_budget(all_test_cases, bb_avg_times, case, "HK", time_budget):
+            for run in range(runs):
+                stats = SolveStats()
+                start_time = time.perf_counter()
+                tour, cost = profiled(branch_and_bound.solve_tsp_branch_and_bound, distance_matrix,
+                                      stats=stats, label=f"bb-{case}", profile_dir=profile_dir)
+                end_time = time.perf_counter()
+
+                elapsed_time = end_time - start_time
+                bb_times.append(elapsed_time)
+                bb_costs.append(cost)
+                bb_stats.append(stats)
+        else:
+            bb_times = [None] * runs
+            bb_costs = [None] * runs
+
         # GREEDY NEAREST NEIGHBOR ALGORITHM 
         for run in range(runs):
+            stats = SolveStats()
             start_time = time.perf_counter()
-            tour, cost = greedy_nearestneighbor.solve_nn_tsp(distance_matrix, start_city_index=0)
+            tour, cost = profiled(greedy_nearestneighbor.solve_nn_tsp, distance_matrix, start_city_index=0,
+                                  stats=stats, label=f"nn-{case}", profile_dir=profile_dir)
             end_time = time.perf_counter()
             
             elapsed_time = end_time - start_time
             nn_times.append(elapsed_time)
             nn_costs.append(cost)
+            nn_stats.append(stats)
+
+            # LOCAL SEARCH ON THE GNN TOUR (time includes the GNN run)
+            if improve_nn:
+                stats = SolveStats()
+                start_time = time.perf_counter()
+                tour, cost = profiled(local_search.improve_tour, tour, distance_matrix,
+                                      stats=stats, label=f"ls-{case}", profile_dir=profile_dir)
+                end_time = time.perf_counter()
+
+                ls_times.append(elapsed_time + end_time - start_time)
+                ls_costs.append(cost)
+                ls_stats.append(stats)
 
         # Get average times and store for plotting
-        avg_es, avg_hk, avg_nn, best_es, best_hk, best_nn = tabulate(
-            es_times, es_costs, hk_times, hk_costs, nn_times, nn_costs
-        )
+        columns = [
+            ("ES", es_times, es_costs),
+            ("HK", hk_times, hk_costs),
+            ("BB", bb_times, bb_costs),
+            ("GNN", nn_times, nn_costs),
+        ]
+        if improve_nn:
+            columns.append(("LS", ls_times, ls_costs))
+        summary = tabulate(columns)
+        (avg_es, best_es), (avg_hk, best_hk), (avg_bb, best_bb), (avg_nn, best_nn) = summary[:4]
+        avg_ls, best_ls = summary[4] if improve_nn else (None, None)
+        if show_counters:
+            print_counters([("ES", es_stats), ("HK", hk_stats), ("BB", bb_stats),
+                            ("GNN", nn_stats), ("LS", ls_stats)])
         
         es_avg_times.append(avg_es)
         hk_avg_times.append(avg_hk)
+        bb_avg_times.append(avg_bb)
         nn_avg_times.append(avg_nn)
         es_best_costs.append(best_es if best_es != "N/A" else None)
         hk_best_costs.append(best_hk if best_hk != "N/A" else None)
+        bb_best_costs.append(best_bb)
         nn_best_costs.append(best_nn)
+        ls_avg_times.append(avg_ls)
+        ls_best_costs.append(best_ls)
         all_test_cases.append(case)
+        
+        # Append this case's runs to the results store
+        per_solver = {'es': (es_times, es_costs, es_stats), 'hk': (hk_times, hk_costs, hk_stats),
+                      'bb': (bb_times, bb_costs, bb_stats), 'nn': (nn_times, nn_costs, nn_stats),
+                      'ls': (ls_times, ls_costs, ls_stats)}
+        store.extend(
+            {'kind': 'run', **meta, 'solver': SOLVER_NAMES[key], 'n': case, 'seed': seed,
+             'run': run, 'time': t, 'cost': c, **st.as_dict()}
+            for key, (times, costs, stats) in per_solver.items()
+            for run, (t, c, st) in enumerate(zip(times, costs, stats)) if t is not None
+        )
     
-    # Extrapolate results for larger n values
-    print("\n" + "="*88)
-    print("EXTRAPOLATING RESULTS FOR LARGER PROBLEM SIZES")
-    print("="*88)
-    
-    # Get actual measured data for extrapolation
-    es_measured_n = [n for i, n in enumerate(all_test_cases) if es_avg_times[i] is not None]
-    es_measured_times = [t for t in es_avg_times if t is not None]
-    
-    hk_measured_n = [n for i, n in enumerate(all_test_cases) if hk_avg_times[i] is not None]
-    hk_measured_times = [t for t in hk_avg_times if t is not None]
-    
-    nn_measured_n = [n for i, n in enumerate(all_test_cases) if nn_avg_times[i] is not None]
-    nn_measured_times = [t for t in nn_avg_times if t is not None]
-    
-    # Extrapolate
-    es_extrapolated = extrapolate_times(es_measured_times, es_measured_n, all_test_cases, "ES")
-    hk_extrapolated = extrapolate_times(hk_measured_times, hk_measured_n, all_test_cases, "HK")
-    nn_extrapolated = extrapolate_times(nn_measured_times, nn_measured_n, all_test_cases, "NN")
-    
-    # Save results to a file for visualization
-    results = {
-        'test_cases': all_test_cases,
-        'es_avg_times': es_avg_times,
-        'hk_avg_times': hk_avg_times,
-        'nn_avg_times': nn_avg_times,
-        'es_best_costs': es_best_costs,
-        'hk_best_costs': hk_best_costs,
-        'nn_best_costs': nn_best_costs,
-        'es_extrapolated': es_extrapolated,
-        'hk_extrapolated': hk_extrapolated,
-        'nn_extrapolated': nn_extrapolated,
-        'max_feasible_es': max_feasible_es,
-        'max_feasible_hk': max_feasible_hk
-    }
-    
-    with open('tsp_results.json', 'w') as f:
-        json.dump(results, f, indent=2)
+    max_feasible_es = max([n for i, n in enumerate(all_test_cases) if es_avg_times[i] is not None], default=None)
+    max_feasible_hk = max([n for i, n in enumerate(all_test_cases) if hk_avg_times[i] is not None], default=None)
+    max_feasible_bb = max([n for i, n in enumerate(all_test_cases) if bb_avg_times[i] is not None], default=None)
     
-    print(f"\nResults saved to 'tsp_results.json'")
+    print(f"\nResults appended to '{store.path}' (sweep {meta['sweep']})")
     print(f"Maximum successfully terminated:")
     print(f"  Exhaustive Search: {max_feasible_es} cities")
     print(f"  Held-Karp: {max_feasible_hk} cities")
+    print(f"  Branch and Bound: {max_feasible_bb} cities")
     print(f"  Greedy Nearest Neighbor: {max(all_test_cases)} cities")
     print("\nRun 'graphs_results.py' to generate performance plots.")
\ No newline at end of file
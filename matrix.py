@@ -1,10 +1,12 @@
-import random
+import numpy as np
 
-def gen_distance_matrix(n):
-    matrix = [[0 for _ in range(n)] for _ in range(n)]
-    for i in range(n):
-        for j in range(i + 1, n):
-            rand_val = random.randint(10, 150)
-            matrix[i][j] = rand_val
-            matrix[j][i] = rand_val
-    return matrix
\ No newline at end of file
+import instances
+
+def gen_distance_matrix(n, seed=None):
+    """
+    Symmetric random distances in [10, 150]; seed=None draws a fresh instance.
+    Above instances.MATRIX_MAX_N cities the distances come as a
+    DistanceProvider instead of lists.
+    """
+    m = instances.generate('uniform', n, seed, low=10, high=150)
+    return m.tolist() if isinstance(m, np.ndarray) else m
@@ -0,0 +1,146 @@
+import struct
+
+import numpy as np
+
+from distances import TriangularDistances
+
+# Binary distance matrix file (.tspd):
+#   64-byte little-endian header: magic, format version, flags, NumPy dtype
+#   string, n, zero padding
+#   raw row-major data: n*n values, or for a triangular file the n(n-1)/2
+#   values above the diagonal, row by row
+MAGIC = b'TSPDIST\0'
+VERSION = 1
+HEADER_SIZE = 64
+FLAG_SYMMETRIC = 1
+FLAG_TRIANGULAR = 2
+
+_HEADER = struct.Struct('<8sHH8sQ')
+
+
+def write_header(f, n, dtype, symmetric=False, triangular=False):
+    flags = (FLAG_SYMMETRIC if symmetric or triangular else 0) | (FLAG_TRIANGULAR if triangular else 0)
+    dtype = np.dtype(dtype).newbyteorder('<')
+    header = _HEADER.pack(MAGIC, VERSION, flags, dtype.str.encode('ascii'), n)
+    f.write(header.ljust(HEADER_SIZE, b'\0'))
+
+
+def read_header(path):
+    """
+    Reads the header of a .tspd file.
+
+    Returns:
+        dict with n, dtype, symmetric and triangular
+    """
+    with open(path, 'rb') as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"{path}: truncated header")
+
+    magic, version, flags, dtype, n = _HEADER.unpack_from(raw)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a binary distance matrix file")
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported format version {version}")
+
+    return {
+        'n': n,
+        'dtype': np.dtype(dtype.rstrip(b'\0').decode('ascii')),
+        'symmetric': bool(flags & FLAG_SYMMETRIC),
+        'triangular': bool(flags & FLAG_TRIANGULAR),
+    }
+
+
+def write_matrix(path, matrix, dtype=None, triangular=False):
+    """
+    Writes a square matrix to a .tspd file. With triangular=True only the
+    upper triangle is stored, which assumes the matrix is symmetric.
+    """
+    m = np.asarray(matrix)
+    dtype = np.dtype(dtype or m.dtype).newbyteorder('<')
+    n = len(m)
+    with open(path, 'wb') as f:
+        write_header(f, n, dtype, symmetric=triangular, triangular=triangular)
+        if triangular:
+            m[np.triu_indices(n, k=1)].astype(dtype).tofile(f)
+        else:
+            m.astype(dtype).tofile(f)
+
+
+def load_matrix(path, cache_rows=256):
+    """
+    Maps a .tspd file into memory without reading it. Pages are loaded as
+    solvers touch rows.
+
+    Returns:
+        np.memmap of shape (n, n), or a TriangularDistances provider over
+        a memory-mapped triangle for triangular files
+    """
+    header = read_header(path)
+    n = header['n']
+    if header['triangular']:
+        tri = np.memmap(path, dtype=header['dtype'], mode='r', offset=HEADER_SIZE,
+                        shape=(n * (n - 1) // 2,))
+        return TriangularDistances(tri, n, cache_rows)
+    return np.memmap(path, dtype=header['dtype'], mode='r', offset=HEADER_SIZE, shape=(n, n))
+
+
+def csv_to_binary(csv_path, out_path, dtype='int32', triangular=False, symmetric=False,
+                  chunk_rows=1024):
+    """
+    Converts a CSV distance matrix (the format read by
+    held_karp.read_distances, '#' lines are comments) to a .tspd file,
+    parsing and writing chunk_rows rows at a time so memory stays at
+    O(chunk_rows * n) whatever the matrix size.
+
+    Returns:
+        n, the number of cities
+    """
+    dtype = np.dtype(dtype).newbyteorder('<')
+    n = None
+    row = 0
+
+    with open(csv_path, 'r') as src, open(out_path, 'wb') as out:
+        # header is rewritten once n is known
+        out.write(b'\0' * HEADER_SIZE)
+
+        def flush(lines):
+            nonlocal row
+            values = np.fromstring(','.join(lines), dtype=dtype, sep=',')
+            if values.size != len(lines) * n:
+                raise ValueError(f"{csv_path}: rows {row + 1}-{row + len(lines)} do not all have {n} values")
+            block = values.reshape(len(lines), n)
+            if triangular:
+                for i, values_row in enumerate(block, start=row):
+                    values_row[i + 1:].tofile(out)
+            else:
+                block.tofile(out)
+            row += len(lines)
+
+        chunk = []
+        for line_number, line in enumerate(src, start=1):
+            # Skip comments
+            if line[0] == '#' or not line.strip():
+                continue
+            width = line.count(',') + 1
+            if n is None:
+                n = width
+            elif width != n:
+                # checked per row: ragged rows can still add up per chunk
+                raise ValueError(f"{csv_path}: line {line_number} has {width} values, expected {n}")
+            chunk.append(line.strip())
+            if len(chunk) == chunk_rows:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+
+        if n is None:
+            n = 0
+        if row != n:
+            raise ValueError(f"{csv_path}: expected {n} rows, found {row}")
+
+        out.seek(0)
+        write_header(out, n, dtype, symmetric=symmetric, triangular=triangular)
+
+    return n
@@ -0,0 +1,343 @@
+import argparse
+import math
+import multiprocessing
+import os
+import platform
+import time
+
+import numpy as np
+
+import benchmark
+import greedy_nearestneighbor
+import held_karp
+import instances
+import lin_kernighan
+import local_search
+import matrix_io
+import regression
+import solvers
+from distances import as_distances, is_symmetric
+from main import log_complexity
+from results_store import DEFAULT_PATH
+
+# Exact solvers the portfolio may run, each with the complexity model from
+# regression.COMPLEXITY
+EXACT_CANDIDATES = ['held_karp_array', 'branch_and_bound', 'held_karp', 'exhaustive']
+
+# Predictions are taken this many residual standard deviations above the
+# fitted curve, so a pick is unlikely to miss the deadline
+SAFETY_SIGMAS = 2.0
+
+# Sizes timed by SelectionPolicy.measure() when the store has no history
+# (sizes small enough that fixed overheads dominate flatten the fitted curve)
+CALIBRATION_SIZES = {
+    'exhaustive': (6, 7, 8, 9),
+    'branch_and_bound': (8, 10, 11, 12),
+    'held_karp': (8, 10, 11, 12),
+    'held_karp_array': (12, 14, 16, 17),
+}
+
+# Fits used when solve() is given no policy and none was calibrated in this
+# process: held_karp_array and held_karp measured on one modest core, with
+# a wide residual so the picks stay on the safe side of slower hosts
+BUILTIN_FITS = {
+    'held_karp_array': ((0.84, -17.2), 0.5),
+    'held_karp': ((1.0, -16.6), 0.5),
+}
+
+# Seconds assumed for job_startup() until it has been measured
+JOB_STARTUP_GUESS = 0.1
+
+# Length of one LK call while an exact solver is running, i.e. how often
+# the portfolio checks whether the exact result has arrived
+LK_SLICE = 0.1
+
+# Time kept back to collect results and stop the exact solver
+RETURN_MARGIN = 0.01
+
+_policies = {}
+_job_startup = None
+
+
+class SelectionPolicy:
+    """
+    Predicts the time of one exact solver call at n by fitting the solver's
+    complexity curve (main.log_complexity) to measured runs, and picks the
+    fastest exact solver predicted to finish within a budget.
+
+    fits maps solver name -> ((a, b), residual sigma) as returned by
+    regression.fit_baseline.
+    """
+
+    def __init__(self, fits, source=None):
+        self.fits = {name: fit for name, fit in fits.items() if fit}
+        self.source = source
+
+    @classmethod
+    def from_store(cls, path=DEFAULT_PATH, names=EXACT_CANDIDATES, **filters):
+        """Fits every solver with runs at two or more sizes in a results store."""
+        cells = regression.load_runs(path, **filters)
+        return cls({name: regression.fit_baseline(cells, name) for name in names}, path)
+
+    @classmethod
+    def measure(cls, names=EXACT_CANDIDATES, runs=2):
+        """Times each solver at a few small sizes; takes about a second."""
+        cells = {}
+        for name in names:
+            solve = solvers.get_solver(name)
+            for n in CALIBRATION_SIZES[name]:
+                dists = instances.generate('uniform', n, 0).tolist()
+                times = []
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    solve(dists)
+                    times.append(time.perf_counter() - start)
+                cells[(name, n)] = {'times': times, 'peak_rss_kb': None}
+        return cls({name: regression.fit_baseline(cells, name) for name in names}, 'measured')
+
+    def predict(self, name, n):
+        """Predicted seconds for one call, or None without a fit."""
+        fit = self.fits.get(name)
+        if fit is None:
+            return None
+        (a, b), sigma = fit
+        log_time = a * log_complexity(n, regression.COMPLEXITY[name]) + b + SAFETY_SIGMAS * sigma
+        return math.exp(log_time) if log_time < 700 else math.inf
+
+    @classmethod
+    def builtin(cls):
+        """Policy from BUILTIN_FITS; needs no store and no timing."""
+        return cls(BUILTIN_FITS, 'builtin')
+
+    def choose(self, n, budget, memory_limit_mb=None):
+        """
+        Returns (name, predicted seconds) of the fastest exact solver
+        predicted to finish within budget seconds, or None.
+        """
+        best = None
+        for name in self.fits:
+            predicted = self.predict(name, n)
+            if predicted > budget:
+                continue
+            if memory_limit_mb is not None and _dp_bytes(name, n) > memory_limit_mb * 2 ** 20:
+                continue
+            if best is None or predicted < best[1]:
+                best = (name, predicted)
+        return best
+
+
+def default_policy(path=DEFAULT_PATH):
+    """
+    Policy fitted from this host's runs in the results store, with solvers
+    the store has too little data for timed on the spot. Cached per path.
+    This can take a second or more, so call it before starting a deadline.
+    """
+    if path not in _policies:
+        policy = SelectionPolicy.from_store(path, host=platform.node())
+        missing = [name for name in EXACT_CANDIDATES if name not in policy.fits]
+        if missing:
+            policy.fits.update(SelectionPolicy.measure(missing).fits)
+        _policies[path] = policy
+    return _policies[path]
+
+
+def solve(matrix, deadline=None, time_budget=1.0, policy=None, memory_limit_mb=None,
+          neighbours=8, seed=None):
+    """
+    Anytime TSP solver. Returns the best tour found by the deadline.
+
+    The policy picks the fastest exact solver predicted to finish in time
+    and runs it in a child process. Meanwhile nearest neighbour, local
+    search and then Lin-Kernighan improve a heuristic tour in this
+    process. If the exact solver finishes before the deadline its tour is
+    returned as optimal; otherwise it is stopped and the best heuristic
+    tour is returned. Without a feasible exact solver the heuristics run
+    in cascade for the whole budget. Local search and LK stop at the
+    deadline too. They need symmetric distances, so on an asymmetric
+    matrix the heuristic tour is nearest neighbour alone.
+
+    On a single CPU the two would only slow each other down, so the exact
+    solver gets the processor first, for up to twice its predicted time,
+    and LK gets whatever is left if it has to be stopped.
+
+    Parameters:
+        matrix: distance matrix (list of lists, 2-D array or
+            DistanceProvider)
+        deadline: time.perf_counter() value to return by
+        time_budget: seconds from now, used when deadline is None
+        policy: SelectionPolicy (default: the policy default_policy()
+            fitted earlier in this process, else SelectionPolicy.builtin();
+            solve never calibrates, so it can run within its deadline on
+            the first call)
+        memory_limit_mb: skip exact solvers whose DP table would not fit
+        neighbours: candidate list length for local search and LK
+        seed: seed for the LK kicks
+
+    Returns:
+        tuple: (tour, cost, optimal), the tour closed at city 0
+    """
+    policy = policy or _policies.get(DEFAULT_PATH) or SelectionPolicy.builtin()
+    if deadline is None:
+        deadline = time.perf_counter() + time_budget
+    d = as_distances(matrix)
+    n = len(d)
+    if n <= 3:
+        # every tour is optimal
+        tour, cost = greedy_nearestneighbor.solve_nn_tsp_array(d)
+        return tour, cost, True
+
+    pick = policy.choose(n, deadline - time.perf_counter() - RETURN_MARGIN, memory_limit_mb)
+    job = _ExactJob(pick[0], d) if pick else None
+    concurrent = (os.cpu_count() or 1) > 1
+
+    try:
+        tour, cost = greedy_nearestneighbor.solve_nn_tsp_array(d)
+        if job and job.poll(0):
+            return job.tour, job.cost, True
+
+        symmetric = is_symmetric(d)
+        if symmetric:
+            neighbours = local_search.neighbour_lists(d, neighbours)
+            tour, cost = local_search.improve_tour(tour, d, neighbours,
+                                                   deadline=deadline - RETURN_MARGIN)
+
+        if job and not concurrent:
+            wait_until = min(deadline - RETURN_MARGIN,
+                             job.started + 2 * (pick[1] + job_startup(measure=False)))
+            if job.poll(wait_until - time.perf_counter()):
+                return job.tour, job.cost, True
+            job.stop()
+            job = None
+
+        # LK from the best tour, in short slices while the exact solver runs
+        rounds = 0
+        while symmetric and n >= 8 and time.perf_counter() < deadline - RETURN_MARGIN:
+            if job and job.poll(0):
+                return job.tour, job.cost, True
+            remaining = deadline - RETURN_MARGIN - time.perf_counter()
+            lk_tour, lk_cost = lin_kernighan.solve_lk_tsp(
+                d, time_budget=min(LK_SLICE, remaining) if job else remaining,
+                start_tour=tour, neighbours=neighbours,
+                seed=None if seed is None else seed + rounds)
+            rounds += 1
+            if lk_cost < cost:
+                tour, cost = lk_tour, lk_cost
+
+        if job and job.poll(deadline - RETURN_MARGIN - time.perf_counter()):
+            return job.tour, job.cost, True
+        return tour, cost, False
+    finally:
+        if job:
+            job.stop()
+
+
+def job_startup(measure=True):
+    """
+    Seconds to start an exact solver process and get a result back,
+    measured once. With measure=False, JOB_STARTUP_GUESS until then.
+    """
+    global _job_startup
+    if _job_startup is None:
+        if not measure:
+            return JOB_STARTUP_GUESS
+        start = time.perf_counter()
+        job = _ExactJob('exhaustive', [[0, 1, 1], [1, 0, 1], [1, 1, 0]])
+        job.poll(10)
+        job.stop()
+        _job_startup = time.perf_counter() - start
+    return _job_startup
+
+
+class _ExactJob:
+    """An exact solver running in a child process."""
+
+    def __init__(self, name, d):
+        ctx = multiprocessing.get_context()
+        self.conn, child_conn = ctx.Pipe(duplex=False)
+        self.proc = ctx.Process(target=_exact_worker,
+                                args=(child_conn, name, np.asarray(d).tolist()), daemon=True)
+        self.proc.start()
+        self.started = time.perf_counter()
+        child_conn.close()
+        self.tour = self.cost = None
+        self.failed = False
+
+    def poll(self, timeout):
+        """Whether the optimal tour has arrived, waiting up to timeout seconds."""
+        if self.tour is not None:
+            return True
+        if self.failed or not self.conn.poll(max(timeout, 0)):
+            return False
+        try:
+            msg = self.conn.recv()
+        except EOFError:
+            msg = ('error',)
+        if msg[0] == 'ok':
+            self.tour, self.cost = msg[1], msg[2]
+            return True
+        # a failed exact solver leaves the heuristic result
+        self.failed = True
+        return False
+
+    def stop(self):
+        if self.proc.is_alive():
+            self.proc.kill()
+        self.proc.join()
+        self.conn.close()
+
+
+def _exact_worker(conn, name, dists):
+    try:
+        tour, cost = solvers.get_solver(name)(dists)
+        conn.send(('ok', tour, cost))
+    except Exception as exc:
+        conn.send(('error', repr(exc)))
+    finally:
+        conn.close()
+
+
+def _dp_bytes(name, n):
+    """Rough peak DP table size; the other exact solvers need O(n^2) memory."""
+    m = n - 1
+    if name == 'held_karp_array':
+        # int32 cost and int8 parent per (subset, city)
+        return m * 2 ** m * 5
+    if name == 'held_karp':
+        return held_karp.dict_table_bytes(n)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve a TSP instance within a time budget")
+    parser.add_argument('instance', help="CSV or .tspd distance matrix, or a number of cities")
+    parser.add_argument('--budget', type=float, default=1.0, help="seconds (default 1.0)")
+    parser.add_argument('--store', default=DEFAULT_PATH,
+                        help="results store used to calibrate the solver choice")
+    parser.add_argument('--memory-limit', type=float, default=None, help="MB for the DP table")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.instance.endswith('.csv'):
+        dists = held_karp.read_distances(args.instance)
+    elif args.instance.endswith('.tspd'):
+        dists = matrix_io.load_matrix(args.instance)
+    else:
+        dists = benchmark.generate_instance(int(args.instance), args.seed or 0)
+
+    # calibration and process startup are measured before the clock starts
+    policy = default_policy(args.store)
+    job_startup()
+    deadline = time.perf_counter() + args.budget
+    n = len(dists)
+    pick = policy.choose(n, args.budget, args.memory_limit)
+    print(f"n={n}, exact solver: "
+          + (f"{pick[0]} (predicted {pick[1]:.3f}s)" if pick else "none within budget"))
+
+    tour, cost, optimal = solve(dists, deadline=deadline, policy=policy,
+                                memory_limit_mb=args.memory_limit, seed=args.seed)
+    print(f"cost={cost} optimal={optimal}")
+    print(tour)
+
+
+if __name__ == '__main__':
+    main()
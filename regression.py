@@ -0,0 +1,186 @@
+import argparse
+import math
+import statistics
+import sys
+from collections import defaultdict
+
+from main import fit_complexity, log_complexity
+from results_store import ResultsStore
+
+# Complexity model used to normalize each solver's timings (see
+# main.log_complexity). LK runs to a fixed time budget, so it has no model.
+COMPLEXITY = {
+    'exhaustive': 'ES',
+    'exhaustive_symmetric': 'ES',
+    'branch_and_bound': 'HK',
+    'held_karp': 'HK',
+    'held_karp_array': 'HK',
+    'held_karp_disk': 'HK',
+    'nn': 'NN',
+    'nn_array': 'NN',
+    'nn_ls': 'NN',
+}
+
+
+def load_runs(path, **filters):
+    """
+    Collects run records from a results store.
+
+    Returns:
+        dict: (solver, n) -> {'times': [...], 'peak_rss_kb': max or None}
+    """
+    cells = defaultdict(lambda: {'times': [], 'peak_rss_kb': None})
+    for r in ResultsStore(path).query(kind='run', **filters):
+        if not r.get('time') or r['time'] <= 0:
+            continue
+        cell = cells[(r['solver'], r['n'])]
+        cell['times'].append(r['time'])
+        rss = r.get('peak_rss_kb')
+        if rss is not None:
+            cell['peak_rss_kb'] = max(rss, cell['peak_rss_kb'] or 0)
+    return dict(cells)
+
+
+def fit_baseline(cells, solver):
+    """
+    Fits the solver's complexity curve to every baseline run. Returns
+    (coeffs, residual standard deviation) or None without enough sizes.
+    """
+    algorithm = COMPLEXITY.get(solver)
+    if algorithm is None:
+        return None
+    ns, times = [], []
+    for (s, n), cell in cells.items():
+        if s == solver:
+            ns += [n] * len(cell['times'])
+            times += cell['times']
+    if len(set(ns)) < 2:
+        return None
+
+    coeffs = fit_complexity(times, ns, algorithm)
+    residuals = [math.log(t) - (coeffs[0] * log_complexity(n, algorithm) + coeffs[1])
+                 for n, t in zip(ns, times)]
+    return coeffs, statistics.pstdev(residuals)
+
+
+def compare(baseline, candidate, threshold=0.10, alpha=0.01, memory_threshold=0.10):
+    """
+    Flags cells whose time or peak memory regressed.
+
+    Times are compared in log space. When the baseline measured the same
+    (solver, n), a one-sided Welch z-test compares the two samples;
+    otherwise the candidate is compared with the baseline's fitted
+    complexity curve at n, using the fit's residual spread as baseline
+    noise. A cell regresses when it is more than `threshold` slower and
+    the slowdown is significant at `alpha`. Peak RSS regresses when it
+    grew by more than `memory_threshold`.
+
+    Returns:
+        list of row dicts, one per candidate cell
+    """
+    z_crit = statistics.NormalDist().inv_cdf(1 - alpha)
+    fits = {solver: fit_baseline(baseline, solver) for solver, _ in candidate}
+    rows = []
+
+    for (solver, n), cand in sorted(candidate.items()):
+        logs_c = [math.log(t) for t in cand['times']]
+        mean_c = statistics.fmean(logs_c)
+        var_c = statistics.variance(logs_c) if len(logs_c) > 1 else 0.0
+
+        base = baseline.get((solver, n))
+        fit = fits[solver]
+        row = {'solver': solver, 'n': n, 'candidate': statistics.median(cand['times']),
+               'baseline': None, 'ratio': None, 'z': None, 'basis': None,
+               'mem_ratio': None, 'time_regressed': False, 'mem_regressed': False}
+
+        if base and base['times']:
+            logs_b = [math.log(t) for t in base['times']]
+            mean_b = statistics.fmean(logs_b)
+            var_b = statistics.variance(logs_b) if len(logs_b) > 1 else 0.0
+            if len(logs_b) < 2 and fit:
+                var_b = fit[1] ** 2
+            se = math.sqrt(var_c / len(logs_c) + var_b / len(logs_b))
+            row['baseline'] = statistics.median(base['times'])
+            row['basis'] = 'measured'
+        elif fit:
+            coeffs, sigma = fit
+            mean_b = coeffs[0] * log_complexity(n, COMPLEXITY[solver]) + coeffs[1]
+            se = math.sqrt(var_c / len(logs_c) + sigma ** 2)
+            row['baseline'] = math.exp(mean_b)
+            row['basis'] = 'model'
+        else:
+            rows.append(row)
+            continue
+
+        diff = mean_c - mean_b
+        row['ratio'] = math.exp(diff)
+        row['z'] = diff / se if se > 0 else (math.inf if diff > 0 else 0.0)
+        row['time_regressed'] = row['ratio'] > 1 + threshold and row['z'] > z_crit
+
+        if base and base['peak_rss_kb'] and cand['peak_rss_kb']:
+            row['mem_ratio'] = cand['peak_rss_kb'] / base['peak_rss_kb']
+            row['mem_regressed'] = row['mem_ratio'] > 1 + memory_threshold
+
+        rows.append(row)
+
+    return rows
+
+
+def format_table(rows):
+    def num(value, spec):
+        return format(value, spec) if value is not None else "N/A"
+
+    lines = ["{:<18} {:<5} {:<12} {:<12} {:<8} {:<8} {:<9} {:<8} {}".format(
+        "Solver", "n", "Base (s)", "Cand (s)", "Ratio", "z", "Basis", "Mem", "Status")]
+    lines.append("-" * 94)
+    for r in rows:
+        status = []
+        if r['time_regressed']:
+            status.append("TIME REGRESSION")
+        if r['mem_regressed']:
+            status.append("MEMORY REGRESSION")
+        lines.append("{:<18} {:<5} {:<12} {:<12} {:<8} {:<8} {:<9} {:<8} {}".format(
+            r['solver'], r['n'], num(r['baseline'], '.6f'), num(r['candidate'], '.6f'),
+            num(r['ratio'], '.3f'), num(r['z'], '.2f'), r['basis'] or "none",
+            num(r['mem_ratio'], '.3f'), ", ".join(status) or "ok"))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare two benchmark result sets and fail on regressions")
+    parser.add_argument('baseline', help="results store of the baseline")
+    parser.add_argument('candidate', nargs='?', help="results store of the candidate "
+                        "(default: the baseline store)")
+    parser.add_argument('--baseline-commit')
+    parser.add_argument('--candidate-commit')
+    parser.add_argument('--baseline-sweep')
+    parser.add_argument('--candidate-sweep')
+    parser.add_argument('--host', help="only compare runs from this host")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="minimum slowdown to flag, as a fraction (default 0.10)")
+    parser.add_argument('--alpha', type=float, default=0.01,
+                        help="one-sided significance level (default 0.01)")
+    parser.add_argument('--memory-threshold', type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    def filters(commit, sweep):
+        return {k: v for k, v in (('commit', commit), ('sweep', sweep), ('host', args.host)) if v}
+
+    baseline = load_runs(args.baseline, **filters(args.baseline_commit, args.baseline_sweep))
+    candidate = load_runs(args.candidate or args.baseline,
+                          **filters(args.candidate_commit, args.candidate_sweep))
+    if not baseline or not candidate:
+        print("Error: no runs found for the baseline or the candidate.")
+        return 2
+
+    rows = compare(baseline, candidate, args.threshold, args.alpha, args.memory_threshold)
+    print(format_table(rows))
+
+    regressed = [r for r in rows if r['time_regressed'] or r['mem_regressed']]
+    print(f"\n{len(regressed)} of {len(rows)} cells regressed")
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,296 @@
+import argparse
+import csv
+import hashlib
+import json
+import math
+import os
+import random
+from collections import defaultdict
+
+from matplotlib.figure import Figure
+
+from results_store import DEFAULT_PATH, ResultsStore
+
+# Timings kept per (solver, n) cell for the median and p95. Exact up to this
+# many runs, a uniform sample of the runs beyond
+RESERVOIR = 64
+
+STATE_FILE = 'report_state.json'
+STATE_VERSION = 1
+
+# Bytes of the store hashed to notice that it was replaced or truncated
+HEAD_BYTES = 4096
+
+
+class CellStats:
+    """
+    Running summary of the runs of one (solver, n) cell in constant memory:
+    count, mean and variance (Welford), extremes, best cost, and a
+    reservoir sample of RESERVOIR timings for the quantiles.
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max', 'best_cost', 'sample')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.best_cost = None
+        self.sample = []
+
+    def add(self, time, cost, rng):
+        self.count += 1
+        delta = time - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (time - self.mean)
+        self.min = min(self.min, time)
+        self.max = max(self.max, time)
+        if cost is not None and (self.best_cost is None or cost < self.best_cost):
+            self.best_cost = cost
+
+        if len(self.sample) < RESERVOIR:
+            self.sample.append(time)
+        else:
+            j = rng.randrange(self.count)
+            if j < RESERVOIR:
+                self.sample[j] = time
+
+    def quantile(self, q):
+        # nearest rank, as benchmark.summarize
+        ordered = sorted(self.sample)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+    def row(self):
+        ordered = sorted(self.sample)
+        k = len(ordered)
+        median = (ordered[(k - 1) // 2] + ordered[k // 2]) / 2
+        return {
+            'runs': self.count,
+            'mean': self.mean,
+            'stdev': math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0,
+            'min': self.min,
+            'median': median,
+            'p95': self.quantile(0.95),
+            'max': self.max,
+            'best_cost': self.best_cost,
+        }
+
+    def to_state(self):
+        return [self.count, self.mean, self.m2, self.min, self.max, self.best_cost, self.sample]
+
+    @classmethod
+    def from_state(cls, values):
+        cell = cls()
+        (cell.count, cell.mean, cell.m2, cell.min, cell.max,
+         cell.best_cost, cell.sample) = values
+        return cell
+
+
+def render_report(store_path=DEFAULT_PATH, out_dir='report', fmt='svg', full=False,
+                  log=print, **filters):
+    """
+    Non-interactive report of a results store: one time-vs-n plot per
+    solver, an overview of every solver, and summary.csv with one row per
+    (solver, n).
+
+    The store is streamed and folded into CellStats, so memory grows with
+    the number of cells, not with the number of runs. The aggregates and
+    the byte offset reached are saved in out_dir, so the next call only
+    reads the records appended since, and only solvers whose aggregates
+    changed are plotted again. A store that was replaced or truncated, or
+    other filters, or full=True, start from scratch.
+
+    Figures are drawn on the Agg canvas without pyplot, so nothing is
+    shown and no display is needed.
+
+    Parameters:
+        store_path: results store (JSON Lines)
+        out_dir: directory for the plots, the CSV and the state file
+        fmt: 'svg' or 'png'
+        full: ignore the saved state
+        **filters: only runs whose fields equal these values (e.g.
+            source='main.py', family='uniform', host=..., commit=...)
+
+    Returns:
+        dict with the number of records read, the solvers re-plotted and
+        the files written
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    store = ResultsStore(store_path)
+    size, head = _store_head(store_path)
+
+    state = None if full else _read_state(out_dir)
+    if state is None or state['store'] != os.path.abspath(store_path) or \
+            state['filters'] != filters or state['format'] != fmt or \
+            state['offset'] > size or _head_digest(head, state['offset']) != state['head']:
+        state = {'offset': 0, 'cells': {}, 'rendered': {}}
+
+    cells = defaultdict(CellStats)
+    for key, values in state['cells'].items():
+        solver, n = key.rsplit(':', 1)
+        cells[(solver, int(n))] = CellStats.from_state(values)
+
+    # deterministic per starting offset, so rerunning a report reproduces it
+    rng = random.Random(state['offset'])
+    offset = state['offset']
+    read = 0
+    for record, offset in store.scan(offset):
+        read += 1
+        if record.get('kind') != 'run' or not record.get('time') or record['time'] <= 0:
+            continue
+        if not all(record.get(k) == v for k, v in filters.items()):
+            continue
+        cells[(record['solver'], record['n'])].add(record['time'], record.get('cost'), rng)
+
+    series = defaultdict(list)
+    for (solver, n), cell in sorted(cells.items()):
+        series[solver].append({'n': n, **cell.row()})
+
+    written = []
+    digests = {solver: _digest(rows) for solver, rows in series.items()}
+    changed = [solver for solver, digest in digests.items()
+               if state['rendered'].get(solver) != digest
+               or not os.path.exists(_plot_path(out_dir, solver, fmt))]
+    for solver in changed:
+        written.append(_plot_solver(out_dir, solver, series[solver], fmt))
+
+    overview = _plot_path(out_dir, 'overview', fmt)
+    if changed or (series and not os.path.exists(overview)):
+        written.append(_plot_overview(out_dir, series, fmt))
+    if changed or read or not os.path.exists(os.path.join(out_dir, 'summary.csv')):
+        written.append(_write_summary(out_dir, series))
+
+    _write_state(out_dir, {
+        'version': STATE_VERSION,
+        'store': os.path.abspath(store_path),
+        'filters': filters,
+        'format': fmt,
+        'offset': offset,
+        'head': _head_digest(head, offset),
+        'cells': {f'{solver}:{n}': cell.to_state() for (solver, n), cell in cells.items()},
+        'rendered': digests,
+    })
+
+    if log:
+        log(f"{read} new records, {len(cells)} cells; re-plotted: {', '.join(changed) or 'nothing'}")
+    return {'records': read, 'changed': changed, 'files': written}
+
+
+def _plot_path(out_dir, name, fmt):
+    return os.path.join(out_dir, f'{name}.{fmt}')
+
+
+def _plot_solver(out_dir, solver, rows, fmt):
+    """Median time per n with the min-max range shaded."""
+    ns = [r['n'] for r in rows]
+    fig = Figure(figsize=(8, 5))
+    ax = fig.subplots()
+    ax.fill_between(ns, [r['min'] for r in rows], [r['max'] for r in rows],
+                    alpha=0.2, label='min - max')
+    ax.plot(ns, [r['p95'] for r in rows], ':', linewidth=1, label='p95')
+    ax.plot(ns, [r['median'] for r in rows], 'o-', linewidth=2, markersize=4, label='median')
+    ax.set_xlabel('Number of Cities')
+    ax.set_ylabel('Running Time (seconds)')
+    ax.set_title(f'{solver} ({sum(r["runs"] for r in rows)} runs)', fontweight='bold')
+    ax.set_yscale('log')
+    ax.grid(True, alpha=0.3)
+    ax.legend(fontsize=9)
+    return _save(fig, _plot_path(out_dir, solver, fmt))
+
+
+def _plot_overview(out_dir, series, fmt):
+    """Median time per n of every solver on one log scale."""
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    for solver, rows in sorted(series.items()):
+        ax.plot([r['n'] for r in rows], [r['median'] for r in rows], 'o-',
+                linewidth=1.5, markersize=3, label=solver)
+    ax.set_xlabel('Number of Cities')
+    ax.set_ylabel('Median Running Time (seconds)')
+    ax.set_title('TSP Solver Running Times', fontweight='bold')
+    ax.set_yscale('log')
+    ax.grid(True, alpha=0.3)
+    ax.legend(fontsize=9)
+    return _save(fig, _plot_path(out_dir, 'overview', fmt))
+
+
+def _save(fig, path):
+    fig.tight_layout()
+    # written under a temporary name so a reader never sees half a file
+    tmp = path + '.tmp'
+    fig.savefig(tmp, format=os.path.splitext(path)[1][1:], dpi=100)
+    os.replace(tmp, path)
+    return path
+
+
+def _write_summary(out_dir, series):
+    path = os.path.join(out_dir, 'summary.csv')
+    fields = ['solver', 'n', 'runs', 'mean', 'stdev', 'min', 'median', 'p95', 'max', 'best_cost']
+    with open(path + '.tmp', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for solver, rows in sorted(series.items()):
+            for r in rows:
+                writer.writerow({'solver': solver, **r})
+    os.replace(path + '.tmp', path)
+    return path
+
+
+def _digest(rows):
+    return hashlib.blake2b(json.dumps(rows, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+def _store_head(path):
+    """Size and first HEAD_BYTES of the store."""
+    if not os.path.exists(path):
+        return 0, b''
+    with open(path, 'rb') as f:
+        return os.path.getsize(path), f.read(HEAD_BYTES)
+
+
+def _head_digest(head, offset):
+    # a store appended to keeps its first bytes; a replaced one does not
+    return hashlib.blake2b(head[:offset], digest_size=8).hexdigest()
+
+
+def _read_state(out_dir):
+    path = os.path.join(out_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    if state.get('version') != STATE_VERSION:
+        return None
+    return state
+
+
+def _write_state(out_dir, state):
+    path = os.path.join(out_dir, STATE_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(state, f)
+    os.replace(path + '.tmp', path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render plots and a CSV summary of a results store without a display; "
+                    "reruns only read new records and re-plot changed solvers")
+    parser.add_argument('--store', default=DEFAULT_PATH)
+    parser.add_argument('--out-dir', default='report')
+    parser.add_argument('--format', choices=('svg', 'png'), default='svg')
+    parser.add_argument('--full', action='store_true', help="ignore the saved state and rebuild")
+    for field in ('source', 'family', 'host', 'commit', 'sweep'):
+        parser.add_argument(f'--{field}', help=f"only runs with this {field}")
+    args = parser.parse_args(argv)
+
+    filters = {k: getattr(args, k) for k in ('source', 'family', 'host', 'commit', 'sweep')
+               if getattr(args, k)}
+    report = render_report(args.store, args.out_dir, args.format, args.full, **filters)
+    for path in report['files']:
+        print(f"  wrote {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import heapq
+
+import greedy_nearestneighbor
+from distances import DistanceProvider, as_distances, is_symmetric
+from held_karp import _add_city, _has_city, _lowest_missing, _subset_bits
+from local_search import EPS, improve_tour
+
+
+def restricted_dp(dists, tour=None, window=6, beam_width=None, max_passes=10, stats=None):
+    """
+    Restricted dynamic programming around a tour (Balas-Simonetti
+    neighbourhood). Runs the Held-Karp recurrence over (visited set, last
+    city) states, but a city may only be visited once every city more than
+    window - 1 places before it in the current tour has been. The best tour
+    under that constraint is found exactly, and the current tour is one of
+    the candidates, so a pass never makes the tour worse.
+
+    Because of the constraint, a visited set is a prefix of the tour plus
+    a subset of the next window - 1 places, so each subset size has at most
+    window * 2^(window-1) states and a pass costs O(n * window^2 * 2^window)
+    time and O(n * window * 2^window) memory: polynomial in n for a fixed
+    window. beam_width optionally caps the states kept per subset size
+    (the cheapest survive) for windows too wide to search in full. With
+    window >= n and no beam the search is a full Held-Karp.
+
+    Passes alternate the start of the tour, so moves across the start are
+    tried too, and stop after two passes without improvement.
+
+    Parameters:
+        dists: distance matrix (list of lists, 2-D array or
+            DistanceProvider)
+        tour: initial tour, closed or open (default: nearest neighbour,
+            improved by local search when the matrix is symmetric)
+        window: how far (in tour places) a city may move forward
+        beam_width: states kept per subset size, or None for all
+        max_passes: upper bound on the number of passes
+        stats: optional instrumentation.SolveStats to fill in
+
+    Returns:
+        A tuple, (cost, path), path starting at city 0 as in held_karp.
+    """
+    if stats is not None:
+        stats.begin()
+    d = as_distances(dists)
+    n = len(d)
+    if n < 2:
+        raise ValueError("restricted_dp needs at least 2 cities")
+
+    # Python rows index faster than NumPy scalars in the expansion loop
+    rows = d if isinstance(d, DistanceProvider) else d.tolist()
+    if tour is None:
+        tour, _ = greedy_nearestneighbor.solve_nn_tsp_array(d)
+        if is_symmetric(d):
+            tour, _ = improve_tour(tour, d)
+    tour = list(tour)
+    if len(tour) > 1 and tour[0] == tour[-1]:
+        tour.pop()
+    cost = sum(rows[a][b] for a, b in zip(tour, tour[1:] + tour[:1]))
+
+    if stats is not None:
+        stats.lap('setup')
+
+    idle = 0
+    for passes in range(max_passes):
+        # start alternately at the first and the middle place of the tour
+        offset = (n // 2) * (passes % 2)
+        order = tour[offset:] + tour[:offset]
+        new_cost, new_order = _window_dp(rows, order, window, beam_width, stats)
+        if new_cost < cost - EPS:
+            cost, tour, idle = new_cost, new_order, 0
+        else:
+            idle += 1
+            if idle == 2:
+                break
+
+    if stats is not None:
+        stats.lap('search')
+        stats.add('passes', passes + 1)
+
+    # Rotate to start at city 0
+    i = tour.index(0)
+    return cost, tour[i:] + tour[:i]
+
+
+def _window_dp(rows, order, window, beam_width, stats):
+    """
+    One pass: the cheapest tour starting at order[0] in which place p of
+    order is visited only after every place before p - window + 1.
+    The visited places are a set in held_karp's bitmask encoding, place p
+    being bit p.
+
+    Returns:
+        (cost, tour)
+    """
+    n = len(order)
+
+    # Each layer is a list of (cost, bits, last place, index of the state it extends)
+    layer = [(0, _subset_bits((0,)), 0, -1)]
+    layers = [layer]
+    expanded = 0
+    peak = 0
+
+    for subset_size in range(2, n + 1):
+        best = {}
+        for index, (cost, bits, last, _) in enumerate(layer):
+            row = rows[order[last]]
+            # lowest unvisited place; nothing window or more places after it
+            # may be visited before it
+            first = _lowest_missing(bits)
+            for p in range(first, min(first + window, n)):
+                if _has_city(bits, p):
+                    continue
+                key = (_add_city(bits, p), p)
+                new_cost = cost + row[order[p]]
+                old = best.get(key)
+                if old is None or new_cost < old[0]:
+                    best[key] = (new_cost, index)
+
+        expanded += len(best)
+        peak = max(peak, len(best))
+        states = ((cost, bits, last, index) for (bits, last), (cost, index) in best.items())
+        if beam_width is not None and len(best) > beam_width:
+            layer = heapq.nsmallest(beam_width, states)
+        else:
+            layer = list(states)
+        layers.append(layer)
+
+    # Close the tour back to the start
+    start = order[0]
+    opt, index = min((cost + rows[order[last]][start], i)
+                     for i, (cost, _, last, _) in enumerate(layer))
+
+    # Backtrack to find full path
+    path = []
+    for layer in reversed(layers):
+        _, _, last, index = layer[index]
+        path.append(order[last])
+
+    if stats is not None:
+        stats.add('states_expanded', expanded)
+        stats.peak('peak_dp_states', peak)
+
+    return opt, list(reversed(path))
@@ -0,0 +1,117 @@
+import json
+import os
+import platform
+import subprocess
+import time
+import uuid
+from collections import defaultdict
+
+DEFAULT_PATH = 'tsp_results.jsonl'
+
+_git_info = None
+
+
+class ResultsStore:
+    """
+    Append-only benchmark history in JSON Lines: one record per line, never
+    rewritten. Two kinds of record are stored:
+
+        run   one solver call: solver, n, seed, run, time, cost
+        cell  closes a (solver, n, seed) cell of a sweep: status and summary
+
+    Every record also carries the sweep id, host and git metadata, so runs
+    from different commits and machines can be compared side by side.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+
+    def append(self, record):
+        self.extend([record])
+
+    def extend(self, records):
+        lines = ''.join(json.dumps(r, default=_to_builtin) + '\n' for r in records)
+        # one write per batch, flushed, so a killed sweep leaves whole lines
+        with open(self.path, 'a') as f:
+            f.write(lines)
+            f.flush()
+
+    def scan(self, offset=0):
+        """
+        Streams (record, next_offset) from a byte offset, so a reader can
+        pick up only what was appended since its last scan. A trailing
+        partial line (a write in progress) is left for the next scan.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                if line.strip():
+                    yield json.loads(line), offset
+
+    def query(self, offset=0, **filters):
+        """Streams the records whose fields equal every given filter."""
+        for record, _ in self.scan(offset):
+            if all(record.get(k) == v for k, v in filters.items()):
+                yield record
+
+    def cells(self, **filters):
+        """Closed cells keyed by (solver, n, seed), later records winning."""
+        return {(r['solver'], r['n'], r['seed']): r
+                for r in self.query(kind='cell', **filters)}
+
+
+def run_metadata(sweep=None):
+    """Fields stamped on every record of a sweep."""
+    return {
+        'sweep': sweep or f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}",
+        'host': platform.node(),
+        **git_info(),
+    }
+
+
+def git_info():
+    """Commit of the working tree and whether it had local changes."""
+    global _git_info
+    if _git_info is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        try:
+            commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=here, capture_output=True,
+                                    text=True, check=True).stdout.strip()
+            status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                    cwd=here, capture_output=True, text=True, check=True).stdout
+            _git_info = {'commit': commit, 'dirty': bool(status.strip())}
+        except (OSError, subprocess.CalledProcessError):
+            _git_info = {'commit': None, 'dirty': None}
+    return dict(_git_info)
+
+
+def aggregate_runs(records):
+    """
+    Folds run records into per-(sweep, solver, n) totals without keeping
+    the records themselves.
+
+    Returns:
+        dict: (sweep, solver, n) -> {'count', 'total_time', 'best_cost'}
+    """
+    cells = defaultdict(lambda: {'count': 0, 'total_time': 0.0, 'best_cost': None})
+    for r in records:
+        if r.get('kind') != 'run':
+            continue
+        cell = cells[(r.get('sweep'), r['solver'], r['n'])]
+        cell['count'] += 1
+        cell['total_time'] += r['time']
+        if r.get('cost') is not None and (cell['best_cost'] is None or r['cost'] < cell['best_cost']):
+            cell['best_cost'] = r['cost']
+    return dict(cells)
+
+
+def _to_builtin(value):
+    # NumPy scalars from the array solvers
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
@@ -0,0 +1,65 @@
+import branch_and_bound
+import exhaustive_search
+import greedy_nearestneighbor
+import held_karp
+import held_karp_disk
+import lin_kernighan
+import local_search
+import restricted_dp
+
+
+def _held_karp(dists):
+    cost, path = held_karp.held_karp(dists)
+    return path + [0], cost
+
+
+def _held_karp_array(dists):
+    cost, path = held_karp.held_karp_array(dists)
+    return path + [0], cost
+
+
+def _held_karp_disk(dists):
+    cost, path = held_karp_disk.held_karp_disk(dists)
+    return path + [0], cost
+
+
+def _nn_local_search(dists):
+    tour, _ = greedy_nearestneighbor.solve_nn_tsp(dists)
+    return local_search.improve_tour(tour, dists)
+
+
+def _restricted_dp(dists):
+    cost, path = restricted_dp.restricted_dp(dists)
+    return path + [0], cost
+
+
+def _lin_kernighan(dists):
+    return lin_kernighan.solve_lk_tsp(dists, time_budget=1.0, seed=0)
+
+
+# Every entry takes a distance matrix and returns (tour, cost), the tour
+# closed at city 0 ([0, ..., 0]). Entries are module-level functions so
+# they can be sent to worker processes by name.
+SOLVERS = {
+    'exhaustive': exhaustive_search.solve_tsp_exhaustive,
+    'exhaustive_symmetric': exhaustive_search.solve_tsp_exhaustive_symmetric,
+    'branch_and_bound': branch_and_bound.solve_tsp_branch_and_bound,
+    'held_karp': _held_karp,
+    'held_karp_array': _held_karp_array,
+    'held_karp_disk': _held_karp_disk,
+    'nn': greedy_nearestneighbor.solve_nn_tsp,
+    'nn_array': greedy_nearestneighbor.solve_nn_tsp_array,
+    'nn_ls': _nn_local_search,
+    'lk': _lin_kernighan,
+    'restricted_dp': _restricted_dp,
+}
+
+# Solvers that always return an optimal tour
+EXACT = {'exhaustive', 'exhaustive_symmetric', 'branch_and_bound', 'held_karp', 'held_karp_array', 'held_karp_disk'}
+
+
+def get_solver(name):
+    try:
+        return SOLVERS[name]
+    except KeyError:
+        raise ValueError(f"unknown solver {name!r}, expected one of {sorted(SOLVERS)}") from None
@@ -0,0 +1,37 @@
+import itertools
+
+import pytest
+
+import instances
+import solvers
+from batch import BatchSolver, solve_batch
+
+
+def matrices(count, n=7):
+    return [instances.generate('uniform', n, seed).tolist() for seed in range(count)]
+
+
+def test_results_in_input_order():
+    batch = matrices(23)
+    expected = [solvers.get_solver('held_karp_array')(m) for m in batch]
+    assert list(solve_batch(batch, 'held_karp_array', workers=2, chunksize=4)) == expected
+
+
+def test_pool_is_reused_across_batches_and_streams():
+    batch = matrices(10)
+    with BatchSolver(workers=2, chunksize=3, max_pending=2) as pool:
+        first = list(pool.solve(iter(batch), 'nn'))
+        second = list(pool.solve((m for m in batch), 'nn'))
+        # a lazy stream is consumed a bounded number of chunks ahead
+        stream = pool.solve(itertools.cycle(batch), 'nn')
+        assert list(itertools.islice(stream, 15)) == (first + first)[:15]
+    assert first == second == [solvers.get_solver('nn')(m) for m in batch]
+
+
+def test_unknown_solver():
+    with pytest.raises(ValueError, match="unknown solver"):
+        list(solve_batch(matrices(1), 'simulated_annealing', workers=1))
+
+
+def test_empty_batch():
+    assert list(solve_batch([], workers=1)) == []
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+import benchmark
+import instances
+from results_store import ResultsStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(instances, 'CORPUS_DIR', str(tmp_path / 'corpus'))
+    monkeypatch.setattr(benchmark, 'run_metadata',
+                        lambda: {'sweep': 's', 'host': 'h', 'commit': 'c', 'dirty': False})
+    return ResultsStore(str(tmp_path / 'results.jsonl'))
+
+
+def run(store, **kwargs):
+    options = dict(solver_names=['held_karp'], sizes=range(4, 6), time_budget=5.0,
+                   min_runs=2, max_runs=2, store=store, resume=True, log=None)
+    options.update(kwargs)
+    return benchmark.run_benchmark(**options)
+
+
+def test_results_are_valid(store):
+    report = run(store, solver_names=['held_karp', 'nn_ls'], resume=False)
+    assert [r['status'] for r in report['results']] == ['ok'] * 4
+    assert report['feasible'] == {'held_karp': 5, 'nn_ls': 5}
+    cells = store.cells()
+    assert set(cells) == {(s, n, 0) for s in ('held_karp', 'nn_ls') for n in (4, 5)}
+    assert sum(1 for r in store.query(kind='run')) == 8
+
+
+def test_resume_skips_finished_cells(store):
+    run(store)
+    size = os.path.getsize(store.path)
+    report = run(store)
+    assert os.path.getsize(store.path) == size
+    assert [r['status'] for r in report['results']] == ['ok', 'ok']
+
+
+def test_resume_requires_same_settings(store):
+    run(store)
+    size = os.path.getsize(store.path)
+    run(store, time_budget=4.0)
+    assert os.path.getsize(store.path) > size
+
+
+def test_resume_retries_errors(store):
+    run(store)
+    # a later error record for the same cell and settings
+    cell = dict(store.cells()[('held_karp', 4, 0)], status='error', error='boom')
+    store.append(cell)
+    size = os.path.getsize(store.path)
+    report = run(store)
+    assert report['results'][0]['status'] == 'ok'
+    assert os.path.getsize(store.path) > size
+
+
+def test_dirty_tree_does_not_resume(store, monkeypatch):
+    run(store)
+    monkeypatch.setattr(benchmark, 'run_metadata',
+                        lambda: {'sweep': 't', 'host': 'h', 'commit': 'c', 'dirty': True})
+    size = os.path.getsize(store.path)
+    run(store)
+    assert os.path.getsize(store.path) > size
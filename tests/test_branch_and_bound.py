@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+import held_karp
+import instances
+from branch_and_bound import solve_tsp_branch_and_bound
+from tour_eval import validate_tour
+
+
+@pytest.mark.parametrize('n', [2, 3, 5, 9, 11])
+@pytest.mark.parametrize('family', ['uniform', 'asymmetric', 'euclidean', 'clustered'])
+def test_optimal_cost(family, n):
+    d = instances.generate(family, n, 11).tolist()
+    tour, cost = solve_tsp_branch_and_bound(d)
+    validate_tour(tour, n, d, cost)
+    assert cost == held_karp.held_karp(d)[0]
+
+
+def test_float_distances():
+    d = np.random.default_rng(1).uniform(0, 1, size=(9, 9))
+    np.fill_diagonal(d, 0)
+    tour, cost = solve_tsp_branch_and_bound(d.tolist())
+    assert cost == pytest.approx(held_karp.held_karp(d.tolist())[0])
+
+
+def test_single_city():
+    assert solve_tsp_branch_and_bound([[0]]) == ([0, 0], 0)
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import cache
+import instances
+from cache import SolutionCache
+from tour_eval import validate_tour
+
+
+def relabel(d, perm):
+    d = np.asarray(d)
+    return d[np.ix_(perm, perm)]
+
+
+@pytest.mark.parametrize('family', ['uniform', 'asymmetric', 'euclidean'])
+def test_fingerprint_ignores_labelling_for_exact_solvers(family):
+    d = instances.generate(family, 9, 3)
+    perm = np.random.default_rng(0).permutation(9)
+    assert cache.fingerprint(d, 'held_karp')[0] == cache.fingerprint(relabel(d, perm), 'held_karp')[0]
+    assert cache.fingerprint(d, 'nn')[0] != cache.fingerprint(relabel(d, perm), 'nn')[0]
+
+
+def test_fingerprint_ignores_container_type():
+    d = instances.generate('uniform', 6, 0)
+    key = cache.fingerprint(d, 'held_karp')[0]
+    assert cache.fingerprint(d.tolist(), 'held_karp')[0] == key
+    assert cache.fingerprint(d.astype(np.int32), 'held_karp')[0] == key
+    assert cache.fingerprint(d, 'branch_and_bound')[0] != key
+
+
+def test_relabelled_hit_is_mapped_back():
+    d = instances.generate('asymmetric', 8, 5)
+    perm = np.random.default_rng(1).permutation(8)
+    other = relabel(d, perm).tolist()
+    c = SolutionCache()
+    _, cost = c.solve(d.tolist())
+    tour, hit_cost = c.solve(other)
+    assert c.stats()['hits'] == 1
+    assert hit_cost == cost
+    validate_tour(tour, 8, other, cost)
+
+
+def test_heuristics_need_the_same_matrix():
+    d = instances.generate('uniform', 8, 2).tolist()
+    c = SolutionCache()
+    first = c.solve(d, 'nn')
+    assert c.solve(d, 'nn') == first
+    c.solve(relabel(d, [1, 0, 2, 3, 4, 5, 6, 7]).tolist(), 'nn')
+    assert (c.hits, c.misses) == (1, 2)
+
+
+def test_lru_eviction():
+    c = SolutionCache(maxsize=2)
+    ds = [instances.generate('uniform', 5, seed).tolist() for seed in range(3)]
+    for d in ds:
+        c.solve(d)
+    c.solve(ds[2])
+    assert c.get(ds[0]) is None
+    assert len(c) == 2
+    assert c.stats()['evictions'] == 1
+
+
+def test_disk_layer_survives_restarts(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    d = instances.generate('euclidean', 7, 4).tolist()
+    with SolutionCache(path=path) as c:
+        result = c.solve(d)
+    with SolutionCache(path=path) as c:
+        assert c.get(d) == result
+        assert c.stats()['disk_hits'] == 1
+        c.clear()
+    with SolutionCache(path=path) as c:
+        assert c.get(d) is None
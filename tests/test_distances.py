@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from distances import (CoordinateDistances, ListDistances, TriangularDistances, as_distances,
+                       get_row, is_symmetric)
+
+
+@pytest.fixture
+def matrix():
+    rng = np.random.default_rng(0)
+    m = np.triu(rng.integers(1, 100, size=(9, 9)), 1)
+    return m + m.T
+
+
+def providers(matrix):
+    return [ListDistances(matrix.tolist()), TriangularDistances.from_matrix(matrix),
+            TriangularDistances.from_matrix(matrix, dtype=np.int16, cache_rows=2)]
+
+
+def test_providers_index_like_the_matrix(matrix):
+    for d in providers(matrix):
+        assert len(d) == 9
+        assert np.array_equal(np.asarray(d), matrix)
+        for i in range(9):
+            assert d[i] == matrix[i].tolist()
+            assert np.array_equal(d.row(i), matrix[i])
+            assert np.array_equal(get_row(d, i), matrix[i])
+            for j in range(9):
+                assert d[i, j] == d[i][j] == matrix[i, j]
+        i, j = np.indices((9, 9))
+        assert np.array_equal(d.pairs(i.ravel(), j.ravel()), matrix.ravel())
+
+
+def test_triangular_overflow(matrix):
+    with pytest.raises(OverflowError):
+        TriangularDistances.from_matrix(matrix * 1000, dtype=np.int8)
+    with pytest.raises(ValueError):
+        TriangularDistances(np.zeros(5), 4)
+
+
+def test_coordinates():
+    pts = np.random.default_rng(1).uniform(0, 10, size=(20, 2))
+    expected = np.sqrt(((pts[:, None] - pts[None]) ** 2).sum(axis=2))
+    d = CoordinateDistances(pts)
+    assert np.allclose(np.asarray(d), expected)
+    # scalar and row access give identical floats
+    assert all(d[3, j] == d.row(3)[j] for j in range(20))
+    rounded = CoordinateDistances(pts, rounded=True)
+    assert np.array_equal(np.asarray(rounded), np.rint(expected))
+    assert rounded[3, 7] == np.rint(expected[3, 7]) and isinstance(rounded[3, 7], int)
+
+
+def test_as_distances_and_symmetry(matrix):
+    assert isinstance(as_distances(matrix.tolist()), np.ndarray)
+    tri = TriangularDistances.from_matrix(matrix)
+    assert as_distances(tri) is tri
+    assert is_symmetric(matrix) and is_symmetric(tri) and is_symmetric(ListDistances(matrix))
+    skew = matrix.copy()
+    skew[0, 1] += 1
+    assert not is_symmetric(skew)
+    assert not is_symmetric(ListDistances(skew.tolist()))
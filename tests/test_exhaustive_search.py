@@ -0,0 +1,44 @@
+import pytest
+
+import exhaustive_search
+import instances
+from tour_eval import validate_tour
+
+
+@pytest.mark.parametrize('n', [3, 5, 8])
+@pytest.mark.parametrize('family', ['uniform', 'asymmetric'])
+def test_parallel_matches_serial(family, n):
+    d = instances.generate(family, n, 4).tolist()
+    assert exhaustive_search.solve_tsp_exhaustive_parallel(d, workers=2) == \
+        exhaustive_search.solve_tsp_exhaustive(d)
+
+
+def test_parallel_ties_match_serial():
+    d = [[0 if i == j else 5 for j in range(7)] for i in range(7)]
+    assert exhaustive_search.solve_tsp_exhaustive_parallel(d, workers=3) == \
+        exhaustive_search.solve_tsp_exhaustive(d)
+
+
+def test_serial_result_is_a_tour():
+    d = instances.generate('euclidean', 8, 1).tolist()
+    tour, cost = exhaustive_search.solve_tsp_exhaustive(d)
+    validate_tour(tour, 8, d, cost)
+
+
+@pytest.mark.parametrize('n', [2, 3, 6, 9])
+@pytest.mark.parametrize('family', ['uniform', 'euclidean'])
+def test_symmetric_matches_full_search(family, n):
+    d = instances.generate(family, n, 2).tolist()
+    assert exhaustive_search.solve_tsp_exhaustive_symmetric(d) == \
+        exhaustive_search.solve_tsp_exhaustive(d)
+
+
+def test_symmetric_ties_match_full_search():
+    d = [[0 if i == j else 2 for j in range(7)] for i in range(7)]
+    assert exhaustive_search.solve_tsp_exhaustive_symmetric(d) == \
+        exhaustive_search.solve_tsp_exhaustive(d)
+
+
+def test_symmetric_rejects_asymmetric_matrix():
+    with pytest.raises(ValueError, match="symmetric"):
+        exhaustive_search.solve_tsp_exhaustive_symmetric(instances.generate('asymmetric', 5, 0))
@@ -0,0 +1,24 @@
+import graphs_results
+from results_store import DEFAULT_PATH, ResultsStore
+
+
+def test_plots_latest_sweep_without_display(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ResultsStore(DEFAULT_PATH).extend(
+        {'kind': 'run', 'source': 'main.py', 'sweep': 's', 'solver': solver, 'n': n,
+         'time': 1e-4 * n * scale, 'cost': 100}
+        for solver, scale in (('exhaustive', 10), ('held_karp', 3), ('branch_and_bound', 2),
+                              ('nn', 1), ('nn_ls', 1))
+        for n in (4, 5, 6, 7))
+    results = graphs_results.load_results()
+    assert results['test_cases'] == [4, 5, 6, 7]
+    assert results['max_feasible_bb'] == 7
+    graphs_results.plot_results(show=False, dpi=20)
+    assert (tmp_path / 'tsp_comprehensive_analysis.png').exists()
+
+
+def test_no_store(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    graphs_results.plot_results(show=False)
+    assert "Run 'main.py' first" in capsys.readouterr().out
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pytest
+
+import held_karp
+import instances
+from tour_eval import validate_tour
+
+FAMILIES = ['uniform', 'asymmetric', 'euclidean']
+
+
+def shm_segments():
+    return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+
+@pytest.mark.parametrize('n', [5, 9])
+@pytest.mark.parametrize('family', FAMILIES)
+def test_parallel_matches_dict(monkeypatch, family, n):
+    monkeypatch.setattr(held_karp, 'PARALLEL_HK_MIN_N', 0)
+    d = instances.generate(family, n, 7)
+    assert held_karp.held_karp_parallel(d, workers=2) == held_karp.held_karp(d.tolist())
+
+
+def test_parallel_releases_shared_memory_on_error(monkeypatch):
+    monkeypatch.setattr(held_karp, 'PARALLEL_HK_MIN_N', 0)
+
+    def fail(*args):
+        raise RuntimeError("backtrack failed")
+
+    monkeypatch.setattr(held_karp, '_hk_backtrack', fail)
+    before = shm_segments()
+    with pytest.raises(RuntimeError, match="backtrack failed"):
+        held_karp.held_karp_parallel(instances.generate('uniform', 8, 0), workers=2)
+    assert shm_segments() <= before
+
+
+@pytest.mark.parametrize('n', [2, 3, 6, 10])
+@pytest.mark.parametrize('family', FAMILIES)
+def test_array_matches_dict(family, n):
+    d = instances.generate(family, n, n)
+    assert held_karp.held_karp_array(d) == held_karp.held_karp(d.tolist())
+
+
+def test_array_ties_break_like_dict():
+    # all tours cost the same, so only the tie-break decides the path
+    d = [[0 if i == j else 1 for j in range(7)] for i in range(7)]
+    assert held_karp.held_karp_array(d) == held_karp.held_karp(d)
+
+
+def test_array_floats_and_large_integers():
+    rng = np.random.default_rng(0)
+    floats = rng.uniform(0, 10, size=(8, 8))
+    assert held_karp.held_karp_array(floats) == held_karp.held_karp(floats.tolist())
+    # too large for an int32 table
+    big = instances.generate('uniform', 8, 0) * 10 ** 8
+    cost, _ = held_karp.held_karp_array(big)
+    assert cost == held_karp.held_karp(big.tolist())[0]
+    assert cost > 2 ** 31
+
+
+def test_array_path_is_a_tour():
+    d = instances.generate('asymmetric', 11, 2)
+    cost, path = held_karp.held_karp_array(d)
+    validate_tour(path + [0], 11, d, cost)
+
+
+def test_array_needs_two_cities():
+    with pytest.raises(ValueError):
+        held_karp.held_karp_array([[0]])
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+import held_karp
+import held_karp_disk
+import instances
+
+
+@pytest.mark.parametrize('n', [2, 3, 7, 10])
+@pytest.mark.parametrize('family', ['uniform', 'asymmetric', 'euclidean'])
+def test_matches_held_karp(family, n):
+    d = instances.generate(family, n, n)
+    assert held_karp_disk.held_karp_disk(d) == held_karp.held_karp(d.tolist())
+
+
+def test_resumes_after_last_checkpoint(tmp_path, monkeypatch):
+    d = instances.generate('asymmetric', 9, 1)
+    fill = held_karp_disk._fill_layer
+    layers = []
+
+    def interrupted(prev, cur, parent, subset_size, into, binom):
+        if subset_size == 6:
+            raise KeyboardInterrupt
+        layers.append(subset_size)
+        fill(prev, cur, parent, subset_size, into, binom)
+
+    monkeypatch.setattr(held_karp_disk, '_fill_layer', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        held_karp_disk.held_karp_disk(d, str(tmp_path), checkpoint_every=0)
+    assert layers == [2, 3, 4, 5]
+
+    calls = []
+    monkeypatch.setattr(held_karp_disk, '_fill_layer',
+                        lambda *args: calls.append(args[3]) or fill(*args))
+    assert held_karp_disk.held_karp_disk(d, str(tmp_path)) == held_karp.held_karp(d.tolist())
+    assert calls == [6, 7, 8]
+    assert os.listdir(tmp_path) == []
+
+
+def test_refuses_another_instance(tmp_path):
+    held_karp_disk.held_karp_disk(instances.generate('uniform', 6, 0), str(tmp_path), keep=True)
+    with pytest.raises(ValueError, match="different instance"):
+        held_karp_disk.held_karp_disk(instances.generate('uniform', 6, 1), str(tmp_path))
+
+
+def test_needs_two_cities():
+    with pytest.raises(ValueError):
+        held_karp_disk.held_karp_disk([[0]])
@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+import pytest
+
+import benchmark
+import held_karp
+import instances
+import matrix
+from distances import DistanceProvider
+
+
+@pytest.mark.parametrize('family', instances.FAMILIES)
+def test_deterministic(family):
+    a = instances.generate(family, 12, 5)
+    assert np.array_equal(a, instances.generate(family, 12, 5))
+    assert not np.array_equal(a, instances.generate(family, 12, 6))
+    assert a.dtype == np.int64
+    assert (np.diagonal(a) == 0).all()
+    assert np.array_equal(a, a.T) == (family != 'asymmetric')
+
+
+def test_value_range():
+    m = instances.generate('uniform', 50, 0, low=1, high=99)
+    off = m[~np.eye(50, dtype=bool)]
+    assert off.min() >= 1 and off.max() <= 99
+
+
+@pytest.mark.parametrize('family', instances.FAMILIES)
+def test_providers_match_matrices(monkeypatch, family):
+    matrix_ = instances.generate(family, 30, 2)
+    # the same instance past the threshold is a provider with equal distances
+    monkeypatch.setattr(instances, 'MATRIX_MAX_N', 10)
+    provider = instances.generate(family, 30, 2)
+    assert isinstance(provider, DistanceProvider)
+    assert np.array_equal(np.asarray(provider), matrix_)
+    assert provider[3, 7] == matrix_[3, 7]
+    assert np.array_equal(provider.pairs(np.arange(30), np.arange(30)[::-1]),
+                          matrix_[np.arange(30), np.arange(30)[::-1]])
+
+
+def test_list_generators_above_threshold(monkeypatch):
+    monkeypatch.setattr(instances, 'MATRIX_MAX_N', 10)
+    assert isinstance(matrix.gen_distance_matrix(20, 1), DistanceProvider)
+    assert isinstance(held_karp.generate_distances(20, 1), DistanceProvider)
+    assert matrix.gen_distance_matrix(5, 1) == matrix.gen_distance_matrix(5, 1)
+    assert isinstance(held_karp.generate_distances(5, 1), list)
+
+
+@pytest.mark.parametrize('family', instances.FAMILIES)
+def test_corpus_round_trip(tmp_path, family):
+    loaded = instances.load_instance(family, 8, 3, root=str(tmp_path))
+    assert np.array_equal(np.asarray(loaded), instances.generate(family, 8, 3))
+    # the second load reads the saved file
+    assert np.array_equal(np.asarray(instances.load_instance(family, 8, 3, root=str(tmp_path))),
+                          np.asarray(loaded))
+    files = [f for _, _, names in os.walk(tmp_path) for f in names]
+    assert files == ['n8_s3.tspd']
+
+
+def test_corpus_points(tmp_path, monkeypatch):
+    monkeypatch.setattr(instances, 'MATRIX_MAX_N', 10)
+    loaded = instances.load_instance('clustered', 40, 0, root=str(tmp_path))
+    assert instances.instance_path('clustered', 40, 0, str(tmp_path)).endswith('.npy')
+    assert np.array_equal(np.asarray(loaded), np.asarray(instances.generate('clustered', 40, 0)))
+
+
+def test_build_corpus(tmp_path):
+    instances.build_corpus(['uniform', 'euclidean'], range(3, 6), seeds=(0, 1),
+                           root=str(tmp_path), log=None)
+    for family in ('uniform', 'euclidean'):
+        for n in range(3, 6):
+            for seed in (0, 1):
+                assert os.path.exists(instances.instance_path(family, n, seed, str(tmp_path)))
+
+
+def test_unknown_family():
+    with pytest.raises(ValueError, match="unknown instance family"):
+        instances.generate('grid', 5)
+
+
+def test_benchmark_instances_stay_lazy_above_threshold(monkeypatch, tmp_path):
+    monkeypatch.setattr(instances, 'CORPUS_DIR', str(tmp_path))
+    monkeypatch.setattr(instances, 'MATRIX_MAX_N', 8)
+    assert isinstance(benchmark.generate_instance(8, 0), list)
+    for family in ('uniform', 'euclidean'):
+        assert isinstance(benchmark.generate_instance(9, 0, family), DistanceProvider)
@@ -0,0 +1,43 @@
+import os
+import time
+
+import branch_and_bound
+import held_karp
+import instances
+from instrumentation import SolveStats, profiled
+
+
+def test_begin_is_not_reset_by_nested_solves():
+    stats = SolveStats()
+    stats.begin()
+    time.sleep(0.02)
+    stats.begin()  # as a nested solver would
+    stats.lap('outer')
+    assert stats.phases['outer'] >= 0.02
+
+
+def test_branch_and_bound_counts_only_with_stats():
+    d = instances.generate('uniform', 10, 4).tolist()
+    stats = SolveStats()
+    assert branch_and_bound.solve_tsp_branch_and_bound(d, stats=stats) == \
+        branch_and_bound.solve_tsp_branch_and_bound(d)
+    assert stats.counters['states_expanded'] > 0
+    assert 'nodes_pruned' in stats.counters
+    assert set(stats.phases) >= {'setup', 'search'}
+
+
+def test_held_karp_counts_are_closed_form():
+    d = instances.generate('uniform', 8, 0).tolist()
+    a, b = SolveStats(), SolveStats()
+    held_karp.held_karp(d, stats=a)
+    held_karp.held_karp_array(d, stats=b)
+    assert a.counters['states_expanded'] == b.counters['states_expanded'] == 7 * 2 ** 6
+
+
+def test_profiled_writes_files(tmp_path):
+    d = instances.generate('uniform', 6, 0).tolist()
+    result = profiled(held_karp.held_karp, d, label='hk', profile_dir=str(tmp_path))
+    assert result == held_karp.held_karp(d)
+    names = sorted(os.listdir(tmp_path))
+    assert [os.path.splitext(name)[1] for name in names] == ['.prof', '.txt']
+    assert all(name.startswith('hk-') for name in names)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import greedy_nearestneighbor
+import held_karp
+import instances
+from distances import CoordinateDistances
+from lin_kernighan import solve_lk_tsp
+from tour_eval import tour_cost, validate_tour
+
+
+@pytest.mark.parametrize('family', ['uniform', 'euclidean', 'clustered'])
+def test_valid_and_not_worse_than_start(family):
+    d = instances.generate(family, 150, 2)
+    start, start_cost = greedy_nearestneighbor.solve_nn_tsp_array(d)
+    tour, cost = solve_lk_tsp(d, time_budget=0.2, start_tour=start, seed=0)
+    validate_tour(tour, 150, d, cost)
+    assert cost <= start_cost
+
+
+def test_keeps_start_city():
+    d = instances.generate('uniform', 30, 0)
+    start = list(range(7, 30)) + list(range(7))
+    tour, cost = solve_lk_tsp(d, time_budget=0.05, start_tour=start, seed=1)
+    assert tour[0] == tour[-1] == 7
+    assert cost == tour_cost(d, tour)
+
+
+def test_small_instances_are_returned_as_given():
+    d = instances.generate('uniform', 5, 0)
+    assert solve_lk_tsp(d, time_budget=0.01, start_tour=[0, 2, 1, 4, 3, 0]) == \
+        ([0, 2, 1, 4, 3, 0], tour_cost(d, [0, 2, 1, 4, 3, 0]))
+
+
+def test_reaches_optimum_on_small_instance():
+    d = instances.generate('euclidean', 11, 5)
+    _, cost = solve_lk_tsp(d, time_budget=0.3, seed=0)
+    assert cost == held_karp.held_karp(d.tolist())[0]
+
+
+def test_provider_input():
+    pts = np.random.default_rng(0).uniform(0, 1000, size=(400, 2))
+    d = CoordinateDistances(pts)
+    tour, cost = solve_lk_tsp(d, time_budget=0.2, seed=0)
+    validate_tour(tour, 400, d, cost)
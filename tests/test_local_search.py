@@ -0,0 +1,61 @@
+import time
+
+import numpy as np
+import pytest
+
+import greedy_nearestneighbor
+from distances import CoordinateDistances, TriangularDistances
+from local_search import improve_tour, two_opt
+from tour_eval import tour_cost, validate_tour
+
+
+def random_symmetric(n, seed):
+    rng = np.random.default_rng(seed)
+    m = rng.integers(10, 150, size=(n, n))
+    m = np.triu(m, 1)
+    return m + m.T
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('or_opt', [True, False])
+def test_improves_without_worsening(seed, or_opt):
+    d = random_symmetric(40, seed)
+    start, start_cost = greedy_nearestneighbor.solve_nn_tsp_array(d)
+    tour, cost = improve_tour(start, d, or_opt=or_opt)
+    validate_tour(tour, 40, d, cost)
+    assert cost <= start_cost
+
+
+def test_keeps_start_city():
+    d = random_symmetric(12, 1)
+    tour, _ = two_opt([5] + [c for c in range(12) if c != 5] + [5], d)
+    assert tour[0] == tour[-1] == 5
+
+
+def test_providers():
+    pts = np.random.default_rng(3).uniform(0, 100, size=(30, 2))
+    coords = CoordinateDistances(pts)
+    tour, cost = improve_tour(list(range(30)) + [0], coords)
+    validate_tour(tour, 30, coords, cost)
+    assert cost <= tour_cost(coords, list(range(30)) + [0])
+
+    d = random_symmetric(20, 4)
+    assert improve_tour(list(range(20)), TriangularDistances.from_matrix(d)) == \
+        improve_tour(list(range(20)), d)
+
+
+def test_rejects_asymmetric():
+    # 2-opt gains assume symmetry; on this family the search used to never end
+    d = np.random.default_rng(0).integers(10, 150, size=(30, 30))
+    np.fill_diagonal(d, 0)
+    with pytest.raises(ValueError, match="symmetric"):
+        improve_tour(list(range(30)), d)
+
+
+def test_deadline_stops_early():
+    pts = np.random.default_rng(5).uniform(0, 1000, size=(2000, 2))
+    d = CoordinateDistances(pts)
+    start = list(range(2000))
+    tour, cost = improve_tour(start, d, deadline=time.perf_counter())
+    validate_tour(tour, 2000, d, cost)
+    assert cost <= tour_cost(d, start + [0])
@@ -0,0 +1,28 @@
+import tracemalloc
+
+import held_karp
+import instances
+import main
+
+
+def test_within_budget_stops_on_prediction():
+    cases = [3, 6, 9, 12]
+    # exponential growth, 10 s is predicted well before n=30
+    times = [1e-5, 1e-4, 1e-3, 1e-2]
+    assert main.within_budget(cases, times, 15, "HK", 10.0)
+    assert not main.within_budget(cases, times, 30, "HK", 10.0)
+    # skipped once, skipped for good
+    assert not main.within_budget(cases, [1e-5, 1e-4, 1e-3, None], 15, "HK", 10.0)
+
+
+def test_dict_table_estimate():
+    d = instances.generate('uniform', 14, 0).tolist()
+    tracemalloc.start()
+    try:
+        held_karp.held_karp(d)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert 0.5 < peak / held_karp.dict_table_bytes(14) < 1.5
+    # main's default limit keeps the old cap of 20 cities
+    assert held_karp.dict_table_bytes(20) <= 1024 * 2 ** 20 < held_karp.dict_table_bytes(21)
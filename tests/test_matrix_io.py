@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+import held_karp
+import instances
+import matrix_io
+from distances import TriangularDistances
+
+
+def write_csv(path, matrix, comment=True):
+    with open(path, 'w') as f:
+        if comment:
+            f.write('# distances\n')
+        for row in matrix:
+            f.write(','.join(str(v) for v in row) + '\n')
+
+
+@pytest.mark.parametrize('dtype', ['int32', 'int64', 'float64'])
+@pytest.mark.parametrize('triangular', [False, True])
+def test_write_load_round_trip(tmp_path, dtype, triangular):
+    m = instances.generate('uniform', 11, 0).astype(dtype)
+    path = str(tmp_path / 'm.tspd')
+    matrix_io.write_matrix(path, m, triangular=triangular)
+    loaded = matrix_io.load_matrix(path)
+    assert isinstance(loaded, TriangularDistances) == triangular
+    assert np.array_equal(np.asarray(loaded), m)
+    header = matrix_io.read_header(path)
+    assert header['n'] == 11 and header['dtype'] == np.dtype(dtype)
+
+
+@pytest.mark.parametrize('triangular', [False, True])
+def test_csv_to_binary(tmp_path, triangular):
+    m = instances.generate('uniform', 30, 1)
+    csv_path = str(tmp_path / 'm.csv')
+    write_csv(csv_path, m)
+    out = str(tmp_path / 'm.tspd')
+    # small chunks exercise the chunk boundaries
+    assert matrix_io.csv_to_binary(csv_path, out, triangular=triangular, chunk_rows=7) == 30
+    assert np.array_equal(np.asarray(matrix_io.load_matrix(out)), m)
+    assert held_karp.read_distances(csv_path) == m.tolist()
+
+
+def test_csv_ragged_rows_are_rejected(tmp_path):
+    # n-1 values then n+1: the chunk still holds n*n values in total
+    rows = [['0', '1', '2'], ['1', '0'], ['2', '3', '0', '9']]
+    csv_path = tmp_path / 'ragged.csv'
+    csv_path.write_text('\n'.join(','.join(r) for r in rows) + '\n')
+    with pytest.raises(ValueError, match="line 2 has 2 values, expected 3"):
+        matrix_io.csv_to_binary(str(csv_path), str(tmp_path / 'out.tspd'))
+
+
+def test_csv_missing_rows_are_rejected(tmp_path):
+    csv_path = tmp_path / 'short.csv'
+    csv_path.write_text('0,1,2\n1,0,3\n')
+    with pytest.raises(ValueError, match="expected 3 rows, found 2"):
+        matrix_io.csv_to_binary(str(csv_path), str(tmp_path / 'out.tspd'))
+
+
+def test_bad_headers(tmp_path):
+    path = tmp_path / 'bad.tspd'
+    path.write_bytes(b'short')
+    with pytest.raises(ValueError, match="truncated header"):
+        matrix_io.read_header(str(path))
+    path.write_bytes(b'X' * matrix_io.HEADER_SIZE)
+    with pytest.raises(ValueError, match="not a binary distance matrix"):
+        matrix_io.read_header(str(path))
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import greedy_nearestneighbor as nn
+import instances
+from distances import CoordinateDistances, TriangularDistances
+from tour_eval import validate_tour
+
+
+@pytest.mark.parametrize('start', [0, 4])
+@pytest.mark.parametrize('family', ['uniform', 'asymmetric', 'euclidean'])
+def test_array_matches_loop(family, start):
+    d = instances.generate(family, 40, 3)
+    path, cost = nn.solve_nn_tsp_array(d, start)
+    assert (path, cost) == nn.solve_nn_tsp(d.tolist(), start)
+    validate_tour(path, 40, d, cost, start=start)
+
+
+def test_array_ties_go_to_lowest_index():
+    d = [[0 if i == j else 1 for j in range(6)] for i in range(6)]
+    assert nn.solve_nn_tsp_array(d) == ([0, 1, 2, 3, 4, 5, 0], 6)
+
+
+def test_array_on_providers():
+    d = instances.generate('uniform', 25, 0)
+    assert nn.solve_nn_tsp_array(TriangularDistances.from_matrix(d)) == nn.solve_nn_tsp_array(d)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_coords_matches_matrix(seed):
+    pts = np.random.default_rng(seed).uniform(0, 100, size=(300, 2))
+    path, cost = nn.solve_nn_tsp_coords(pts, start_city_index=5)
+    expected_path, expected_cost = nn.solve_nn_tsp_array(CoordinateDistances(pts), 5)
+    # random float points have no distance ties, so the tours agree
+    assert path == expected_path
+    assert cost == pytest.approx(expected_cost)
+
+
+def test_coords_clustered_points():
+    pts = instances.points('clustered', 500, 1)
+    path, cost = nn.solve_nn_tsp_coords(pts)
+    validate_tour(path, 500, CoordinateDistances(pts), cost)
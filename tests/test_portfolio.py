@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+import held_karp
+import instances
+import portfolio
+from tour_eval import validate_tour
+
+
+@pytest.fixture(scope='module')
+def policy():
+    return portfolio.SelectionPolicy.measure(['held_karp_array'], runs=1)
+
+
+def test_small_instance_is_solved_exactly(policy):
+    d = instances.generate('uniform', 10, 3)
+    tour, cost, optimal = portfolio.solve(d, time_budget=2.0, policy=policy)
+    validate_tour(tour, 10, d, cost)
+    assert optimal
+    assert cost == held_karp.held_karp(d.tolist())[0]
+
+
+@pytest.mark.parametrize('family', ['uniform', 'asymmetric'])
+def test_meets_deadline(policy, family):
+    d = instances.generate(family, 300, 1)
+    start = time.perf_counter()
+    tour, cost, optimal = portfolio.solve(d, time_budget=0.5, policy=policy)
+    assert time.perf_counter() - start < 1.0
+    validate_tour(tour, 300, d, cost)
+    assert not optimal
+
+
+def test_predictions_grow_with_n(policy):
+    times = [policy.predict('held_karp_array', n) for n in (10, 15, 20)]
+    assert times[0] < times[1] < times[2]
+    assert policy.choose(60, 1.0) is None
+
+
+def test_first_call_meets_deadline(monkeypatch, tmp_path):
+    # no calibrated policy, no measured startup, no corpus on disk
+    monkeypatch.setattr(portfolio, '_policies', {})
+    monkeypatch.setattr(portfolio, '_job_startup', None)
+    monkeypatch.setattr(instances, 'CORPUS_DIR', str(tmp_path))
+    d = instances.generate('uniform', 14, 0)
+    start = time.perf_counter()
+    tour, cost, _ = portfolio.solve(d, deadline=start + 0.3)
+    assert time.perf_counter() - start < 0.35
+    validate_tour(tour, 14, d, cost)
+    assert list(tmp_path.iterdir()) == []
+    assert portfolio._job_startup is None
+
+
+def test_measure_writes_no_corpus(monkeypatch, tmp_path):
+    monkeypatch.setattr(instances, 'CORPUS_DIR', str(tmp_path))
+    portfolio.SelectionPolicy.measure(['held_karp'], runs=1)
+    assert list(tmp_path.iterdir()) == []
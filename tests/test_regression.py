@@ -0,0 +1,69 @@
+import random
+
+import regression
+from results_store import ResultsStore
+
+
+def write_runs(path, sweep, scale, ns=(6, 7, 8), runs=5, rss=1000, seed=0):
+    rng = random.Random(seed)
+    ResultsStore(str(path)).extend(
+        {'kind': 'run', 'sweep': sweep, 'solver': 'held_karp', 'n': n,
+         'time': scale * n * n * 2 ** n * 1e-7 * rng.uniform(0.98, 1.02), 'peak_rss_kb': rss}
+        for n in ns for _ in range(runs))
+
+
+def test_load_runs_skips_unusable_times(tmp_path):
+    store = ResultsStore(str(tmp_path / 'r.jsonl'))
+    store.extend([
+        {'kind': 'run', 'solver': 'nn', 'n': 5, 'time': 0.5, 'peak_rss_kb': 10},
+        {'kind': 'run', 'solver': 'nn', 'n': 5, 'time': 0.0},
+        {'kind': 'run', 'solver': 'nn', 'n': 5, 'time': None},
+        {'kind': 'run', 'solver': 'nn', 'n': 5, 'time': 0.7, 'peak_rss_kb': 30},
+        {'kind': 'cell', 'solver': 'nn', 'n': 5, 'time': 9.0},
+    ])
+    assert regression.load_runs(store.path) == {('nn', 5): {'times': [0.5, 0.7], 'peak_rss_kb': 30}}
+
+
+def test_same_runs_do_not_regress(tmp_path):
+    write_runs(tmp_path / 'r.jsonl', 'a', 1.0)
+    cells = regression.load_runs(str(tmp_path / 'r.jsonl'))
+    rows = regression.compare(cells, cells)
+    assert all(r['basis'] == 'measured' and not r['time_regressed'] for r in rows)
+
+
+def test_slowdown_is_flagged(tmp_path):
+    write_runs(tmp_path / 'r.jsonl', 'a', 1.0)
+    write_runs(tmp_path / 'r.jsonl', 'b', 1.5, seed=1)
+    base = regression.load_runs(str(tmp_path / 'r.jsonl'), sweep='a')
+    cand = regression.load_runs(str(tmp_path / 'r.jsonl'), sweep='b')
+    rows = regression.compare(base, cand)
+    assert all(r['time_regressed'] for r in rows)
+    assert all(abs(r['ratio'] - 1.5) < 0.05 for r in rows)
+
+
+def test_unmeasured_size_uses_the_fitted_model(tmp_path):
+    write_runs(tmp_path / 'r.jsonl', 'a', 1.0, ns=(6, 7, 8, 9))
+    write_runs(tmp_path / 'r.jsonl', 'b', 1.0, ns=(10,), seed=1)
+    base = regression.load_runs(str(tmp_path / 'r.jsonl'), sweep='a')
+    cand = regression.load_runs(str(tmp_path / 'r.jsonl'), sweep='b')
+    [row] = regression.compare(base, cand)
+    assert row['basis'] == 'model'
+    assert not row['time_regressed']
+
+
+def test_memory_growth_is_flagged(tmp_path):
+    write_runs(tmp_path / 'r.jsonl', 'a', 1.0, rss=1000)
+    write_runs(tmp_path / 'r.jsonl', 'b', 1.0, rss=1500)
+    base = regression.load_runs(str(tmp_path / 'r.jsonl'), sweep='a')
+    cand = regression.load_runs(str(tmp_path / 'r.jsonl'), sweep='b')
+    assert all(r['mem_regressed'] for r in regression.compare(base, cand))
+
+
+def test_main_exit_codes(tmp_path, capsys):
+    path = str(tmp_path / 'r.jsonl')
+    write_runs(path, 'a', 1.0)
+    write_runs(path, 'b', 2.0, seed=1)
+    assert regression.main([path, '--baseline-sweep', 'a', '--candidate-sweep', 'a']) == 0
+    assert regression.main([path, '--baseline-sweep', 'a', '--candidate-sweep', 'b']) == 1
+    assert regression.main([path, '--baseline-sweep', 'missing']) == 2
+    assert "TIME REGRESSION" in capsys.readouterr().out
@@ -0,0 +1,96 @@
+import csv
+import os
+import random
+import statistics
+
+import pytest
+
+import report
+from report import CellStats, render_report
+from results_store import ResultsStore
+
+
+def runs(solver, n, times, **fields):
+    return [{'kind': 'run', 'solver': solver, 'n': n, 'time': t, 'cost': 10, **fields}
+            for t in times]
+
+
+def summary(out_dir):
+    with open(os.path.join(out_dir, 'summary.csv')) as f:
+        return {(r['solver'], int(r['n'])): r for r in csv.DictReader(f)}
+
+
+def test_cell_stats_are_exact_below_the_reservoir():
+    times = [0.3, 0.1, 0.4, 0.2, 0.5, 0.9]
+    cell = CellStats()
+    for t in times:
+        cell.add(t, None, random.Random(0))
+    row = cell.row()
+    assert row['median'] == pytest.approx(statistics.median(times))
+    assert row['mean'] == pytest.approx(statistics.fmean(times))
+    assert row['stdev'] == pytest.approx(statistics.stdev(times))
+    assert (row['min'], row['max'], row['p95']) == (0.1, 0.9, 0.9)
+
+
+def test_cell_stats_keep_a_bounded_sample():
+    cell = CellStats()
+    rng = random.Random(0)
+    for i in range(1, 1001):
+        cell.add(i / 1000, None, rng)
+    assert len(cell.sample) == report.RESERVOIR
+    assert cell.row()['runs'] == 1000
+    assert CellStats.from_state(cell.to_state()).row() == cell.row()
+
+
+def test_incremental_rerun(tmp_path):
+    store = ResultsStore(str(tmp_path / 'r.jsonl'))
+    out = str(tmp_path / 'report')
+    store.extend(runs('nn', 5, [0.1, 0.2]) + runs('held_karp', 5, [1.0, 2.0]))
+
+    first = render_report(store.path, out, log=None)
+    assert sorted(first['changed']) == ['held_karp', 'nn']
+    assert os.path.exists(os.path.join(out, 'nn.svg'))
+
+    assert render_report(store.path, out, log=None) == {'records': 0, 'changed': [], 'files': []}
+
+    store.extend(runs('nn', 6, [0.3]))
+    again = render_report(store.path, out, log=None)
+    assert again['records'] == 1
+    assert again['changed'] == ['nn']
+    assert summary(out)[('nn', 6)]['runs'] == '1'
+
+
+def test_replaced_store_is_rebuilt(tmp_path):
+    path = str(tmp_path / 'r.jsonl')
+    out = str(tmp_path / 'report')
+    ResultsStore(path).extend(runs('nn', 5, [0.1, 0.2, 0.3]))
+    render_report(path, out, log=None)
+
+    os.remove(path)
+    ResultsStore(path).extend(runs('nn', 5, [0.5]))
+    result = render_report(path, out, log=None)
+    assert result['records'] == 1
+    assert summary(out)[('nn', 5)]['runs'] == '1'
+
+
+def test_filters_and_unusable_records(tmp_path):
+    store = ResultsStore(str(tmp_path / 'r.jsonl'))
+    out = str(tmp_path / 'report')
+    store.extend(runs('nn', 5, [0.1], family='uniform') + runs('nn', 5, [0.2], family='euclidean')
+                 + runs('nn', 5, [0.0, None], family='uniform')
+                 + [{'kind': 'cell', 'solver': 'nn', 'n': 5, 'time': 1.0, 'family': 'uniform'}])
+    render_report(store.path, out, log=None, family='uniform')
+    rows = summary(out)
+    assert list(rows) == [('nn', 5)]
+    assert rows[('nn', 5)]['runs'] == '1'
+
+    # other filters start over
+    render_report(store.path, out, log=None, family='euclidean')
+    assert float(summary(out)[('nn', 5)]['max']) == 0.2
+
+
+def test_png_output(tmp_path):
+    store = ResultsStore(str(tmp_path / 'r.jsonl'))
+    store.extend(runs('nn', 5, [0.1]) + runs('nn', 6, [0.2]))
+    files = render_report(store.path, str(tmp_path / 'report'), fmt='png', log=None)['files']
+    assert sorted(os.path.basename(f) for f in files) == ['nn.png', 'overview.png', 'summary.csv']
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import held_karp
+import instances
+from restricted_dp import restricted_dp
+from tour_eval import tour_cost, validate_tour
+
+
+@pytest.mark.parametrize('family', ['uniform', 'asymmetric', 'euclidean'])
+@pytest.mark.parametrize('seed', range(3))
+def test_full_window_is_held_karp(family, seed):
+    d = instances.generate(family, 9, seed)
+    cost, path = restricted_dp(d, window=9)
+    assert cost == held_karp.held_karp(d.tolist())[0]
+    validate_tour(path + [0], 9, d, cost)
+
+
+@pytest.mark.parametrize('family', ['uniform', 'asymmetric'])
+def test_never_worse_than_start_tour(family):
+    d = instances.generate(family, 60, 2)
+    start = np.random.default_rng(0).permutation(60).tolist()
+    cost, path = restricted_dp(d, tour=start, window=5)
+    validate_tour(path + [0], 60, d, cost)
+    assert cost <= tour_cost(d, start + start[:1])
+
+
+def test_default_start_on_asymmetric_instance():
+    # the default start tour used to run local search, which never ended here
+    d = instances.generate('asymmetric', 30, 0)
+    cost, path = restricted_dp(d)
+    validate_tour(path + [0], 30, d, cost)
+
+
+def test_beam_width():
+    d = instances.generate('uniform', 40, 1)
+    cost, path = restricted_dp(d, window=8, beam_width=50)
+    validate_tour(path + [0], 40, d, cost)
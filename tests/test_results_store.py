@@ -0,0 +1,45 @@
+from results_store import ResultsStore, aggregate_runs, run_metadata
+
+
+def test_append_and_scan_from_offset(tmp_path):
+    store = ResultsStore(str(tmp_path / 'r.jsonl'))
+    assert list(store.scan()) == []
+    store.extend([{'kind': 'run', 'n': 3, 'time': 1.0}, {'kind': 'run', 'n': 4, 'time': 2.0}])
+    records = list(store.scan())
+    assert [r['n'] for r, _ in records] == [3, 4]
+
+    offset = records[-1][1]
+    store.append({'kind': 'cell', 'n': 4})
+    assert [r for r, _ in store.scan(offset)] == [{'kind': 'cell', 'n': 4}]
+
+
+def test_partial_line_is_left_for_the_next_scan(tmp_path):
+    store = ResultsStore(str(tmp_path / 'r.jsonl'))
+    store.append({'kind': 'run', 'n': 3})
+    with open(store.path, 'a') as f:
+        f.write('{"kind": "run", "n"')
+    assert [r['n'] for r, _ in store.scan()] == [3]
+
+
+def test_query_and_cells(tmp_path):
+    store = ResultsStore(str(tmp_path / 'r.jsonl'))
+    store.extend([
+        {'kind': 'cell', 'solver': 'hk', 'n': 5, 'seed': 0, 'status': 'time'},
+        {'kind': 'cell', 'solver': 'hk', 'n': 5, 'seed': 0, 'status': 'ok'},
+        {'kind': 'cell', 'solver': 'nn', 'n': 5, 'seed': 0, 'status': 'ok', 'host': 'b'},
+    ])
+    assert store.cells()[('hk', 5, 0)]['status'] == 'ok'
+    assert list(store.cells(host='b')) == [('nn', 5, 0)]
+
+
+def test_aggregate_runs():
+    records = [{'kind': 'run', 'sweep': 's', 'solver': 'hk', 'n': 5, 'time': t, 'cost': c}
+               for t, c in ((1.0, 10), (3.0, 8))] + [{'kind': 'cell', 'solver': 'hk', 'n': 5}]
+    assert aggregate_runs(records) == {('s', 'hk', 5): {'count': 2, 'total_time': 4.0, 'best_cost': 8}}
+
+
+def test_run_metadata():
+    meta = run_metadata('sweep-1')
+    assert meta['sweep'] == 'sweep-1'
+    assert set(meta) == {'sweep', 'host', 'commit', 'dirty'}
+    assert run_metadata()['sweep'] != run_metadata()['sweep']
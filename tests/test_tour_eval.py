@@ -0,0 +1,84 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import instances
+from distances import CoordinateDistances, TriangularDistances
+from tour_eval import best_permutation, tour_cost, tour_costs, validate_tour
+
+
+def enumerate_tours(d, start=0):
+    """The plain loop best_permutation stands in for."""
+    n = len(d)
+    best_tour, best_cost = None, None
+    for perm in itertools.permutations([c for c in range(n) if c != start]):
+        tour = [start, *perm, start]
+        cost = 0
+        for a, b in zip(tour, tour[1:]):
+            cost += d[a][b]
+        if best_cost is None or cost < best_cost:
+            best_tour, best_cost = tour, cost
+    return best_tour, best_cost
+
+
+def test_tour_costs():
+    d = instances.generate('asymmetric', 6, 0)
+    tours = [[0, 1, 2, 3, 4, 5, 0], [0, 5, 4, 3, 2, 1, 0]]
+    expected = [sum(d[a, b] for a, b in zip(t, t[1:])) for t in tours]
+    assert tour_costs(d, tours).tolist() == expected
+    assert tour_cost(d.tolist(), tours[1]) == expected[1]
+
+
+def test_tour_costs_on_providers():
+    pts = np.random.default_rng(0).uniform(0, 100, size=(7, 2))
+    provider = CoordinateDistances(pts)
+    tour = [0, 3, 1, 6, 2, 5, 4, 0]
+    assert tour_cost(provider, tour) == pytest.approx(tour_cost(np.asarray(provider), tour))
+    d = instances.generate('uniform', 7, 1)
+    assert tour_cost(TriangularDistances.from_matrix(d), tour) == tour_cost(d, tour)
+
+
+@pytest.mark.parametrize('tour, message', [
+    ([0, 1, 2, 0], "entries"),
+    ([1, 0, 2, 3, 1], "start and end"),
+    ([0, 1, 1, 2, 0], "exactly once"),
+])
+def test_validate_tour_errors(tour, message):
+    with pytest.raises(ValueError, match=message):
+        validate_tour(tour, 4)
+
+
+def test_validate_tour_cost():
+    d = instances.generate('uniform', 4, 2)
+    tour = [0, 2, 1, 3, 0]
+    cost = tour_cost(d, tour)
+    validate_tour(tour, 4, d, cost)
+    with pytest.raises(ValueError, match="reported cost"):
+        validate_tour(tour, 4, d, cost + 1)
+
+
+@pytest.mark.parametrize('block', [1, 3, 8])
+@pytest.mark.parametrize('n', [1, 2, 4, 7, 9])
+def test_best_permutation_matches_enumeration(n, block):
+    d = instances.generate('asymmetric', n, n).tolist()
+    assert best_permutation(d, block=block) == enumerate_tours(d)
+
+
+def test_best_permutation_start_and_ties():
+    d = [[0 if i == j else 3 for j in range(6)] for i in range(6)]
+    assert best_permutation(d, start=2, block=3) == enumerate_tours(d, start=2)
+
+
+@pytest.mark.parametrize('n', [3, 6, 10])
+def test_symmetric_matches_enumeration(n):
+    d = instances.generate('uniform', n, n).tolist()
+    assert best_permutation(d, symmetric=True, block=4) == enumerate_tours(d)
+
+
+def test_head_and_bound():
+    d = instances.generate('asymmetric', 8, 5).tolist()
+    tour, cost = enumerate_tours(d)
+    assert best_permutation(d, head=tour[1:3], block=3) == (tour, cost)
+    assert best_permutation(d, head=tour[1:3], bound=lambda: cost) == (tour, cost)
+    assert best_permutation(d, head=tour[1:3], bound=lambda: cost - 1) == (None, None)
@@ -0,0 +1,203 @@
+import itertools
+import math
+
+import numpy as np
+
+from distances import DistanceProvider, as_distances
+
+# Cities left to a suffix block in best_permutation: every prefix scores
+# BLOCK! tours at once (40320 for 8), a few MB of indices
+BLOCK = 8
+
+_suffix_perms = {}
+
+
+def tour_costs(dist_matrix, tours):
+    """
+    Costs of a batch of closed tours in one pass of fancy indexing.
+
+    Parameters:
+        dist_matrix: distance matrix (list of lists, 2-D array or
+            DistanceProvider)
+        tours: 2-D integer array (or list of lists) with one closed tour
+            ([0, ..., 0]) per row
+
+    Returns:
+        1-D array of costs, one per tour
+    """
+    d = as_distances(dist_matrix)
+    t = np.asarray(tours)
+    a, b = t[:, :-1], t[:, 1:]
+    if isinstance(d, DistanceProvider):
+        edges = d.pairs(a.ravel(), b.ravel()).reshape(a.shape)
+    else:
+        edges = d[a, b]
+    return edges.sum(axis=1)
+
+
+def tour_cost(dist_matrix, tour):
+    """Cost of one closed tour ([0, ..., 0]) as a Python number."""
+    return tour_costs(dist_matrix, [tour])[0].item()
+
+
+def validate_tour(tour, n, dist_matrix=None, cost=None, start=0, rel_tol=1e-9):
+    """
+    Checks that a solver's result is a closed tour visiting each of the n
+    cities exactly once, starting and ending at start, and, given the
+    matrix and a cost, that the cost is the tour's actual cost.
+
+    Raises:
+        ValueError: describing the first problem found
+    """
+    tour = list(tour)
+    if n == 0:
+        return
+    if len(tour) != n + 1:
+        raise ValueError(f"tour has {len(tour)} entries, expected {n + 1}")
+    if tour[0] != start or tour[-1] != start:
+        raise ValueError(f"tour must start and end at city {start}: {tour[0]} ... {tour[-1]}")
+    if sorted(tour[:-1]) != list(range(n)):
+        raise ValueError("tour does not visit every city exactly once")
+    if dist_matrix is not None and cost is not None:
+        actual = tour_cost(dist_matrix, tour)
+        if not math.isclose(actual, cost, rel_tol=rel_tol, abs_tol=rel_tol):
+            raise ValueError(f"reported cost {cost} but the tour costs {actual}")
+
+
+def best_permutation(dist_matrix, start=0, block=BLOCK, symmetric=False, head=(), bound=None):
+    """
+    The cheapest closed tour from start, by scoring every permutation of
+    the other cities.
+
+    Permutations are enumerated as a prefix and a suffix block. Prefixes
+    are walked depth first with their cost carried along incrementally; for
+    each one, all orderings of the last `block` cities are scored together
+    against a precomputed index array, so the inner work is array gathers
+    rather than interpreted loops. Tours are visited in the same
+    lexicographic order as itertools.permutations, costs are summed in the
+    same order (first edge first) and only a strictly cheaper tour
+    replaces the best, so the result, including ties, is that of the plain
+    enumeration in exhaustive_search.solve_tsp_exhaustive.
+
+    With symmetric=True the matrix is assumed symmetric, so a tour and its
+    reverse cost the same and only the one whose first city is smaller
+    than its last is scored. That is the lexicographically earlier tour of
+    each mirrored pair, so with integer distances the result is still that
+    of the full enumeration, with half the work. (Float sums of a tour and
+    its reverse can differ in the last bit, so float results are optimal
+    to rounding.) Prefixes that cannot lead to such a tour are skipped
+    before any suffix is scored.
+
+    head restricts the search to the tours that visit those cities first,
+    in that order, after start. bound, a function returning a cost, prunes
+    every prefix that is already strictly more expensive than its current
+    value, and no tour above it is returned, which lets parallel searches
+    share their best cost; tours that tie it are still scored, so ties
+    break as in the full enumeration.
+
+    Returns:
+        tuple: (tour, cost), the tour closed at start, or (None, None) when
+        no tour is within bound
+    """
+    d = np.asarray(as_distances(dist_matrix))
+    n = len(d)
+    if n <= 1:
+        return [start, start], d[start, start].item() if n else 0
+    if symmetric and head:
+        raise ValueError("best_permutation cannot fix a head in symmetric mode")
+
+    head = list(head)
+    origin = start
+    head_cost = 0
+    for city in head:
+        head_cost = head_cost + d[origin, city]
+        origin = city
+    cities = [c for c in range(n) if c != start and c not in head]
+    r = min(block, len(cities))
+    perms = _permutations(r)
+
+    best_cost = None
+    best_tour = None
+    if bound is not None and head_cost > bound():
+        return best_tour, best_cost
+    # a tour starting with the largest city cannot end on a larger one
+    firsts = cities[:-1] if symmetric else cities
+    for prefix, prefix_cost in _prefixes(d, origin, head_cost, cities, len(cities) - r,
+                                         firsts, bound):
+        rest = np.array([c for c in cities if c not in prefix], dtype=np.intp)
+        last = prefix[-1] if prefix else origin
+        if symmetric:
+            perms = _mirror_free(r, int(np.searchsorted(rest, prefix[0], 'right')) if prefix else None)
+            if not len(perms):
+                continue
+        sub = d[np.ix_(rest, rest)]
+
+        # Same summation order as walking each tour edge by edge
+        costs = prefix_cost + d[last, rest][perms[:, 0]]
+        for j in range(r - 1):
+            costs = costs + sub[perms[:, j], perms[:, j + 1]]
+        costs = costs + d[rest, start][perms[:, -1]]
+
+        i = int(costs.argmin())
+        if bound is not None and costs[i] > bound():
+            continue
+        if best_cost is None or costs[i] < best_cost:
+            best_cost = costs[i]
+            best_tour = [start] + head + list(prefix) + rest[perms[i]].tolist() + [start]
+
+    return best_tour, best_cost if best_cost is None else best_cost.item()
+
+
+def _prefixes(d, origin, base, cities, length, firsts, bound=None):
+    """
+    (prefix, base + cost of origin + prefix) in lexicographic order of
+    prefix, for the prefixes whose first city is in firsts and, given
+    bound, that are not yet more expensive than bound().
+    """
+    if length == 0:
+        yield (), base
+        return
+
+    prefix = []
+    used = set()
+
+    def walk(city, cost):
+        if len(prefix) == length:
+            yield tuple(prefix), cost
+            return
+        for nxt in (cities if prefix else firsts):
+            if nxt in used:
+                continue
+            nxt_cost = cost + d[city, nxt]
+            if bound is not None and nxt_cost > bound():
+                continue
+            used.add(nxt)
+            prefix.append(nxt)
+            yield from walk(nxt, nxt_cost)
+            prefix.pop()
+            used.discard(nxt)
+
+    yield from walk(origin, base)
+
+
+def _mirror_free(r, above=None):
+    """
+    Rows of _permutations(r) that end on an index >= above, i.e. on a city
+    larger than the first city of the prefix; without a prefix, the rows
+    whose first index is not larger than their last.
+    """
+    key = (r, above)
+    if key not in _suffix_perms:
+        perms = _permutations(r)
+        if above is None:
+            _suffix_perms[key] = perms[perms[:, 0] <= perms[:, -1]]
+        else:
+            _suffix_perms[key] = perms[perms[:, -1] >= above]
+    return _suffix_perms[key]
+
+
+def _permutations(r):
+    """All orderings of range(r) in lexicographic order, as an (r!, r) array."""
+    if r not in _suffix_perms:
+        _suffix_perms[r] = np.array(list(itertools.permutations(range(r))), dtype=np.intp).reshape(-1, r)
+    return _suffix_perms[r]